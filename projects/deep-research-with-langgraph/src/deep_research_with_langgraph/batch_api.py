@@ -0,0 +1,370 @@
+"""Offline Batch-API Execution Mode.
+
+Overnight batch jobs care about cost, not latency. In the "batch" execution mode the
+bulk model calls (webpage summaries, research compression and the final report) are
+not sent in real time; they are queued, submitted together through a provider batch
+endpoint and resumed once the endpoint returns their results. Interactive runs keep
+the real-time path, which is the default.
+
+Two endpoints are provided:
+- file: writes every batch as an OpenAI-style requests.jsonl into a directory and
+  waits for a matching results.jsonl next to it. An optional responder fills in the
+  results immediately, which makes the mode testable offline
+- openai: the OpenAI Batch API (/v1/chat/completions, 24h completion window)
+
+Requests get a deterministic custom_id (a hash of the request body) and every
+submission is recorded in a ledger next to the batches. A process restarted with a
+checkpointer therefore picks up batches that were still in flight instead of paying
+for the same requests twice.
+
+The mode is selected with DEEP_RESEARCH_EXECUTION_MODE ("realtime" or "batch") and
+the endpoint with DEEP_RESEARCH_BATCH_ENDPOINT ("file:<directory>" or "openai"), or
+programmatically with set_execution_mode().
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Protocol
+
+from langchain_core.messages import AIMessage, BaseMessage, convert_to_openai_messages
+
+from deep_research_with_langgraph.resilience import resilient_call
+
+# ===== CONFIGURATION =====
+
+# "realtime" sends model calls directly, "batch" queues them for a batch endpoint
+execution_mode = os.environ.get("DEEP_RESEARCH_EXECUTION_MODE", "realtime")
+
+# Batch endpoint: "file:<directory>" or "openai"
+batch_endpoint_spec = os.environ.get("DEEP_RESEARCH_BATCH_ENDPOINT", "file:.deep_research/batches")
+
+# Time requests are collected before a batch is submitted, in seconds
+batch_window_seconds = 5.0
+
+# Maximum number of requests in a single batch
+batch_max_requests = 5000
+
+# Interval between checks for finished batches, in seconds
+batch_poll_seconds = 30.0
+
+# ===== REQUESTS AND RESULTS =====
+
+def build_request_body(model, messages: list[BaseMessage], schema: type | None = None) -> dict:
+    """Build a /v1/chat/completions request body from a chat model and its messages."""
+    body: dict[str, Any] = {
+        "model": getattr(model, "model_name", None) or getattr(model, "model", None),
+        "messages": convert_to_openai_messages(messages),
+    }
+    if getattr(model, "temperature", None) is not None:
+        body["temperature"] = model.temperature
+    if getattr(model, "max_tokens", None):
+        body["max_tokens"] = model.max_tokens
+    if schema is not None:
+        body["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": schema.__name__, "schema": schema.model_json_schema()},
+        }
+    return body
+
+def request_id(body: dict) -> str:
+    """Deterministic custom_id of a request body."""
+    return "req-" + hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+class BatchRequestError(Exception):
+    """A request of a batch failed or the batch ended without a result for it."""
+
+def parse_batch_output(lines: list[str]) -> dict[str, str | BatchRequestError]:
+    """Parse OpenAI batch output lines into message contents (or errors) by custom_id."""
+    results: dict[str, str | BatchRequestError] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code", 200) >= 400:
+            results[record["custom_id"]] = BatchRequestError(str(record.get("error") or response.get("body")))
+            continue
+        results[record["custom_id"]] = response["body"]["choices"][0]["message"].get("content") or ""
+    return results
+
+# ===== ENDPOINTS =====
+
+class BatchEndpoint(Protocol):
+    """Interface shared by all batch endpoints."""
+
+    def submit(self, requests: list[dict]) -> str:
+        """Submit OpenAI-style batch input lines and return the batch id."""
+        ...
+
+    def poll(self, batch_id: str) -> dict[str, str | BatchRequestError] | None:
+        """Get the results of a finished batch by custom_id, or None while it is running."""
+        ...
+
+class FileBatchEndpoint:
+    """Batch endpoint that exchanges JSONL files in a directory.
+
+    Every batch is a subdirectory holding requests.jsonl. The batch is finished
+    once results.jsonl, in the OpenAI batch output format, appears next to it.
+    """
+
+    def __init__(self, directory: str | Path, responder: Callable[[dict], str] | None = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Produces the message content for a request body; used to answer batches offline
+        self.responder = responder
+
+    def submit(self, requests: list[dict]) -> str:
+        batch_id = f"batch-{uuid.uuid4().hex[:12]}"
+        batch_dir = self.directory / batch_id
+        batch_dir.mkdir()
+        (batch_dir / "requests.jsonl").write_text(
+            "".join(json.dumps(request) + "\n" for request in requests), encoding="utf-8"
+        )
+        if self.responder is not None:
+            self.complete(batch_id, self.responder)
+        return batch_id
+
+    def complete(self, batch_id: str, responder: Callable[[dict], str]) -> None:
+        """Answer every request of a batch with a responder and write its results."""
+        batch_dir = self.directory / batch_id
+        lines = []
+        for line in (batch_dir / "requests.jsonl").read_text(encoding="utf-8").splitlines():
+            request = json.loads(line)
+            try:
+                content = responder(request["body"])
+                record = {"custom_id": request["custom_id"], "error": None, "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"role": "assistant", "content": content}}]},
+                }}
+            except Exception as e:
+                record = {"custom_id": request["custom_id"], "error": f"{type(e).__name__}: {e}", "response": None}
+            lines.append(json.dumps(record) + "\n")
+        # Written in one step so pollers never see a partial file
+        partial = batch_dir / "results.jsonl.tmp"
+        partial.write_text("".join(lines), encoding="utf-8")
+        partial.replace(batch_dir / "results.jsonl")
+
+    def poll(self, batch_id: str) -> dict[str, str | BatchRequestError] | None:
+        results = self.directory / batch_id / "results.jsonl"
+        if not results.exists():
+            return None
+        return parse_batch_output(results.read_text(encoding="utf-8").splitlines())
+
+class OpenAIBatchEndpoint:
+    """Batch endpoint backed by the OpenAI Batch API."""
+
+    def __init__(self, client=None):
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI()
+        self.client = client
+
+    def submit(self, requests: list[dict]) -> str:
+        data = "".join(json.dumps(request) + "\n" for request in requests).encode("utf-8")
+        input_file = self.client.files.create(file=("requests.jsonl", data), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        return batch.id
+
+    def poll(self, batch_id: str) -> dict[str, str | BatchRequestError] | None:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status not in ("completed", "failed", "expired", "cancelled"):
+            return None
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines += self.client.files.content(file_id).text.splitlines()
+        return parse_batch_output(lines)
+
+def create_batch_endpoint(spec: str) -> BatchEndpoint:
+    """Create a batch endpoint from its spec ("file:<directory>" or "openai")."""
+    if spec == "openai":
+        return OpenAIBatchEndpoint()
+    if spec.startswith("file:"):
+        return FileBatchEndpoint(spec.removeprefix("file:"))
+    raise ValueError(f"Unknown batch endpoint: {spec!r}")
+
+# ===== DISPATCHER =====
+
+class BatchDispatcher:
+    """Collects requests into batches, submits them and resolves them when results arrive.
+
+    Submitting and polling happen on a background thread, so requests can come
+    from the event loop as well as from tool worker threads.
+    """
+
+    def __init__(self, endpoint: BatchEndpoint, ledger_path: str | Path | None = None):
+        self.endpoint = endpoint
+        self.ledger_path = Path(ledger_path) if ledger_path else None
+        self._queued: dict[str, dict] = {}
+        self._futures: dict[str, list[concurrent.futures.Future]] = {}
+        self._in_flight: dict[str, set[str]] = {}
+        self._ledger: dict[str, str] = self._read_ledger()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="batch-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _read_ledger(self) -> dict[str, str]:
+        if self.ledger_path is None or not self.ledger_path.exists():
+            return {}
+        ledger = {}
+        for line in self.ledger_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                if entry["batch_id"] is None:
+                    ledger.pop(entry["custom_id"], None)
+                else:
+                    ledger[entry["custom_id"]] = entry["batch_id"]
+        return ledger
+
+    def _record(self, batch_id: str | None, custom_ids: list[str]) -> None:
+        """Record the batch the requests went into; None forgets them so they are submitted again."""
+        if batch_id is None:
+            for custom_id in custom_ids:
+                self._ledger.pop(custom_id, None)
+        else:
+            self._ledger.update(dict.fromkeys(custom_ids, batch_id))
+        if self.ledger_path is not None:
+            self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.ledger_path.open("a", encoding="utf-8") as f:
+                f.writelines(json.dumps({"custom_id": c, "batch_id": batch_id}) + "\n" for c in custom_ids)
+
+    def submit(self, body: dict) -> concurrent.futures.Future:
+        """Queue a request body; the future resolves to the message content."""
+        custom_id = request_id(body)
+        future = concurrent.futures.Future()
+        with self._condition:
+            self._futures.setdefault(custom_id, []).append(future)
+            pending = custom_id in self._queued or any(custom_id in ids for ids in self._in_flight.values())
+            if not pending and custom_id in self._ledger:
+                # Submitted earlier, possibly before a restart; wait for that batch instead of resubmitting
+                self._in_flight.setdefault(self._ledger[custom_id], set()).add(custom_id)
+            elif not pending:
+                self._queued[custom_id] = {
+                    "custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body
+                }
+            self._condition.notify()
+        return future
+
+    def _run(self) -> None:
+        last_poll = 0.0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queued or self._in_flight)
+                # Give other requests of the same wave the chance to join the batch
+                deadline = time.monotonic() + batch_window_seconds
+                while 0 < len(self._queued) < batch_max_requests and time.monotonic() < deadline:
+                    self._condition.wait(deadline - time.monotonic())
+                requests = list(self._queued.values())[:batch_max_requests]
+                for request in requests:
+                    del self._queued[request["custom_id"]]
+            if requests:
+                self._submit(requests)
+            if time.monotonic() - last_poll >= batch_poll_seconds or requests:
+                last_poll = time.monotonic()
+                self._poll()
+            with self._condition:
+                if self._in_flight and not self._queued:
+                    self._condition.wait(batch_poll_seconds)
+
+    def _submit(self, requests: list[dict]) -> None:
+        custom_ids = [request["custom_id"] for request in requests]
+        try:
+            batch_id = self.endpoint.submit(requests)
+        except Exception as e:
+            print(f"Failed to submit batch of {len(requests)} requests: {e}")
+            self._resolve({custom_id: e for custom_id in custom_ids})
+            return
+        with self._condition:
+            self._record(batch_id, custom_ids)
+            self._in_flight.setdefault(batch_id, set()).update(custom_ids)
+
+    def _poll(self) -> None:
+        with self._condition:
+            batches = {batch_id: set(ids) for batch_id, ids in self._in_flight.items()}
+        for batch_id, custom_ids in batches.items():
+            try:
+                results = self.endpoint.poll(batch_id)
+            except Exception as e:
+                print(f"Failed to poll batch {batch_id}: {e}")
+                continue
+            if results is None:
+                continue
+            missing = BatchRequestError(f"Batch {batch_id} returned no result")
+            with self._condition:
+                self._in_flight.pop(batch_id, None)
+            self._resolve({custom_id: results.get(custom_id, missing) for custom_id in custom_ids})
+
+    def _resolve(self, outcomes: dict[str, Any]) -> None:
+        failed = [custom_id for custom_id, outcome in outcomes.items() if isinstance(outcome, BaseException)]
+        with self._condition:
+            futures = {custom_id: self._futures.pop(custom_id, []) for custom_id in outcomes}
+            # A failed request must not re-attach to its failed batch when it is submitted again
+            if failed:
+                self._record(None, [custom_id for custom_id in failed if custom_id in self._ledger])
+        for custom_id, outcome in outcomes.items():
+            for future in futures[custom_id]:
+                if isinstance(outcome, BaseException):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+_dispatcher: BatchDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+def get_batch_dispatcher() -> BatchDispatcher:
+    """Get the process-wide batch dispatcher, creating it for the configured endpoint."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            endpoint = create_batch_endpoint(batch_endpoint_spec)
+            ledger_dir = endpoint.directory if isinstance(endpoint, FileBatchEndpoint) else Path(".deep_research/batches")
+            _dispatcher = BatchDispatcher(endpoint, ledger_dir / "ledger.jsonl")
+        return _dispatcher
+
+def set_execution_mode(mode: str, endpoint: BatchEndpoint | None = None, ledger_path: str | Path | None = None) -> None:
+    """Switch between "realtime" and "batch" execution, optionally with a specific endpoint."""
+    global execution_mode, _dispatcher
+    if mode not in ("realtime", "batch"):
+        raise ValueError(f"Unknown execution mode: {mode!r}")
+    execution_mode = mode
+    if endpoint is not None:
+        with _dispatcher_lock:
+            _dispatcher = BatchDispatcher(endpoint, ledger_path)
+
+def batch_mode_enabled() -> bool:
+    """Check whether bulk model calls go through the batch endpoint."""
+    return execution_mode == "batch"
+
+# ===== MODEL CALLS =====
+
+def _to_output(content: str, schema: type | None):
+    return schema.model_validate_json(content) if schema is not None else AIMessage(content=content)
+
+async def batch_invoke(model, messages: list[BaseMessage], schema: type | None = None):
+    """Send a model call through the batch endpoint and wait for its result.
+
+    Returns:
+        An AIMessage, or an instance of schema when one is given
+    """
+    future = get_batch_dispatcher().submit(build_request_body(model, messages, schema))
+    return _to_output(await asyncio.wrap_future(future), schema)
+
+async def invoke_model(site: str, provider: str, model, messages: list[BaseMessage], schema: type | None = None):
+    """Run a bulk model call in the current execution mode.
+
+    Real-time calls go through the resilience layer under their call site; batch
+    calls are queued for the batch endpoint, where latency does not matter.
+    """
+    if batch_mode_enabled():
+        return await batch_invoke(model, messages, schema)
+    runnable = model.with_structured_output(schema) if schema is not None else model
+    return await resilient_call(site, provider, lambda: runnable.ainvoke(messages, config={"tags": [f"span:{site}"]}))
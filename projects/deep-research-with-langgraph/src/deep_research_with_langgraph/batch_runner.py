@@ -0,0 +1,245 @@
+"""Batch Research Runner.
+
+Runs many research briefs through the Tavily or Sonar research graph in one process:
+
+    deep-research-batch briefs.jsonl results.jsonl --graph tavily --concurrency 4
+
+Every input line is a JSON object with a "brief" (the research request) and an
+optional "id", "graph", "tenant" and "priority"; lines without an id are identified
+by their line number. Runs share the process-wide search and summary caches, and
+at most --concurrency runs are in flight at a time. Their provider calls are
+scheduled in the "batch" priority class unless a line asks otherwise, so interactive
+runs in the same process keep priority (see scheduler.py).
+
+Each finished run is appended to the output file as soon as it completes, with its
+report and per-run metrics. Running the same command again skips every id the output
+already holds a finished result for, so an interrupted batch continues where it
+stopped; failed runs are retried and their new result is appended. With
+DEEP_RESEARCH_CHECKPOINT_DB set, interrupted runs also resume from their last
+checkpoint instead of starting over; a retry whose earlier attempt is not stopped
+mid-run starts on a new thread, so it does not build on the old attempt's notes.
+
+With --execution-mode batch, summaries, compression and reports of all runs are sent
+through a provider batch endpoint (see batch_api.py), trading latency for cost.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+
+# API keys and DEEP_RESEARCH_* settings are read when the modules below are imported
+load_dotenv()
+
+from deep_research_with_langgraph import batch_api
+from deep_research_with_langgraph.caches import cache_stats
+from deep_research_with_langgraph.checkpointing import get_checkpointer
+from deep_research_with_langgraph.scheduler import get_scheduler_metrics
+from deep_research_with_langgraph.tracing import TraceRecorder
+
+# ===== CONFIGURATION =====
+
+# Research graph used for lines that do not name one
+default_graph = "tavily"
+
+# Number of runs in flight at the same time
+default_concurrency = 4
+
+# Scheduler priority class of runs whose line does not set one
+default_batch_priority = "batch"
+
+# Statuses that count as finished when resuming a batch
+finished_statuses = {"completed", "needs_clarification"}
+
+# ===== INPUT AND OUTPUT =====
+
+def read_briefs(path: Path) -> list[dict]:
+    """Read the briefs of a batch, giving every line an id."""
+    briefs = []
+    with path.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not str(item.get("brief", "")).strip():
+                raise ValueError(f"{path}:{line_number}: missing 'brief'")
+            briefs.append({**item, "id": str(item.get("id", f"line-{line_number}"))})
+    return briefs
+
+def read_results(path: Path) -> tuple[set[str], Counter]:
+    """Collect the ids the output file already holds a finished result for.
+
+    Returns:
+        The finished ids, and the number of results recorded for every id
+    """
+    finished, attempts = set(), Counter()
+    if not path.exists():
+        return finished, attempts
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut off by a crash; the run is repeated
+                continue
+            attempts[record["id"]] += 1
+            if record.get("status") in finished_statuses:
+                finished.add(record["id"])
+    return finished, attempts
+
+def load_graph(name: str):
+    """Import a full research graph by name ("tavily" or "sonar")."""
+    return importlib.import_module(f"deep_research_with_langgraph.research_with_{name}_full").agent
+
+# ===== RUNS =====
+
+def batch_thread_id(item_id: str, attempt: int) -> str:
+    """Checkpoint thread of an attempt at a brief; the first attempt is numbered 0."""
+    return f"batch-{item_id}" if attempt == 0 else f"batch-{item_id}-attempt-{attempt + 1}"
+
+async def select_thread(agent, item_id: str, attempt: int) -> tuple[str, bool]:
+    """Pick the checkpoint thread for an attempt at a brief.
+
+    The latest earlier attempt is resumed when its checkpoint stopped mid-run (a
+    crash or a failed node). Otherwise the attempt starts on a thread of its own,
+    since running the brief again on a thread whose run ended would append the new
+    notes to the old ones.
+
+    Returns:
+        The thread id, and whether the run resumes from its checkpoint
+    """
+    for earlier in range(attempt, -1, -1):
+        thread_id = batch_thread_id(item_id, earlier)
+        snapshot = await agent.aget_state({"configurable": {"thread_id": thread_id}})
+        if snapshot.next:
+            return thread_id, True
+        if snapshot.values:
+            break
+    return batch_thread_id(item_id, attempt), False
+
+async def run_brief(item: dict, graph_name: str, trace_dir: Path | None = None, attempt: int = 0) -> dict:
+    """Run one brief through a research graph and collect its result and metrics.
+
+    With a trace_dir, the run's timeline is exported there as Chrome trace JSON.
+    attempt counts the results already recorded for the brief, see select_thread().
+    """
+    agent = load_graph(graph_name)
+    configurable = {"priority": item.get("priority") or default_batch_priority}
+    if item.get("tenant"):
+        configurable["tenant_id"] = str(item["tenant"])
+    graph_input = {"messages": [HumanMessage(content=item["brief"])]}
+    resumed = False
+    if get_checkpointer() is not None:
+        configurable["thread_id"], resumed = await select_thread(agent, item["id"], attempt)
+        if resumed:
+            graph_input = None
+    config = {"configurable": configurable}
+    recorder = TraceRecorder() if trace_dir is not None else None
+    if recorder is not None:
+        config["callbacks"] = [recorder]
+
+    events = Counter()
+    state = {}
+    started = time.perf_counter()
+    async for namespace, mode, chunk in agent.astream(graph_input, config, stream_mode=["custom", "values"], subgraphs=True):
+        if mode == "custom":
+            events[chunk.get("event", "unknown")] += 1
+        elif mode == "values" and not namespace:
+            state = chunk
+    elapsed = time.perf_counter() - started
+    if recorder is not None:
+        trace_dir.mkdir(parents=True, exist_ok=True)
+        recorder.export_chrome_trace(trace_dir / f"{item['id']}.trace.json")
+
+    usage = state.get("supervisor_token_usage", [])
+    report = state.get("final_report", "")
+    return {
+        "id": item["id"],
+        "brief": item["brief"],
+        "graph": graph_name,
+        "status": "completed" if report else "needs_clarification",
+        "final_report": report,
+        "clarification": "" if report else (state["messages"][-1].content if state.get("messages") else ""),
+        "metrics": {
+            "elapsed_seconds": round(elapsed, 2),
+            "resumed": resumed,
+            "thread_id": configurable.get("thread_id"),
+            "notes": len(state.get("notes", [])),
+            "report_chars": len(report),
+            "supervisor_turns": len(usage),
+            "supervisor_input_tokens": sum(turn.get("input_tokens") or 0 for turn in usage),
+            "supervisor_output_tokens": sum(turn.get("output_tokens") or 0 for turn in usage),
+            "events": dict(events),
+        },
+    }
+
+async def run_batch(input_path: Path, output_path: Path, graph_name: str, concurrency: int, trace_dir: Path | None = None) -> dict:
+    """Run every unfinished brief of a batch, appending results as they complete.
+
+    Returns:
+        Counts of the batch's runs and the cache statistics
+    """
+    briefs = read_briefs(input_path)
+    finished, attempts = read_results(output_path)
+    pending = [item for item in briefs if item["id"] not in finished]
+    print(f"{len(briefs)} briefs, {len(briefs) - len(pending)} already finished, {len(pending)} to run", file=sys.stderr)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = Counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with output_path.open("a", encoding="utf-8") as output:
+        async def run(item: dict) -> None:
+            async with semaphore:
+                try:
+                    record = await run_brief(item, item.get("graph") or graph_name, trace_dir, attempts[item["id"]])
+                except Exception as e:
+                    print(f"Run {item['id']} failed: {e}", file=sys.stderr)
+                    record = {"id": item["id"], "brief": item["brief"], "status": "error", "error": f"{type(e).__name__}: {e}"}
+            statuses[record["status"]] += 1
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            print(f"[{sum(statuses.values())}/{len(pending)}] {item['id']}: {record['status']}", file=sys.stderr)
+
+        await asyncio.gather(*(run(item) for item in pending))
+
+    checkpointer = get_checkpointer()
+    if checkpointer is not None:
+        checkpointer.flush()
+    return {
+        "briefs": len(briefs),
+        "skipped": len(briefs) - len(pending),
+        "statuses": dict(statuses),
+        "caches": cache_stats(),
+        "scheduler": get_scheduler_metrics(),
+        "checkpoints": checkpointer.metrics.summary() if checkpointer is not None else None,
+    }
+
+# ===== ENTRY POINT =====
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run research briefs from a JSONL file through a research graph.")
+    parser.add_argument("input", type=Path, help="JSONL file with one {\"brief\": ...} object per line")
+    parser.add_argument("output", type=Path, help="JSONL file the results are appended to")
+    parser.add_argument("--graph", choices=["tavily", "sonar"], default=default_graph, help="Research graph for lines that do not name one")
+    parser.add_argument("--concurrency", type=int, default=default_concurrency, help="Number of runs in flight at the same time")
+    parser.add_argument("--execution-mode", choices=["realtime", "batch"], default=batch_api.execution_mode, help="Send summaries, compression and reports through a batch endpoint")
+    parser.add_argument("--batch-endpoint", default=batch_api.batch_endpoint_spec, help="Batch endpoint: file:<directory> or openai")
+    parser.add_argument("--trace-dir", type=Path, help="Directory for a Chrome trace of every run")
+    args = parser.parse_args(argv)
+
+    batch_api.batch_endpoint_spec = args.batch_endpoint
+    batch_api.set_execution_mode(args.execution_mode)
+
+    summary = asyncio.run(run_batch(args.input, args.output, args.graph, max(1, args.concurrency), args.trace_dir))
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Out-of-Band Storage for Research Notes.
+
+Raw research notes are large and only needed when debugging or writing reports, yet
+anything kept in graph state is serialized again by the checkpointer at every
+super-step. This module stores such content outside of graph state and hands back
+a short content-hash reference that can be kept in state instead.
+
+Several interchangeable backends are provided:
+- memory: process-local dictionary, the default; it holds at most
+  memory_blob_store_max_bytes and evicts the least recently used blobs beyond that,
+  so a long-lived process does not grow without bound
+- filesystem: one file per blob in a sharded directory tree
+- sqlite: a single SQLite database
+- mmap: a single append-only data file read through a memory map
+
+The backend is selected with the DEEP_RESEARCH_BLOB_STORE environment variable, or
+replaced programmatically with set_blob_store().
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Protocol
+
+# ===== BLOB STORES =====
+
+def content_ref(content: str) -> str:
+    """Compute the content-hash reference for a piece of text."""
+    return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+class BlobStore(Protocol):
+    """Interface shared by all blob store backends."""
+
+    def put(self, content: str) -> str:
+        """Store content and return its reference."""
+        ...
+
+    def get(self, ref: str) -> str:
+        """Load the content stored under a reference."""
+        ...
+
+    def __contains__(self, ref: str) -> bool:
+        """Check whether a reference is stored."""
+        ...
+
+class InMemoryBlobStore:
+    """Process-local blob store keyed by content hash.
+
+    Holds at most max_bytes of content (counted in characters), evicting the least
+    recently stored or loaded blobs first. Loading an evicted blob raises KeyError.
+    """
+
+    def __init__(self, max_bytes: int | None = None):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._blobs: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, content: str) -> str:
+        """Store content and return its reference. Storing the same content twice is a no-op."""
+        ref = content_ref(content)
+        with self._lock:
+            if ref in self._blobs:
+                self._blobs.move_to_end(ref)
+                return ref
+            self._blobs[ref] = content
+            self.size += len(content)
+            # Always keep the newest blob, even if it alone exceeds the limit
+            while self.max_bytes is not None and self.size > self.max_bytes and len(self._blobs) > 1:
+                _, evicted = self._blobs.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return ref
+
+    def get(self, ref: str) -> str:
+        """Load the content stored under a reference."""
+        with self._lock:
+            content = self._blobs[ref]
+            self._blobs.move_to_end(ref)
+            return content
+
+    def __contains__(self, ref: str) -> bool:
+        with self._lock:
+            return ref in self._blobs
+
+class FilesystemBlobStore:
+    """Blob store keeping one file per blob under a local directory.
+
+    Files are sharded by the first two hex digits of the hash and written
+    atomically, so concurrent writers of the same content are safe.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ref: str) -> Path:
+        digest = ref.split(":", 1)[-1]
+        return self.root / digest[:2] / digest
+
+    def put(self, content: str) -> str:
+        """Store content and return its reference. Storing the same content twice is a no-op."""
+        ref = content_ref(content)
+        path = self._path(ref)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, path)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """Load the content stored under a reference."""
+        try:
+            return self._path(ref).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise KeyError(ref) from None
+
+    def __contains__(self, ref: str) -> bool:
+        return self._path(ref).exists()
+
+class SqliteBlobStore:
+    """Blob store backed by a single SQLite database file."""
+
+    def __init__(self, path: str | Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS blobs (ref TEXT PRIMARY KEY, content TEXT NOT NULL)")
+
+    def put(self, content: str) -> str:
+        """Store content and return its reference. Storing the same content twice is a no-op."""
+        ref = content_ref(content)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO blobs (ref, content) VALUES (?, ?)", (ref, content))
+        return ref
+
+    def get(self, ref: str) -> str:
+        """Load the content stored under a reference."""
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM blobs WHERE ref = ?", (ref,)).fetchone()
+        if row is None:
+            raise KeyError(ref)
+        return row[0]
+
+    def __contains__(self, ref: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM blobs WHERE ref = ?", (ref,)).fetchone() is not None
+
+class MmapBlobStore:
+    """Blob store appending blobs to one data file that is read through a memory map.
+
+    Each record is a 32-byte SHA-256 digest, an 8-byte length and the UTF-8 payload.
+    The in-memory index of offsets is rebuilt by scanning the file on startup.
+    """
+
+    _header = struct.Struct(">32sQ")
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self._index: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._file = open(self.path, "r+b")
+        self._map: mmap.mmap | None = None
+        self._scan()
+
+    def _remap(self) -> None:
+        """Map the current extent of the data file."""
+        if self._map is not None:
+            self._map.close()
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ) if size else None
+
+    def _scan(self) -> None:
+        """Rebuild the offset index from the data file, ignoring a truncated tail."""
+        self._remap()
+        size = len(self._map) if self._map is not None else 0
+        offset = 0
+        while offset + self._header.size <= size:
+            digest, length = self._header.unpack_from(self._map, offset)
+            start = offset + self._header.size
+            if start + length > size:
+                break
+            self._index["sha256:" + digest.hex()] = (start, length)
+            offset = start + length
+
+    def put(self, content: str) -> str:
+        """Store content and return its reference. Storing the same content twice is a no-op."""
+        ref = content_ref(content)
+        with self._lock:
+            if ref in self._index:
+                return ref
+            payload = content.encode("utf-8")
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(self._header.pack(bytes.fromhex(ref.split(":", 1)[1]), len(payload)) + payload)
+            self._file.flush()
+            self._index[ref] = (offset + self._header.size, len(payload))
+            self._remap()
+        return ref
+
+    def get(self, ref: str) -> str:
+        """Load the content stored under a reference."""
+        with self._lock:
+            start, length = self._index[ref]
+            return self._map[start:start + length].decode("utf-8")
+
+    def __contains__(self, ref: str) -> bool:
+        with self._lock:
+            return ref in self._index
+
+# ===== CONFIGURATION =====
+
+# Backend used for out-of-band research content: 'memory', 'filesystem', 'sqlite' or 'mmap'
+blob_store_backend = os.environ.get("DEEP_RESEARCH_BLOB_STORE", "memory")
+# Maximum size of the memory backend, in characters; least recently used blobs are evicted beyond it
+memory_blob_store_max_bytes = int(os.environ.get("DEEP_RESEARCH_BLOB_MEMORY_MAX_BYTES", 256 * 1024 * 1024))
+# Directory holding the persistent backends
+blob_store_dir = Path(os.environ.get("DEEP_RESEARCH_BLOB_DIR", ".deep_research/blobs"))
+
+def create_blob_store(backend: str = blob_store_backend, directory: str | Path = blob_store_dir) -> BlobStore:
+    """Create a blob store for the given backend name."""
+    directory = Path(directory)
+    if backend == "memory":
+        return InMemoryBlobStore(memory_blob_store_max_bytes)
+    if backend == "filesystem":
+        return FilesystemBlobStore(directory)
+    if backend == "sqlite":
+        return SqliteBlobStore(directory / "blobs.sqlite")
+    if backend == "mmap":
+        return MmapBlobStore(directory / "blobs.dat")
+    raise ValueError(f"Unknown blob store backend: {backend}")
+
+_blob_store: BlobStore | None = None
+
+def get_blob_store() -> BlobStore:
+    """Get the blob store shared by all research graphs in this process."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = create_blob_store()
+    return _blob_store
+
+def set_blob_store(store: BlobStore) -> None:
+    """Replace the blob store shared by all research graphs in this process."""
+    global _blob_store
+    _blob_store = store
+
+def load_blobs(refs: list[str]) -> Iterator[str]:
+    """Lazily load blobs, fetching each one only when the iterator reaches it."""
+    store = get_blob_store()
+    for ref in refs:
+        yield store.get(ref)
@@ -0,0 +1,77 @@
+"""Process-Wide Search and Summary Caches.
+
+Concurrent runs in one process (such as a batch) often search for the same queries
+and summarize the same pages. These caches let them share the work:
+
+- search_cache: Tavily responses and Sonar answers, keyed by query and search options
+- summary_cache: webpage summaries, keyed by the content hash of the page
+
+Entries expire after cache_ttl_seconds, so a long-lived process does not serve stale
+search results, and each cache is capped in size, evicting the least recently used
+entries first. Cached entries hold no source IDs, since every run numbers its
+sources in its own citation registry.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# ===== CONFIGURATION =====
+
+# Age after which a cached entry is no longer used, in seconds
+cache_ttl_seconds = 6 * 60 * 60
+
+# Maximum number of cached search responses
+search_cache_size = 2000
+
+# Maximum number of cached webpage summaries
+summary_cache_size = 5000
+
+# ===== CACHES =====
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed age."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a cached value, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+search_cache = TTLCache(search_cache_size, cache_ttl_seconds)
+summary_cache = TTLCache(summary_cache_size, cache_ttl_seconds)
+
+def cache_stats() -> dict:
+    """Hit and miss counts of the process-wide caches."""
+    return {"search": search_cache.stats(), "summary": summary_cache.stats()}
@@ -0,0 +1,374 @@
+"""Durable Checkpointing.
+
+Without a checkpointer a crash or restart threw away all research done so far. This
+module provides a SQLite-backed checkpointer for the full research graphs:
+
+- checkpoints, pending writes and channel values are kept in memory (it extends
+  LangGraph's InMemorySaver) and written to SQLite in batches, so the many small
+  writes of a super-step cost one transaction instead of one commit each
+- threads are loaded from SQLite the first time they are accessed, so a run
+  started again with the same thread_id resumes where it stopped
+
+The supervisor runs as a node of the full graph and inherits the checkpointer.
+Researchers are started from inside the supervisor_tools node, where LangGraph
+numbers subgraph namespaces in call order; concurrent researchers would resume each
+other's checkpoints, so they run without a checkpointer. Instead, the result of every
+finished researcher is stored right away, keyed by thread and tool call, and a
+resumed run skips researchers that already finished. The supervisor flushes the
+checkpointer before it starts researchers, so the checkpoint holding their tool
+call ids is on disk while they run and a resumed run finds their stored results.
+
+Checkpointing is enabled by setting DEEP_RESEARCH_CHECKPOINT_DB to a SQLite file
+path; runs then need a thread_id in their config. Use a persistent blob store backend
+as well, so the raw notes references stay resolvable after a restart. Pending rows
+are flushed every checkpoint_batch_size rows, by a background thread once they are
+checkpoint_flush_seconds old (also while a long node writes nothing), and when the
+process exits; a hard crash loses at most the last checkpoint_flush_seconds of rows.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+# ===== CONFIGURATION =====
+
+# SQLite file holding the checkpoints; checkpointing is disabled when unset
+checkpoint_db_path = os.environ.get("DEEP_RESEARCH_CHECKPOINT_DB")
+
+# Number of pending rows that triggers a flush to SQLite
+checkpoint_batch_size = 50
+
+# Maximum age of pending rows before they are flushed, in seconds
+checkpoint_flush_seconds = 1.0
+
+# ===== METRICS =====
+
+@dataclass
+class CheckpointMetrics:
+    """Write statistics of a checkpointer."""
+
+    # Checkpoints saved
+    checkpoints: int = 0
+    # Pending writes saved
+    writes: int = 0
+    # Batches written to SQLite
+    flushes: int = 0
+    # Rows and serialized bytes written to SQLite
+    rows: int = 0
+    bytes: int = 0
+    # Time spent writing batches to SQLite, in seconds
+    flush_seconds: float = 0.0
+    max_flush_seconds: float = 0.0
+
+    def summary(self) -> dict:
+        return {
+            "checkpoints": self.checkpoints,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "avg_flush_ms": round(1000 * self.flush_seconds / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(1000 * self.max_flush_seconds, 2),
+            "avg_checkpoint_bytes": round(self.bytes / self.checkpoints) if self.checkpoints else 0,
+        }
+
+# ===== CHECKPOINTER =====
+
+class BatchedSqliteSaver(InMemorySaver):
+    """InMemorySaver that persists to SQLite in batches and loads threads lazily."""
+
+    def __init__(self, path: str | Path):
+        super().__init__()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.RLock()
+        self._loaded: set[str] = set()
+        self._pending_checkpoints: list[tuple] = []
+        self._pending_writes: list[tuple] = []
+        self._pending_blobs: list[tuple] = []
+        self._pending_since: float | None = None
+        self._closed = threading.Event()
+        self.metrics = CheckpointMetrics()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    checkpoint_type TEXT NOT NULL,
+                    checkpoint BLOB NOT NULL,
+                    metadata_type TEXT NOT NULL,
+                    metadata BLOB NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    value_type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    task_path TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS blobs (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value_type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS researcher_results (
+                    thread_id TEXT NOT NULL,
+                    tool_call_id TEXT NOT NULL,
+                    value_type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (thread_id, tool_call_id)
+                )"""
+            )
+        threading.Thread(target=self._flush_periodically, name="checkpoint-flusher", daemon=True).start()
+
+    # ----- loading -----
+
+    def _load_thread(self, thread_id: str) -> None:
+        """Copy a thread's rows from SQLite into memory, once per thread."""
+        with self._lock:
+            if thread_id in self._loaded:
+                return
+            self._loaded.add(thread_id)
+            for ns, checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata, parent_id in self._conn.execute(
+                """SELECT checkpoint_ns, checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata,
+                          parent_checkpoint_id FROM checkpoints WHERE thread_id = ?""",
+                (thread_id,)
+            ):
+                self.storage[thread_id][ns].setdefault(
+                    checkpoint_id, ((checkpoint_type, checkpoint), (metadata_type, metadata), parent_id)
+                )
+            for ns, checkpoint_id, task_id, idx, channel, value_type, value, task_path in self._conn.execute(
+                """SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, value_type, value, task_path
+                   FROM writes WHERE thread_id = ?""",
+                (thread_id,)
+            ):
+                self.writes.setdefault((thread_id, ns, checkpoint_id), {}).setdefault(
+                    (task_id, idx), (task_id, channel, (value_type, value), task_path)
+                )
+            for ns, channel, version, value_type, value in self._conn.execute(
+                "SELECT checkpoint_ns, channel, version, value_type, value FROM blobs WHERE thread_id = ?",
+                (thread_id,)
+            ):
+                self.blobs.setdefault((thread_id, ns, channel, version), (value_type, value))
+
+    def _load_all_threads(self) -> None:
+        with self._lock:
+            thread_ids = [row[0] for row in self._conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+        for thread_id in thread_ids:
+            self._load_thread(thread_id)
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        self._load_thread(config["configurable"]["thread_id"])
+        return super().get_tuple(config)
+
+    def list(self, config: RunnableConfig | None, **kwargs):
+        if config:
+            self._load_thread(config["configurable"]["thread_id"])
+        else:
+            self._load_all_threads()
+        return super().list(config, **kwargs)
+
+    # ----- saving -----
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        self._load_thread(thread_id)
+        with self._lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            (checkpoint_type, data), (metadata_type, metadata_data), parent_id = (
+                self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            )
+            self._pending_checkpoints.append((
+                thread_id, checkpoint_ns, checkpoint["id"], checkpoint_type, data, metadata_type, metadata_data, parent_id
+            ))
+            for channel, version in new_versions.items():
+                value_type, value = self.blobs[(thread_id, checkpoint_ns, channel, version)]
+                self._pending_blobs.append((thread_id, checkpoint_ns, channel, str(version), value_type, value))
+            self.metrics.checkpoints += 1
+            self._maybe_flush()
+        return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        key = (thread_id, config["configurable"]["checkpoint_ns"], config["configurable"]["checkpoint_id"])
+        self._load_thread(thread_id)
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            for (stored_task_id, idx), (_, channel, (value_type, value), stored_path) in self.writes.get(key, {}).items():
+                if stored_task_id == task_id:
+                    self._pending_writes.append((*key, task_id, idx, channel, value_type, value, stored_path))
+            self.metrics.writes += len(writes)
+            self._maybe_flush()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self.flush()
+            super().delete_thread(thread_id)
+            self._loaded.discard(thread_id)
+            with self._conn:
+                for table in ("checkpoints", "writes", "blobs", "researcher_results"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    # ----- batching -----
+
+    def _pending_rows(self) -> int:
+        return len(self._pending_checkpoints) + len(self._pending_writes) + len(self._pending_blobs)
+
+    def _maybe_flush(self) -> None:
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        if (self._pending_rows() >= checkpoint_batch_size
+                or time.monotonic() - self._pending_since >= checkpoint_flush_seconds):
+            self.flush()
+
+    def _flush_periodically(self) -> None:
+        """Flush pending rows once they are checkpoint_flush_seconds old, even when no new rows arrive."""
+        while not self._closed.wait(checkpoint_flush_seconds):
+            with self._lock:
+                if self._closed.is_set() or self._pending_since is None:
+                    continue
+                if time.monotonic() - self._pending_since < checkpoint_flush_seconds:
+                    continue
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Failed to flush checkpoints: {e}")
+
+    def flush(self) -> None:
+        """Write all pending rows to SQLite in a single transaction."""
+        with self._lock:
+            rows = self._pending_rows()
+            if not rows:
+                return
+            size = sum(len(row[4]) + len(row[6]) for row in self._pending_checkpoints)
+            size += sum(len(row[7]) for row in self._pending_writes)
+            size += sum(len(row[5]) for row in self._pending_blobs)
+            started = time.perf_counter()
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._pending_checkpoints
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending_writes
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", self._pending_blobs
+                )
+            elapsed = time.perf_counter() - started
+            self._pending_checkpoints, self._pending_writes, self._pending_blobs = [], [], []
+            self._pending_since = None
+            self.metrics.flushes += 1
+            self.metrics.rows += rows
+            self.metrics.bytes += size
+            self.metrics.flush_seconds += elapsed
+            self.metrics.max_flush_seconds = max(self.metrics.max_flush_seconds, elapsed)
+
+    def close(self) -> None:
+        """Flush pending rows and close the database."""
+        with self._lock:
+            self._closed.set()
+            self.flush()
+            self._conn.close()
+
+    # ----- researcher results -----
+
+    def get_researcher_result(self, thread_id: str, tool_call_id: str) -> dict | None:
+        """Load the stored result of a finished researcher, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value_type, value FROM researcher_results WHERE thread_id = ? AND tool_call_id = ?",
+                (thread_id, tool_call_id)
+            ).fetchone()
+        return self.serde.loads_typed(row) if row is not None else None
+
+    def put_researcher_result(self, thread_id: str, tool_call_id: str, result: dict) -> None:
+        """Store the result of a finished researcher, immediately rather than batched."""
+        value_type, value = self.serde.dumps_typed(result)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO researcher_results VALUES (?, ?, ?, ?, ?)",
+                (thread_id, tool_call_id, value_type, value, time.time())
+            )
+
+_checkpointer: BatchedSqliteSaver | None = None
+
+def get_checkpointer() -> BatchedSqliteSaver | None:
+    """Get the process-wide checkpointer, or None when checkpointing is disabled."""
+    global _checkpointer
+    if _checkpointer is None and checkpoint_db_path:
+        _checkpointer = BatchedSqliteSaver(checkpoint_db_path)
+        atexit.register(_checkpointer.flush)
+    return _checkpointer
+
+def flush_checkpoints() -> None:
+    """Write the process-wide checkpointer's pending rows to SQLite now, if checkpointing is enabled."""
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return
+    try:
+        checkpointer.flush()
+    except Exception as e:
+        print(f"Failed to flush checkpoints: {e}")
+
+# ===== RESEARCHER RESULTS =====
+
+def _current_thread_id() -> str | None:
+    """Get the thread_id of the running graph, or None outside of a checkpointed run."""
+    try:
+        from langgraph.config import get_config
+        thread_id = get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:
+        return None
+    return str(thread_id) if thread_id is not None else None
+
+def load_researcher_result(tool_call_id: str) -> dict | None:
+    """Look up the result a researcher stored for this tool call in an earlier attempt of the run."""
+    checkpointer = get_checkpointer()
+    thread_id = _current_thread_id()
+    if checkpointer is None or thread_id is None:
+        return None
+    try:
+        return checkpointer.get_researcher_result(thread_id, tool_call_id)
+    except Exception as e:
+        print(f"Failed to load stored researcher result: {e}")
+        return None
+
+def save_researcher_result(tool_call_id: str, result: dict) -> None:
+    """Store a finished researcher's result so a resumed run does not repeat it."""
+    checkpointer = get_checkpointer()
+    thread_id = _current_thread_id()
+    if checkpointer is None or thread_id is None:
+        return
+    try:
+        checkpointer.put_researcher_result(thread_id, tool_call_id, result)
+    except Exception as e:
+        print(f"Failed to store researcher result: {e}")
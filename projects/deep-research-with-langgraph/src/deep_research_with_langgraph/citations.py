@@ -0,0 +1,249 @@
+"""Per-Run Citation Registry.
+
+Compressed notes and Sonar answers used to repeat full URLs, and the final writer had
+to deduplicate and renumber them in its prompt. This module gives every canonical URL
+a short, stable source ID (e.g. [S12]) the first time a search tool sees it:
+
+- search tools label each source with its ID, so researchers and compression only
+  need to carry the IDs
+- compact_citations() rewrites any URLs that still slip into notes into IDs
+- render_bibliography() renumbers the IDs cited by the final report in order of
+  first use and appends the source list, deterministically, after generation
+
+Every run numbers its sources in its own registry, which nodes select with
+use_citation_registry(run_id); researchers, tools and report generation started from
+the node then use the same registry. Notes and stored researcher results keep the
+sources they cite (see cited_sources()), and a run resumed in another process
+restores its registry from them, so an ID keeps pointing to the same URL for the
+whole run. Registries of finished runs are dropped. Text that outlives the run
+(such as the research memo) is stored with expand_citations(), which turns the IDs
+back into links.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ===== CONFIGURATION =====
+
+# Prefix of the source IDs; IDs look like [S12]
+source_id_prefix = "S"
+
+# Query parameters that only track the visitor and do not change the page
+tracking_parameters = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "spm"}
+
+# Maximum number of runs whose registries are kept in memory; the least recently used are dropped
+max_run_registries = 256
+
+# ===== URL CANONICALIZATION =====
+
+def _keep_parameter(key: str) -> bool:
+    return key not in tracking_parameters and not key.startswith("utm_")
+
+def clean_url(url: str) -> str:
+    """Remove tracking parameters and the fragment from a URL, keeping everything else as is."""
+    parts = urlsplit(url.strip())
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if _keep_parameter(key)
+    ])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so that trivially different links map to the same source.
+
+    Lowercases the scheme and host, drops "www.", default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query parameters.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if _keep_parameter(key)
+    ))
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower() or "https", host, path, query, ""))
+
+# ===== REGISTRY =====
+
+@dataclass
+class Source:
+    """A registered source."""
+
+    id: str
+    url: str
+    title: str
+
+_url_pattern = r"https?://[^\s<>()\[\]\"']+[^\s<>()\[\]\"'.,;:!?]"
+_markdown_link = re.compile(r"\[([^\]\n]+)\]\((" + _url_pattern + r")\)")
+_bare_url = re.compile(_url_pattern)
+_source_id = re.compile(r"\[(" + re.escape(source_id_prefix) + r"\d+)\]")
+_cited_source_id = re.compile(r"( ?)\[(" + re.escape(source_id_prefix) + r"\d+)\]")
+
+class CitationRegistry:
+    """Assigns short, stable IDs to canonical URLs, in order of first sight."""
+
+    def __init__(self):
+        self._by_url: dict[str, Source] = {}
+        self._by_id: dict[str, Source] = {}
+        self._next_number = 1
+        self._lock = threading.Lock()
+
+    def register(self, url: str, title: str = "") -> str:
+        """Get the ID of a URL, registering it on first sight.
+
+        A title seen later fills in a source that was registered without one.
+        """
+        canonical = canonicalize_url(url)
+        with self._lock:
+            source = self._by_url.get(canonical)
+            if source is None:
+                source = Source(id=f"{source_id_prefix}{self._next_number}", url=clean_url(url), title=title.strip())
+                self._next_number += 1
+                self._by_url[canonical] = source
+                self._by_id[source.id] = source
+            elif title and not source.title:
+                source.title = title.strip()
+            return source.id
+
+    def get(self, source_id: str) -> Source | None:
+        """Look up a source by its ID."""
+        return self._by_id.get(source_id)
+
+    def cited_sources(self, text: str) -> dict[str, dict]:
+        """The sources whose IDs a text cites, keyed by ID, for storing next to the text."""
+        sources = {}
+        for source_id in _source_id.findall(text):
+            source = self.get(source_id)
+            if source is not None:
+                sources[source_id] = {"url": source.url, "title": source.title}
+        return sources
+
+    def restore(self, sources: dict[str, dict]) -> None:
+        """Register sources under the IDs they were given earlier, e.g. before a restart.
+
+        IDs the registry already uses keep their source, and new sources are
+        numbered after the highest restored ID.
+        """
+        with self._lock:
+            for source_id, stored in sources.items():
+                number = source_id.removeprefix(source_id_prefix)
+                if source_id in self._by_id or not number.isdigit():
+                    continue
+                source = Source(id=source_id, url=stored["url"], title=stored.get("title", ""))
+                self._by_id[source_id] = source
+                self._by_url.setdefault(canonicalize_url(source.url), source)
+                self._next_number = max(self._next_number, int(number) + 1)
+
+    def compact(self, text: str) -> str:
+        """Replace the links and bare URLs in a text with source IDs."""
+        text = _markdown_link.sub(lambda m: f"{m.group(1)} [{self.register(m.group(2), m.group(1))}]", text)
+        return _bare_url.sub(lambda m: f"[{self.register(m.group(0))}]", text)
+
+    def expand(self, text: str) -> str:
+        """Replace the source IDs in a text with markdown links, for storage outside the process."""
+        def link(match: re.Match) -> str:
+            source = self.get(match.group(1))
+            if source is None:
+                return match.group(0)
+            return f"[{source.title or source.url}]({source.url})"
+        return _source_id.sub(link, text)
+
+    def render_bibliography(self, text: str) -> str:
+        """Renumber the source IDs cited in a report and append its source list.
+
+        IDs become [1], [2], ... in order of first use. IDs the registry does not
+        know are removed rather than rendered as dangling citations.
+        """
+        numbers: dict[str, int] = {}
+        sources: list[Source] = []
+
+        def cite(match: re.Match) -> str:
+            source = self.get(match.group(2))
+            if source is None:
+                return ""
+            if source.id not in numbers:
+                numbers[source.id] = len(sources) + 1
+                sources.append(source)
+            return f"{match.group(1)}[{numbers[source.id]}]"
+
+        body = _cited_source_id.sub(cite, text).rstrip()
+        if not sources:
+            return body
+        source_list = "\n".join(
+            f"[{numbers[source.id]}] {source.title or source.url}: {source.url}" for source in sources
+        )
+        return f"{body}\n\n### Sources\n\n{source_list}"
+
+# Registry used outside of a run selected with use_citation_registry()
+_default_registry = CitationRegistry()
+
+# Registries of the runs in progress in this process, keyed by run id
+_run_registries: OrderedDict[str, CitationRegistry] = OrderedDict()
+_run_registries_lock = threading.Lock()
+
+# Registry used by the current context
+_current_registry: ContextVar[CitationRegistry | None] = ContextVar("current_citation_registry", default=None)
+
+def use_citation_registry(run_id: str, sources: dict[str, dict] | None = None) -> CitationRegistry:
+    """Select the registry of a run in the current node.
+
+    Researchers, tools and summarizations started from the node use the same
+    registry. A run not seen before in this process (e.g. one resumed from a
+    checkpoint) gets a new registry, restored from the sources given.
+
+    Args:
+        run_id: Id of the run, e.g. its progress_id
+        sources: Sources cited by the run's notes so far, see sources_of_notes()
+    """
+    with _run_registries_lock:
+        registry = _run_registries.get(run_id)
+        if registry is None:
+            registry = _run_registries[run_id] = CitationRegistry()
+            while len(_run_registries) > max_run_registries:
+                _run_registries.popitem(last=False)
+        _run_registries.move_to_end(run_id)
+    if sources:
+        registry.restore(sources)
+    _current_registry.set(registry)
+    return registry
+
+def finish_citation_registry(run_id: str) -> None:
+    """Drop the registry of a finished run."""
+    with _run_registries_lock:
+        _run_registries.pop(run_id, None)
+
+def sources_of_notes(notes: list[dict]) -> dict[str, dict]:
+    """Merge the sources stored with research notes."""
+    sources = {}
+    for note in notes:
+        sources.update(note.get("sources", {}))
+    return sources
+
+def get_citation_registry() -> CitationRegistry:
+    """Get the registry of the current run, or the process-wide one outside of a run."""
+    return _current_registry.get() or _default_registry
+
+def register_source(url: str, title: str = "") -> str:
+    """Get the source ID of a URL from the current run's registry."""
+    return get_citation_registry().register(url, title)
+
+def compact_citations(text: str) -> str:
+    """Replace links and bare URLs with source IDs using the current run's registry."""
+    return get_citation_registry().compact(text)
+
+def cited_sources(text: str) -> dict[str, dict]:
+    """The sources a text cites, from the current run's registry."""
+    return get_citation_registry().cited_sources(text)
+
+def expand_citations(text: str) -> str:
+    """Replace source IDs with markdown links using the current run's registry."""
+    return get_citation_registry().expand(text)
+
+def render_bibliography(text: str) -> str:
+    """Renumber a report's source IDs and append its source list."""
+    return get_citation_registry().render_bibliography(text)
@@ -0,0 +1,250 @@
+"""Hierarchical Research Compression.
+
+This module implements an incremental, token-bounded alternative to the single-pass
+compression step of the researcher agents. Each search tool output is compressed into
+partial notes in a background task as soon as it arrives, partial notes are merged in
+small groups while the researcher keeps searching, and a short final merge produces
+the compressed research once the researcher stops.
+
+Because every model call only ever sees one tool output or a fixed number of partial
+notes, the cost of the final compression step no longer grows with research depth.
+
+The compressor also keeps the raw tool outputs of its researcher, so that findings
+can be salvaged without any further model call when a researcher is cancelled
+before reaching its own compression step.
+"""
+
+import asyncio
+
+from langchain.chat_models import init_chat_model
+from langchain_core.messages import HumanMessage
+
+from deep_research_with_langgraph.prompts import partial_compression_prompt, merge_compressions_prompt
+from deep_research_with_langgraph.utils import get_today_str
+from deep_research_with_langgraph.resilience import resilient_call
+from deep_research_with_langgraph.batch_api import batch_mode_enabled, invoke_model
+
+# ===== CONFIGURATION =====
+
+# Compression strategy used by the researcher agents:
+# - "single_pass": compress the whole researcher message history once at the end
+# - "hierarchical": compress tool outputs in the background and merge the partials
+compression_mode = "hierarchical"
+
+# Tools whose outputs carry research content; think_tool reflections are never compressed
+compressible_tools = {"tavily_search", "sonar_tool"}
+
+# Output budget for the notes of a single tool output
+max_partial_compression_tokens = 2000
+
+# Output budget for every merge step, including the final one
+max_merge_tokens = 6000
+
+# Number of partial notes combined by a single merge call
+merge_fan_in = 4
+
+# Total characters of raw tool output kept by a salvage, for outputs without finished partial notes
+salvage_raw_chars = 24000
+
+# Timeouts and retries are handled by the resilience layer under the compress_research call site
+partial_compression_model = init_chat_model(
+    "gpt-4.1-mini", model_provider="openai", max_retries=0, temperature=0, max_tokens=max_partial_compression_tokens
+)
+merge_model = init_chat_model(
+    "gpt-4.1-mini", model_provider="openai", max_retries=0, temperature=0, max_tokens=max_merge_tokens
+)
+
+# ===== MERGING =====
+
+async def merge_partial_notes(research_topic: str, partial_notes: list[str]) -> str:
+    """Merge independently written research notes on one topic with a bounded model call.
+
+    Falls back to the concatenated notes if the merge call fails.
+    """
+    partial_notes = [notes for notes in partial_notes if notes.strip()]
+    if not partial_notes:
+        return ""
+
+    formatted_notes = "\n\n".join(
+        f"--- PARTIAL NOTES {i} ---\n{notes}" for i, notes in enumerate(partial_notes, 1)
+    )
+    try:
+        messages = [
+            HumanMessage(content=merge_compressions_prompt.format(
+                research_topic=research_topic,
+                partial_notes=formatted_notes,
+                date=get_today_str()
+            ))
+        ]
+        response = await invoke_model("compress_research", "openai", merge_model, messages)
+        return str(response.content)
+
+    except Exception as e:
+        print(f"Failed to merge partial compressions: {str(e)}")
+        return formatted_notes
+
+# ===== HIERARCHICAL COMPRESSOR =====
+
+class HierarchicalCompressor:
+    """Incrementally compress the tool outputs of a single researcher.
+
+    Partial compressions are kept as a tree of asyncio tasks: level 0 holds one
+    task per tool output and every time a level accumulates `merge_fan_in` tasks
+    they are merged into a single task on the next level. Nothing is awaited until
+    `finalize` is called, so compression overlaps with the researcher's own work.
+    """
+
+    def __init__(self, research_topic: str):
+        self.research_topic = research_topic
+        self.tool_outputs: list[str] = []
+        self._levels: list[list[asyncio.Task]] = []
+
+    def add_tool_output(self, tool_name: str, tool_args: dict, tool_output: str) -> None:
+        """Record a tool output and, in hierarchical mode, schedule its background compression.
+
+        Background compression only saves latency, so it is skipped in batch execution
+        mode, where the researcher is compressed in a single batched call instead.
+        """
+        self.tool_outputs.append(tool_output)
+        if compression_mode != "hierarchical" or batch_mode_enabled():
+            return
+
+        task = asyncio.create_task(self._compress_tool_output(tool_name, tool_args, tool_output))
+        self._push(0, task)
+
+    def _push(self, level: int, task: asyncio.Task) -> None:
+        """Add a task to a level of the tree and merge the level once it is full."""
+        if len(self._levels) <= level:
+            self._levels.append([])
+        self._levels[level].append(task)
+
+        if len(self._levels[level]) >= merge_fan_in:
+            group, self._levels[level] = self._levels[level], []
+            self._push(level + 1, asyncio.create_task(self._merge_tasks(group)))
+
+    async def _compress_tool_output(self, tool_name: str, tool_args: dict, tool_output: str) -> str:
+        """Compress one tool output, falling back to a truncated copy on failure."""
+        try:
+            messages = [
+                HumanMessage(content=partial_compression_prompt.format(
+                    research_topic=self.research_topic,
+                    tool_name=tool_name,
+                    tool_args=tool_args,
+                    tool_output=tool_output,
+                    date=get_today_str()
+                ))
+            ]
+            response = await resilient_call(
+                "compress_research", "openai",
+                lambda: partial_compression_model.ainvoke(messages, config={"tags": ["span:compress_tool_output"]})
+            )
+            return str(response.content)
+
+        except Exception as e:
+            print(f"Failed to compress tool output: {str(e)}")
+            return tool_output[:4000] + "..." if len(tool_output) > 4000 else tool_output
+
+    async def _merge_tasks(self, tasks: list[asyncio.Task]) -> str:
+        """Wait for a group of partial compressions and merge them."""
+        return await self._merge(list(await asyncio.gather(*tasks)))
+
+    async def _merge(self, partial_notes: list[str]) -> str:
+        """Merge partial notes with a bounded model call."""
+        return await merge_partial_notes(self.research_topic, partial_notes)
+
+    def pending_tasks(self) -> list[asyncio.Task]:
+        """Return every task that is still part of the compression tree."""
+        return [task for level in self._levels for task in level]
+
+    async def finalize(self) -> str:
+        """Merge everything compressed so far into the final compressed research.
+
+        Higher levels hold the earliest tool outputs, so results are collected from
+        the top of the tree down to keep the notes in chronological order.
+        """
+        partial_notes = []
+        for level in reversed(self._levels):
+            partial_notes.extend(await asyncio.gather(*level))
+        self._levels = []
+
+        # Reduce in groups of merge_fan_in so the final merge input stays bounded
+        while len(partial_notes) > merge_fan_in:
+            groups = [partial_notes[i:i + merge_fan_in] for i in range(0, len(partial_notes), merge_fan_in)]
+            partial_notes = list(await asyncio.gather(*(self._merge(group) for group in groups)))
+
+        return await self._merge(partial_notes)
+
+    def cancel(self) -> None:
+        """Cancel all outstanding compression tasks."""
+        for task in self.pending_tasks():
+            task.cancel()
+        self._levels = []
+
+    def salvage(self) -> str:
+        """Collect the findings of a researcher that was cut short, without a model call.
+
+        Researchers are cut short when the provider is slow, so another model call
+        would likely be slow as well. Partial notes that already finished are used as
+        they are; the tool outputs whose compression did not finish are included raw,
+        truncated to salvage_raw_chars in total. Outstanding tasks are cancelled.
+        """
+        if not self.tool_outputs:
+            return ""
+
+        # Every task at level L covers merge_fan_in ** L consecutive tool outputs,
+        # and higher levels hold the earliest ones
+        pieces: list[tuple[str, bool]] = []
+        start = 0
+        for level in reversed(range(len(self._levels))):
+            covered = merge_fan_in ** level
+            for task in self._levels[level]:
+                outputs = self.tool_outputs[start:start + covered]
+                start += covered
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    pieces.append((task.result(), True))
+                else:
+                    pieces.extend((output, False) for output in outputs)
+        pieces.extend((output, False) for output in self.tool_outputs[start:])
+        self.cancel()
+
+        raw_count = sum(1 for _, compressed in pieces if not compressed)
+        per_output_chars = max(salvage_raw_chars // raw_count, 500) if raw_count else 0
+        return "\n\n".join(
+            text if compressed else text[:per_output_chars]
+            for text, compressed in pieces if text.strip()
+        )
+
+# ===== COMPRESSOR REGISTRY =====
+
+# Compressors are process-local and keyed by research_id; graph state only holds the id
+_compressors: dict[str, HierarchicalCompressor] = {}
+
+def get_compressor(research_id: str, research_topic: str) -> HierarchicalCompressor:
+    """Get the compressor for a researcher, creating it on first use."""
+    if research_id not in _compressors:
+        _compressors[research_id] = HierarchicalCompressor(research_topic)
+    return _compressors[research_id]
+
+def pop_compressor(research_id: str) -> HierarchicalCompressor | None:
+    """Remove and return the compressor for a researcher, if one exists."""
+    return _compressors.pop(research_id, None)
+
+def pop_compressors(research_id: str) -> list[HierarchicalCompressor]:
+    """Remove and return the compressors of a researcher and of any sub-researchers.
+
+    Composite researchers (such as the hybrid backend) run several researchers
+    under ids of the form "<research_id>:<name>".
+    """
+    keys = [key for key in _compressors if key == research_id or key.startswith(f"{research_id}:")]
+    return [_compressors.pop(key) for key in keys]
+
+def observe_tool_outputs(research_id: str, research_topic: str, tool_calls: list[dict], observations: list[str]) -> None:
+    """Hand freshly executed tool outputs to the researcher's compressor.
+
+    Outputs are always recorded so they can be salvaged; they are only compressed
+    in the background when hierarchical compression is enabled.
+    """
+    compressor = get_compressor(research_id, research_topic)
+    for tool_call, observation in zip(tool_calls, observations):
+        if tool_call["name"] in compressible_tools:
+            compressor.add_tool_output(tool_call["name"], tool_call["args"], str(observation))
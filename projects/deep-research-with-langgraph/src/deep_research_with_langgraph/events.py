@@ -0,0 +1,36 @@
+"""Structured Events for the LangGraph Custom Stream.
+
+Nodes use this module to report progress while they run. Events are written to the
+LangGraph custom stream and can be consumed by clients with stream_mode="custom".
+Most events come from inside the supervisor subgraph, so stream with subgraphs=True:
+
+    async for namespace, event in agent.astream(inputs, stream_mode="custom", subgraphs=True):
+        print(event["event"], event)
+
+Every event is a flat dictionary with an "event" name and a "timestamp".
+"""
+
+import time
+
+from langgraph.config import get_stream_writer
+
+def emit_event(event: str, **payload) -> dict:
+    """Write a structured event to the LangGraph custom stream.
+
+    Events emitted outside of a running graph are silently dropped, so helpers
+    can report progress without knowing how they are being invoked.
+
+    Args:
+        event: Name of the event, e.g. "researcher_finished"
+        **payload: JSON-serializable event fields
+
+    Returns:
+        The event that was emitted
+    """
+    record = {"event": event, "timestamp": time.time(), **payload}
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return record
+    writer(record)
+    return record
@@ -0,0 +1,147 @@
+"""Fast-Path Routing for Narrow Research Briefs.
+
+Every request used to go through the full supervisor planning loop, even when the
+brief is a single factual question. This module classifies the brief right after it
+is written and sends simple briefs straight to a single researcher (or a single
+Sonar call), skipping the supervisor's planning round-trips.
+
+The classification is either a cheap local heuristic or a small-model call, and the
+decision is recorded in the `routing_decision` state field.
+"""
+
+import re
+from uuid import uuid4
+
+from langchain.chat_models import init_chat_model
+from langchain_core.messages import HumanMessage
+from langgraph.types import Command
+from typing_extensions import Literal
+
+from deep_research_with_langgraph.state_scope import AgentState, BriefComplexity
+from deep_research_with_langgraph.prompts import brief_complexity_prompt
+from deep_research_with_langgraph.utils import get_today_str
+from deep_research_with_langgraph.citations import sources_of_notes, use_citation_registry
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.progress import report_progress, use_run_progress
+from deep_research_with_langgraph.resilience import resilient_call
+from deep_research_with_langgraph.research_backends import get_research_backend
+from deep_research_with_langgraph.multi_agent_supervisor import record_research_note, run_researcher
+
+# ===== CONFIGURATION =====
+
+# How briefs are classified: "heuristic", "model", or "off" to always use the supervisor
+fast_path_classifier = "heuristic"
+
+# What answers a simple brief: "researcher" (one researcher of the current research
+# mode) or "sonar_call" (a single Perplexity Sonar query)
+fast_path_backend = "researcher"
+
+# Briefs longer than this are never treated as simple by the heuristic
+max_simple_brief_words = 80
+
+# Phrases that signal a brief needs several lines of research
+complex_brief_markers = [
+    "compare", "comparison", "versus", " vs", "differences between", "pros and cons",
+    "landscape", "overview", "comprehensive", "in-depth", "analysis of", "analyze",
+    "trends", "strategies", "each of", "for each", "top 10", "top ten", "history of",
+]
+
+classifier_model = init_chat_model("gpt-4o-mini", model_provider="openai", max_retries=0, temperature=0)
+
+# ===== CLASSIFICATION =====
+
+def classify_brief_heuristically(research_brief: str) -> dict:
+    """Classify a brief with cheap text features.
+
+    A brief is simple when it is short, asks at most one question, has no
+    comparison or survey markers and does not enumerate many items.
+    """
+    text = research_brief.lower()
+    features = {
+        "words": len(text.split()),
+        "questions": text.count("?"),
+        "markers": [marker.strip() for marker in complex_brief_markers if marker in text],
+        "enumerations": len(re.findall(r",|;|\band\b|^\s*(?:\d+[.)]|[-*])\s", text, flags=re.MULTILINE)),
+    }
+    simple = (
+        features["words"] <= max_simple_brief_words
+        and features["questions"] <= 1
+        and not features["markers"]
+        and features["enumerations"] <= 3
+    )
+    if simple:
+        reason = "short single-question brief without comparison or survey markers"
+    elif features["markers"]:
+        reason = f"brief contains complexity markers: {', '.join(features['markers'])}"
+    else:
+        reason = "brief is long or asks several questions"
+    return {"complexity": "simple" if simple else "complex", "reason": reason, "features": features}
+
+async def classify_brief_with_model(research_brief: str) -> dict:
+    """Classify a brief with a small-model structured output call."""
+    structured_model = classifier_model.with_structured_output(BriefComplexity)
+    messages = [HumanMessage(content=brief_complexity_prompt.format(research_brief=research_brief, date=get_today_str()))]
+    response = await resilient_call("route_research_brief", "openai", lambda: structured_model.ainvoke(messages))
+    return {"complexity": response.complexity, "reason": response.reason}
+
+# ===== WORKFLOW NODES =====
+
+async def route_research_brief(state: AgentState) -> Command[Literal["fast_path_research", "supervisor_subgraph"]]:
+    """Send simple briefs to the fast path and everything else to the supervisor.
+
+    Falls back to the supervisor if classification fails.
+    """
+    research_brief = state.get("research_brief", "") or ""
+
+    if fast_path_classifier == "off":
+        decision = {"complexity": "complex", "reason": "fast path disabled"}
+    elif fast_path_classifier == "model":
+        try:
+            decision = await classify_brief_with_model(research_brief)
+        except Exception as e:
+            print(f"Failed to classify research brief: {e}")
+            decision = {"complexity": "complex", "reason": f"classification failed: {e}"}
+    else:
+        decision = classify_brief_heuristically(research_brief)
+
+    route = "fast_path_research" if decision["complexity"] == "simple" else "supervisor_subgraph"
+    routing_decision = {
+        "route": "fast_path" if route == "fast_path_research" else "supervisor",
+        "classifier": fast_path_classifier,
+        **decision,
+    }
+    emit_event("brief_routed", **routing_decision)
+
+    return Command(goto=route, update={"routing_decision": routing_decision})
+
+async def fast_path_research(state: AgentState):
+    """Answer a simple brief with a single researcher or a single Sonar call.
+
+    Produces the same notes as the supervisor would, so final report generation
+    works unchanged.
+    """
+    research_brief = state.get("research_brief", "") or ""
+    progress_id = state.get("progress_id") or uuid4().hex
+    use_run_progress(progress_id, "research")
+    use_citation_registry(progress_id, sources_of_notes(state.get("notes", [])))
+    report_progress("researchers_planned", {"researchers_planned": 1})
+    # Keyed by the run, so a resumed run finds the researcher's stored result
+    tool_call = {
+        "name": "ConductResearch",
+        "id": f"fast_path_{progress_id}",
+        "args": {"research_topic": research_brief},
+    }
+
+    if fast_path_backend == "sonar_call":
+        from deep_research_with_langgraph.sonar_agent import sonar_tool
+        result = {"compressed_research": str(await sonar_tool.ainvoke({"query": research_brief})), "raw_notes": []}
+    else:
+        agent_to_call = get_research_backend(state.get("research_mode", "tavily"))
+        _, result = await run_researcher(agent_to_call, tool_call, research_brief)
+
+    note = record_research_note(tool_call, result)
+    return {
+        "notes": [note],
+        "raw_notes": [note["raw_notes_ref"]],
+        "research_events": result.get("research_events", []),
+    }
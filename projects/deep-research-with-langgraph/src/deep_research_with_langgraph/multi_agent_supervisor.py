@@ -10,13 +10,29 @@ maintaining isolated context windows for each research topic.
 """
 
 import asyncio
+from datetime import datetime
+from uuid import uuid4
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage, filter_messages
 from langgraph.graph import END, START, StateGraph
-from deep_research_with_langgraph.state_multi_agent_supervisor import ConductResearch, ResearchComplete, SupervisorState
+from deep_research_with_langgraph.state_multi_agent_supervisor import ConductResearch, ResearchComplete, ResearchNote, SupervisorState
+from deep_research_with_langgraph.batch_api import batch_mode_enabled
+from deep_research_with_langgraph.blob_store import get_blob_store, load_blobs
+from deep_research_with_langgraph.checkpointing import flush_checkpoints, load_researcher_result, save_researcher_result
+from deep_research_with_langgraph.citations import (
+    cited_sources, compact_citations, expand_citations, get_citation_registry, sources_of_notes, use_citation_registry
+)
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.progress import report_progress, use_run_progress
+from deep_research_with_langgraph.compression import merge_partial_notes, pop_compressors
+from deep_research_with_langgraph.resilience import resilient_call
+from deep_research_with_langgraph.research_backends import get_research_backend, is_good_result
+from deep_research_with_langgraph.research_memo import get_research_memo
+from deep_research_with_langgraph.topic_overlap import plan_topic_dispatch
+from deep_research_with_langgraph.supervisor_context import compact_supervisor_messages, digest_note
+from deep_research_with_langgraph.token_counting import count_tokens
 from deep_research_with_langgraph.utils import think_tool, get_today_str
-from deep_research_with_langgraph.prompts import lead_researcher_prompt
-from deep_research_with_langgraph.prompts import lead_researcher_prompt
+from deep_research_with_langgraph.prompts import lead_researcher_prompt, research_memo_seed_message
 from langgraph.types import Command
 from typing_extensions import Literal
 
@@ -37,6 +53,53 @@ def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
     """
     return [tool_msg.content for tool_msg in filter_messages(messages, include_types="tool")]
 
+def record_research_note(tool_call: dict, result: dict) -> ResearchNote:
+    """Record the outcome of a single ConductResearch call as a structured note.
+
+    Researchers already keep their raw notes in the blob store, so the note only
+    carries a single reference to them. Any URLs left in the findings are replaced
+    with source IDs from the run's citation registry, the sources the findings
+    cite are kept next to them, and a digest of the findings is kept for the
+    supervisor's later turns.
+
+    Args:
+        tool_call: The ConductResearch tool call that launched the researcher
+        result: Output of the researcher subgraph
+
+    Returns:
+        Research note keyed by the tool call id
+    """
+    raw_notes_refs = result.get("raw_notes", [])
+    if len(raw_notes_refs) == 1:
+        raw_notes_ref = raw_notes_refs[0]
+    else:
+        raw_notes_ref = get_blob_store().put("\n".join(load_blobs(raw_notes_refs)))
+    content = compact_citations(str(result.get("compressed_research", "Error synthesizing research report")))
+    # Without compressed research the report falls back to the raw notes, which cite their own sources
+    cited_text = content if content != "Error synthesizing research report" else next(load_blobs([raw_notes_ref]), "")
+    return {
+        "tool_call_id": tool_call["id"],
+        "research_topic": tool_call["args"]["research_topic"],
+        "content": content,
+        "raw_notes_ref": raw_notes_ref,
+        "digest": digest_note(tool_call["args"]["research_topic"], content),
+        "sources": {**result.get("sources", {}), **cited_sources(cited_text)},
+    }
+
+def get_note_findings(note: ResearchNote) -> str:
+    """Get the findings of a research note for report generation.
+
+    Uses the compressed research when available and only loads the raw notes
+    from the blob store when the researcher failed to produce it.
+    """
+    content = note["content"]
+    if content and content != "Error synthesizing research report":
+        return content
+    try:
+        return next(load_blobs([note["raw_notes_ref"]]))
+    except KeyError:
+        return content
+
 # Ensure async compatibility for Jupyter environments
 try:
     import nest_asyncio
@@ -53,7 +116,8 @@ except ImportError:
 # ===== CONFIGURATION =====
 
 supervisor_tools = [ConductResearch, ResearchComplete, think_tool]
-supervisor_model = init_chat_model("gpt-4o-mini", model_provider="openai" ,timeout=30, temperature=0)
+# Timeouts and retries are handled per call site by the resilience layer
+supervisor_model = init_chat_model("gpt-4o-mini", model_provider="openai", max_retries=0, temperature=0)
 supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
 
 # System constants
@@ -65,6 +129,333 @@ max_researcher_iterations = 6 # Calls to think_tool + ConductResearch
 # This is passed to the lead_researcher_prompt to limit parallel research tasks
 max_concurrent_researchers = 3
 
+# Number of researcher results the supervisor waits for before its next planning turn
+# None waits for every researcher; stragglers are otherwise delivered on a later turn
+research_quorum = None
+
+# Whether overlapping ConductResearch topics are merged or dropped before dispatch
+detect_topic_overlap = True
+
+# Wall-clock deadline for a single researcher, in seconds (None disables the deadline)
+researcher_deadline_seconds = 300
+
+# Deadline in batch execution mode, where summaries and compression wait for the batch
+# endpoint for hours; None disables it
+batch_researcher_deadline_seconds = None
+
+# Placeholder returned for a ConductResearch call whose researcher is still running
+pending_research_message = (
+    "Research on this topic is still running. Its findings will be delivered in a later turn; "
+    "do not request the same research again."
+)
+
+# ===== RESEARCH FAN-OUT =====
+
+# Researchers still running after the supervisor moved on, keyed by research_run_id
+_pending_research: dict[str, list[asyncio.Task]] = {}
+
+async def salvage_research(tool_call: dict, event: str, reason: str) -> dict:
+    """Recover whatever a failed or timed-out researcher gathered before it stopped.
+
+    The partial notes and tool outputs recorded by the researcher's compressor are
+    collected without another model call, so partial findings still reach the
+    supervisor and the report even when the provider is what made the researcher slow.
+
+    Args:
+        tool_call: The ConductResearch tool call whose researcher stopped
+        event: Name of the structured event to record
+        reason: Human-readable reason the researcher stopped
+
+    Returns:
+        Researcher output with salvaged findings and the recorded event
+    """
+    compressors = pop_compressors(tool_call["id"])
+    salvaged = [compressor.salvage() for compressor in compressors]
+    compressed_research = "\n\n".join(findings for findings in salvaged if findings)
+    raw_notes = [output for compressor in compressors for output in compressor.tool_outputs]
+
+    research_event = emit_event(
+        event,
+        tool_call_id=tool_call["id"],
+        research_topic=tool_call["args"]["research_topic"],
+        reason=reason,
+        salvaged_tool_outputs=len(raw_notes)
+    )
+
+    if compressed_research:
+        compressed_research = f"[Partial findings - the researcher stopped early: {reason}]\n\n{compressed_research}"
+    else:
+        compressed_research = f"Research on this topic could not be completed: {reason}"
+
+    return {
+        "compressed_research": compressed_research,
+        "raw_notes": [get_blob_store().put("\n".join(raw_notes))],
+        "research_events": [research_event]
+    }
+
+async def run_researcher(agent_to_call, tool_call: dict, research_brief: str) -> tuple[dict, dict]:
+    """Run a single researcher for a ConductResearch tool call.
+
+    In a checkpointed run the result is stored as soon as the researcher finishes,
+    together with the sources it cites, and a resumed run returns the stored result
+    instead of researching again.
+
+    Returns:
+        The tool call together with the researcher's output
+    """
+    stored = load_researcher_result(tool_call["id"])
+    if stored is not None:
+        emit_event(
+            "researcher_resumed",
+            tool_call_id=tool_call["id"],
+            research_topic=tool_call["args"]["research_topic"]
+        )
+        get_citation_registry().restore(stored.get("sources", {}))
+        return tool_call, stored
+
+    tool_call, result = await _run_researcher(agent_to_call, tool_call, research_brief)
+    result = {**result, "sources": cited_sources(str(result.get("compressed_research", "")))}
+    save_researcher_result(tool_call["id"], result)
+    return tool_call, result
+
+async def _run_researcher(agent_to_call, tool_call: dict, research_brief: str) -> tuple[dict, dict]:
+    """Research a ConductResearch tool call, without the checkpointed result store.
+
+    When the research memo has fresh findings for a near-identical topic, they are
+    returned without running a researcher; findings for a related topic seed a
+    shorter follow-up researcher instead.
+
+    The researcher is cancelled when it exceeds researcher_deadline_seconds (or
+    batch_researcher_deadline_seconds in batch execution mode), and its partial
+    findings are salvaged instead of being lost. A researcher that
+    raises is handled the same way, so one failure never ends the whole run.
+
+    Returns:
+        The tool call together with the researcher's output
+    """
+    research_topic = tool_call["args"]["research_topic"]
+    memo = get_research_memo()
+    memo_hit = await asyncio.to_thread(memo.lookup, research_topic) if memo is not None else None
+    if memo_hit is not None and memo_hit.entry.raw_notes_ref not in get_blob_store():
+        # The memo outlives in-memory blobs (restarts, LRU eviction), and notes need their raw notes
+        memo_hit = None
+    # The memo stores links, since source IDs do not outlive the process
+    memo_findings = compact_citations(memo_hit.entry.compressed_research) if memo_hit is not None else ""
+
+    if memo_hit is not None:
+        emit_event(
+            "research_memo_hit",
+            tool_call_id=tool_call["id"],
+            research_topic=research_topic,
+            similarity=round(memo_hit.similarity, 3),
+            mode=memo_hit.mode
+        )
+        if memo_hit.mode == "answer":
+            return tool_call, {
+                "compressed_research": memo_findings,
+                "raw_notes": [memo_hit.entry.raw_notes_ref]
+            }
+
+    researcher_messages = [HumanMessage(content=research_topic)]
+    if memo_hit is not None:
+        researcher_messages.append(HumanMessage(content=research_memo_seed_message.format(
+            researched_at=datetime.fromtimestamp(memo_hit.entry.created_at).strftime("%a %b %-d, %Y"),
+            findings=memo_findings
+        )))
+
+    emit_event(
+        "researcher_started",
+        tool_call_id=tool_call["id"],
+        research_topic=research_topic
+    )
+    report_progress("researcher_started", {"researchers_started": 1}, research_topic=research_topic)
+    deadline_seconds = batch_researcher_deadline_seconds if batch_mode_enabled() else researcher_deadline_seconds
+    try:
+        async with asyncio.timeout(deadline_seconds):
+            result = await agent_to_call.ainvoke({
+                "researcher_messages": researcher_messages,
+                "research_topic": research_topic,
+                "research_id": tool_call["id"],
+                "research_brief": research_brief # Pass brief for context if needed
+            }, config={
+                "run_name": "researcher",
+                "metadata": {"research_topic": research_topic, "tool_call_id": tool_call["id"]}
+            })
+    except TimeoutError:
+        return tool_call, await salvage_research(
+            tool_call, "researcher_timeout", f"deadline of {deadline_seconds}s exceeded"
+        )
+    except Exception as e:
+        return tool_call, await salvage_research(tool_call, "researcher_failed", f"{type(e).__name__}: {e}")
+
+    if memo is not None and is_good_result(result):
+        try:
+            memo_result = result
+            if memo_hit is not None:
+                # The follow-up researcher only compressed its new findings
+                memo_result = {
+                    **result,
+                    "compressed_research": await merge_partial_notes(
+                        research_topic, [memo_findings, str(result["compressed_research"])]
+                    ),
+                    "raw_notes": [memo_hit.entry.raw_notes_ref] + list(result.get("raw_notes", []))
+                }
+            note = record_research_note(tool_call, memo_result)
+            memo.put(research_topic, expand_citations(note["content"]), note["raw_notes_ref"])
+            result = memo_result
+        except Exception as e:
+            # The researcher's own findings are still good without the memo
+            print(f"Failed to record research in the memo: {e}")
+
+    return tool_call, result
+
+def finished_research_fields(result: dict) -> dict:
+    """Findings of a finished researcher, as reported in its researcher_finished event."""
+    return {
+        "compressed_research": compact_citations(str(result.get("compressed_research", ""))),
+        "raw_notes_refs": list(result.get("raw_notes", [])),
+    }
+
+async def stream_research_results(tasks: list[asyncio.Task], quorum: int) -> list[tuple[dict, dict]]:
+    """Collect researcher results in completion order until a quorum is reached.
+
+    Each result is reported on the custom stream as soon as it finishes, with its
+    compressed research and raw notes references, so clients can use it right away
+    and a slow researcher no longer hides the progress of the others. Researchers that already
+    finished when the quorum is reached are collected as well.
+
+    Args:
+        tasks: Running researcher tasks created from run_researcher
+        quorum: Number of results to wait for
+
+    Returns:
+        List of (tool_call, result) pairs for every finished researcher
+    """
+    finished = []
+    for next_finished in asyncio.as_completed(tasks):
+        tool_call, result = await next_finished
+        finished.append((tool_call, result))
+        emit_event(
+            "researcher_finished",
+            tool_call_id=tool_call["id"],
+            research_topic=tool_call["args"]["research_topic"],
+            completed=len(finished),
+            total=len(tasks),
+            **finished_research_fields(result)
+        )
+        report_progress("researcher_finished", {"researchers_finished": 1}, research_topic=tool_call["args"]["research_topic"])
+        if len(finished) >= quorum:
+            break
+
+    finished_ids = {tool_call["id"] for tool_call, _ in finished}
+    for task in tasks:
+        if task.done() and task.result()[0]["id"] not in finished_ids:
+            finished.append(task.result())
+    return finished
+
+async def collect_pending_research(research_run_id: str, wait: bool) -> list[tuple[dict, dict]]:
+    """Collect results of researchers that outlived an earlier supervisor turn.
+
+    Args:
+        research_run_id: Id of the supervisor run that launched the researchers
+        wait: Whether to wait for researchers that are still running
+
+    Returns:
+        List of (tool_call, result) pairs for every researcher collected
+    """
+    pending = _pending_research.pop(research_run_id, [])
+    if wait and pending:
+        await asyncio.wait(pending)
+
+    collected = []
+    still_running = []
+    for task in pending:
+        if not task.done():
+            still_running.append(task)
+        elif task.exception() is not None:
+            print(f"Error in delayed research: {task.exception()}")
+        else:
+            tool_call, result = task.result()
+            collected.append((tool_call, result))
+            emit_event(
+                "researcher_finished",
+                tool_call_id=tool_call["id"],
+                research_topic=tool_call["args"]["research_topic"],
+                delayed=True,
+                **finished_research_fields(result)
+            )
+            report_progress("researcher_finished", {"researchers_finished": 1}, research_topic=tool_call["args"]["research_topic"])
+
+    if still_running:
+        _pending_research[research_run_id] = still_running
+    return collected
+
+def format_late_research(late_results: list[tuple[dict, dict]]) -> HumanMessage:
+    """Deliver findings of researchers that finished after their turn to the supervisor."""
+    sections = [
+        f"--- Delayed findings for ConductResearch call {tool_call['id']} ---\n"
+        f"Topic: {tool_call['args']['research_topic']}\n\n"
+        f"{result.get('compressed_research', 'Error synthesizing research report')}"
+        for tool_call, result in late_results
+    ]
+    return HumanMessage(content="Research that was still running has now finished:\n\n" + "\n\n".join(sections))
+
+# ===== TOPIC OVERLAP =====
+
+def plan_research_dispatch(conduct_research_calls: list[dict], notes: list[ResearchNote]) -> tuple[list[dict], list[ToolMessage]]:
+    """Merge or drop redundant ConductResearch calls before launching researchers.
+
+    Every call that is not dispatched as-is gets a ToolMessage explaining the
+    decision, so the supervisor can take it into account in its next turn.
+
+    Args:
+        conduct_research_calls: ConductResearch tool calls from the latest supervisor message
+        notes: Notes already recorded in earlier turns
+
+    Returns:
+        Tool calls to dispatch and ToolMessages for the calls that were merged or dropped
+    """
+    if not detect_topic_overlap:
+        return conduct_research_calls, []
+
+    plan = plan_topic_dispatch(
+        conduct_research_calls,
+        [(note["tool_call_id"], note["research_topic"]) for note in notes]
+    )
+
+    overlap_messages = []
+    for group in plan.groups:
+        for tool_call, similarity in group.absorbed:
+            verb = "merged into" if group.action == "merge" else "a duplicate of"
+            overlap_messages.append(ToolMessage(
+                content=(
+                    f"Not researched separately: this topic was {verb} ConductResearch call "
+                    f"{group.tool_call['id']} (similarity {similarity:.2f}). Its findings are reported in that call's result."
+                ),
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"]
+            ))
+    for tool_call, previous_id, similarity in plan.already_researched:
+        overlap_messages.append(ToolMessage(
+            content=(
+                f"Not researched again: this topic duplicates research already completed in ConductResearch call "
+                f"{previous_id} (similarity {similarity:.2f}). Use those findings, or request a more specific topic."
+            ),
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"]
+        ))
+
+    if overlap_messages:
+        emit_event(
+            "topics_deduplicated",
+            requested=len(conduct_research_calls),
+            dispatched=len(plan.groups),
+            merged=sum(len(group.absorbed) for group in plan.groups if group.action == "merge"),
+            dropped=sum(len(group.absorbed) for group in plan.groups if group.action == "dedupe") + len(plan.already_researched)
+        )
+
+    return [group.tool_call for group in plan.groups], overlap_messages
+
 # ===== SUPERVISOR NODES =====
 
 async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tools"]]:
@@ -75,13 +466,19 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
     - Whether to conduct parallel research
     - When research is complete
 
+    Results of earlier research rounds are shown as digests, so the prompt stays
+    close to constant in size as iterations grow; the prompt size and token usage
+    of every turn are recorded.
+
     Args:
         state: Current supervisor state with messages and research progress
 
     Returns:
         Command to proceed to supervisor_tools node with updated state
     """
-    supervisor_messages = state.get("supervisor_messages", [])
+    supervisor_messages, compacted_results = compact_supervisor_messages(
+        state.get("supervisor_messages", []), state.get("notes", [])
+    )
 
     # Prepare system message with current date and constraints
     system_message = lead_researcher_prompt.format(
@@ -92,13 +489,25 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
     messages = [SystemMessage(content=system_message)] + supervisor_messages
 
     # Make decision about next research steps
-    response = await supervisor_model_with_tools.ainvoke(messages)
+    response = await resilient_call("supervisor", "openai", lambda: supervisor_model_with_tools.ainvoke(messages))
+
+    usage = response.usage_metadata or {}
+    token_usage = emit_event(
+        "supervisor_turn",
+        iteration=state.get("research_iterations", 0) + 1,
+        prompt_tokens_estimate=sum(count_tokens(str(message.content)) for message in messages),
+        input_tokens=usage.get("input_tokens"),
+        output_tokens=usage.get("output_tokens"),
+        compacted_results=compacted_results
+    )
 
     return Command(
         goto="supervisor_tools",
         update={
             "supervisor_messages": [response],
-            "research_iterations": state.get("research_iterations", 0) + 1
+            "research_iterations": state.get("research_iterations", 0) + 1,
+            "research_run_id": state.get("research_run_id") or uuid4().hex,
+            "supervisor_token_usage": [token_usage]
         }
     )
 
@@ -108,7 +517,8 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
     Handles:
     - Executing think_tool calls for strategic reflection
     - Launching parallel research agents for different topics
-    - Aggregating research results
+    - Streaming research results as each researcher finishes
+    - Delivering results of researchers that outlived an earlier turn
     - Determining when research is complete
 
     Args:
@@ -119,11 +529,17 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
     """
     supervisor_messages = state.get("supervisor_messages", [])
     research_iterations = state.get("research_iterations", 0)
+    research_run_id = state.get("research_run_id", "")
     most_recent_message = supervisor_messages[-1]
+    # Researchers launched below report their progress to this run and number its sources
+    use_run_progress(state.get("progress_id") or research_run_id, "research")
+    use_citation_registry(state.get("progress_id") or research_run_id, sources_of_notes(state.get("notes", [])))
 
     # Initialize variables for single return pattern
     tool_messages = []
-    all_raw_notes = []
+    research_notes = []
+    finished = []
+    late_results = []
     next_step = "supervisor"  # Default next step
     should_end = False
 
@@ -139,6 +555,9 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
         should_end = True
         next_step = END
 
+        # Research is over, so wait for any researcher still running from an earlier turn
+        late_results = await collect_pending_research(research_run_id, wait=True)
+
     else:
         # Execute ALL tool calls before deciding next step
         try:
@@ -166,73 +585,94 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
 
             # Handle ConductResearch calls (asynchronous)
             if conduct_research_calls:
-                # Launch parallel research agents
-                # Check research mode to decide which agent to launch
-                # Check research mode to decide which agent to launch
-                research_mode = state.get("research_mode", "tavily")
-                
-                # Dynamic import to decouple supervisor from specific researcher implementations
-                if research_mode == "sonar":
-                    from deep_research_with_langgraph.sonar_agent import sonar_researcher
-                    agent_to_call = sonar_researcher
-                else:
-                    from deep_research_with_langgraph.research_agent import researcher_agent
-                    agent_to_call = researcher_agent
-                
-                coros = [
-                    agent_to_call.ainvoke({
-                        "researcher_messages": [
-                            HumanMessage(content=tool_call["args"]["research_topic"])
-                        ],
-                        "research_topic": tool_call["args"]["research_topic"],
-                        "research_brief": state.get("research_brief", "") # Pass brief for context if needed
-                    }) 
-                    for tool_call in conduct_research_calls
-                ]
+                # Launch parallel research agents using the backend selected by the research mode
+                agent_to_call = get_research_backend(state.get("research_mode", "tavily"))
 
-                # Wait for all research to complete
-                tool_results = await asyncio.gather(*coros)
+                # Merge or drop overlapping topics so each researcher covers distinct ground
+                dispatch_calls, overlap_messages = plan_research_dispatch(conduct_research_calls, state.get("notes", []))
+                tool_messages.extend(overlap_messages)
 
-                # Format research results as tool messages
-                # Each sub-agent returns compressed research findings in result["compressed_research"]
-                # We write this compressed research as the content of a ToolMessage, which allows
-                # the supervisor to later retrieve these findings via get_notes_from_tool_calls()
+                emit_event(
+                    "researchers_planned",
+                    count=len(dispatch_calls),
+                    research_topics=[tool_call["args"]["research_topic"] for tool_call in dispatch_calls]
+                )
+                report_progress("researchers_planned", {"researchers_planned": len(dispatch_calls)})
+                # Researchers may run for minutes; make sure a crash meanwhile can resume them
+                flush_checkpoints()
+                tasks = [
+                    asyncio.create_task(run_researcher(agent_to_call, tool_call, state.get("research_brief", "")))
+                    for tool_call in dispatch_calls
+                ]
+
+                # Stream results as researchers finish, up to the configured quorum
+                quorum = len(tasks) if research_quorum is None else min(research_quorum, len(tasks))
+                finished = await stream_research_results(tasks, quorum) if tasks else []
+
+                # Researchers that have not finished yet are delivered on a later turn
+                still_running = [task for task in tasks if not task.done()]
+                if still_running:
+                    emit_event("research_quorum_reached", completed=len(finished), still_running=len(still_running))
+                    _pending_research.setdefault(research_run_id, []).extend(still_running)
+
+                # Record each result as a structured note as soon as it is available,
+                # so notes never have to be recovered by rescanning the supervisor history
+                notes_by_id = {
+                    tool_call["id"]: record_research_note(tool_call, result)
+                    for tool_call, result in finished
+                }
+                research_notes = list(notes_by_id.values())
+
+                # Each sub-agent's compressed research is also returned to the supervisor as a ToolMessage
                 research_tool_messages = [
                     ToolMessage(
-                        content=result.get("compressed_research", "Error synthesizing research report"),
+                        content=notes_by_id[tool_call["id"]]["content"] if tool_call["id"] in notes_by_id else pending_research_message,
                         name=tool_call["name"],
                         tool_call_id=tool_call["id"]
-                    ) for result, tool_call in zip(tool_results, conduct_research_calls)
+                    ) for tool_call in dispatch_calls
                 ]
 
                 tool_messages.extend(research_tool_messages)
 
-                # Aggregate raw notes from all research
-                all_raw_notes = [
-                    "\n".join(result.get("raw_notes", [])) 
-                    for result in tool_results
-                ]
+            # Pick up researchers from earlier turns that finished in the meantime
+            late_results = await collect_pending_research(research_run_id, wait=False)
 
         except Exception as e:
             print(f"Error in supervisor tools: {e}")
             should_end = True
             next_step = END
 
+    late_notes = [record_research_note(tool_call, result) for tool_call, result in late_results]
+    research_notes = research_notes + late_notes
+
+    # Timeouts and failures of individual researchers are kept as structured events
+    research_events = [
+        research_event
+        for _, result in finished + late_results
+        for research_event in result.get("research_events", [])
+    ]
+
     # Single return point with appropriate state updates
     if should_end:
         return Command(
             goto=next_step,
             update={
-                "notes": get_notes_from_tool_calls(supervisor_messages),
+                "notes": research_notes,
+                "raw_notes": [note["raw_notes_ref"] for note in research_notes],
+                "research_events": research_events,
                 "research_brief": state.get("research_brief", "")
             }
         )
     else:
+        if late_results:
+            tool_messages.append(format_late_research(late_results))
         return Command(
             goto=next_step,
             update={
                 "supervisor_messages": tool_messages,
-                "raw_notes": all_raw_notes
+                "notes": research_notes,
+                "raw_notes": [note["raw_notes_ref"] for note in research_notes],
+                "research_events": research_events
             }
         )
 
@@ -243,4 +683,5 @@ supervisor_builder = StateGraph(SupervisorState)
 supervisor_builder.add_node("supervisor", supervisor)
 supervisor_builder.add_node("supervisor_tools", supervisor_tools)
 supervisor_builder.add_edge(START, "supervisor")
+# Inherits the checkpointer of the full research graph it runs in
 supervisor_agent = supervisor_builder.compile()
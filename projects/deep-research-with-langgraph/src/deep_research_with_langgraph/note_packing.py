@@ -0,0 +1,170 @@
+"""Token-Aware Note Packing for the Final Report.
+
+The final report prompt used to contain every research note, whatever its size, so
+large runs could overflow the writer's context window or pay for huge prompts. This
+module packs the notes into a token budget before the report is written:
+
+1. Claims (sentences) repeated across notes are kept only once
+2. Notes are ranked by their relevance to the research brief
+3. The most relevant notes are packed until the budget is used up; the note that
+   crosses the budget is truncated at a line boundary if enough room is left
+
+The packed notes keep their original order, and every note that was dropped,
+truncated or fully covered by other notes is reported.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from deep_research_with_langgraph.state_multi_agent_supervisor import ResearchNote
+from deep_research_with_langgraph.multi_agent_supervisor import get_note_findings
+from deep_research_with_langgraph.topic_overlap import similarity_matrix, tokenize
+from deep_research_with_langgraph.token_counting import count_tokens
+
+# ===== CONFIGURATION =====
+
+# Token budget for all findings in the final report prompt
+report_notes_token_budget = 60000
+
+# A note crossing the budget is truncated only if at least this many tokens are left
+min_truncated_note_tokens = 1000
+
+# Claims (sentences) with fewer informative words than this, such as headings, are never deduplicated
+min_claim_words = 4
+
+# ===== CLAIM DEDUPLICATION =====
+
+_claim_boundary = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\[\"(])")
+
+def dedupe_claims(texts: list[str]) -> tuple[list[list[str]], int]:
+    """Drop claims already made by an earlier note (or earlier in the same note).
+
+    A claim is a sentence of a line. Claims are compared by their informative
+    words, so differences in case, punctuation and filler words do not matter.
+    Lines left without any claim are removed.
+
+    Returns:
+        The remaining lines of every text and the number of claims removed
+    """
+    seen: set[str] = set()
+    removed = 0
+    result = []
+    for text in texts:
+        lines = []
+        for line in text.splitlines():
+            if not line.strip():
+                lines.append("")
+                continue
+            kept = []
+            for claim in _claim_boundary.split(line):
+                words = tokenize(claim)
+                if len(words) >= min_claim_words:
+                    key = " ".join(words)
+                    if key in seen:
+                        removed += 1
+                        continue
+                    seen.add(key)
+                kept.append(claim)
+            if kept:
+                lines.append(" ".join(kept))
+        result.append(lines)
+    return result, removed
+
+def join_lines(lines: list[str]) -> str:
+    """Reassemble lines into text, collapsing runs of blank lines."""
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+# ===== PACKING =====
+
+@dataclass
+class PackedNotes:
+    """Outcome of packing research notes into the report token budget."""
+
+    # Notes that made it into the prompt, in their original order, with packed content
+    notes: list[ResearchNote]
+    # Notes dropped or truncated, with their topic, token count, relevance and reason
+    dropped: list[dict] = field(default_factory=list)
+    # Claims removed because another note already made them
+    duplicate_claims: int = 0
+    # Tokens used by the packed findings
+    tokens: int = 0
+    # Tokens of the findings before packing
+    original_tokens: int = 0
+
+    def summary(self) -> dict:
+        return {
+            "notes_kept": len(self.notes),
+            "notes_dropped": [note for note in self.dropped if note["reason"] == "over_budget"],
+            "notes_truncated": [note for note in self.dropped if note["reason"] == "truncated"],
+            "notes_duplicate": [note for note in self.dropped if note["reason"] == "duplicate"],
+            "duplicate_claims": self.duplicate_claims,
+            "tokens": self.tokens,
+            "original_tokens": self.original_tokens,
+        }
+
+def pack_notes(notes: list[ResearchNote], research_brief: str, token_budget: int = report_notes_token_budget) -> PackedNotes:
+    """Fit research notes into the token budget of the final report prompt.
+
+    Args:
+        notes: Research notes from the supervisor
+        research_brief: The research brief, used to rank notes by relevance
+        token_budget: Maximum number of tokens for all findings together
+
+    Returns:
+        PackedNotes whose notes carry the packed findings as their content
+    """
+    findings = [get_note_findings(note) for note in notes]
+    original_tokens = sum(count_tokens(text) for text in findings)
+    note_lines, duplicate_claims = dedupe_claims(findings)
+    texts = [join_lines(lines) for lines in note_lines]
+    tokens = [count_tokens(text) for text in texts]
+
+    relevance = [1.0] * len(notes)
+    if len(notes) > 1:
+        scores = similarity_matrix([research_brief] + [
+            f"{note['research_topic']}\n{text}" for note, text in zip(notes, texts)
+        ])[0, 1:]
+        relevance = [float(score) for score in scores]
+
+    ranked = sorted(range(len(notes)), key=lambda i: relevance[i], reverse=True)
+    packed: dict[int, str] = {}
+    dropped = []
+    used = 0
+    for i in ranked:
+        report = {
+            "tool_call_id": notes[i]["tool_call_id"],
+            "research_topic": notes[i]["research_topic"],
+            "tokens": tokens[i],
+            "relevance": round(relevance[i], 3),
+        }
+        if not texts[i]:
+            dropped.append({**report, "reason": "duplicate"})
+            continue
+        if used + tokens[i] <= token_budget:
+            packed[i] = texts[i]
+            used += tokens[i]
+            continue
+
+        remaining = token_budget - used
+        if remaining >= min_truncated_note_tokens:
+            truncated = []
+            truncated_tokens = 0
+            for line in note_lines[i]:
+                line_tokens = count_tokens(line) + 1
+                if truncated_tokens + line_tokens > remaining:
+                    break
+                truncated.append(line)
+                truncated_tokens += line_tokens
+            packed[i] = join_lines(truncated)
+            used += count_tokens(packed[i])
+            dropped.append({**report, "reason": "truncated", "kept_tokens": count_tokens(packed[i])})
+        else:
+            dropped.append({**report, "reason": "over_budget"})
+
+    return PackedNotes(
+        notes=[{**notes[i], "content": packed[i]} for i in sorted(packed)],
+        dropped=dropped,
+        duplicate_claims=duplicate_claims,
+        tokens=used,
+        original_tokens=original_tokens,
+    )
@@ -0,0 +1,186 @@
+"""Progress and ETA Events for Research Runs.
+
+Clients used to have nothing to show until the final state arrived. This module
+reports the progress of a run as "progress" events on the LangGraph custom stream
+(see events.py), one per stage:
+
+- brief_ready: the research brief is written and research starts
+- researchers_planned, researcher_started, researcher_finished
+- searches_performed: a researcher ran a round of searches
+- summarization_queued, page_summarized: webpages waiting to be summarized
+- report_streaming_started, report_finished
+
+Every event carries the run's counts so far (researchers, searches, summarization
+queue depth), the current phase (scoping, research or report), how long the phase
+has been running and the time it usually takes, and a rough ETA for the whole run.
+
+The ETA comes from the durations of earlier runs' phases: the median duration of
+the phases still ahead, plus whatever the current phase usually takes beyond its
+elapsed time. Phase durations are kept in memory, and persisted across processes
+when DEEP_RESEARCH_PHASE_TIMINGS is set to a JSON file path. A phase running well
+past its expected duration is a sign of a stalled run.
+
+Nodes select their run with use_run_progress(progress_id); helpers called further
+down (researchers, tools, summarization) then report with report_progress().
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+from deep_research_with_langgraph.events import emit_event
+
+# ===== CONFIGURATION =====
+
+# Phases of a research run, in order
+phase_order = ["scoping", "research", "report"]
+
+# Phase durations assumed before any run has been timed, in seconds
+default_phase_seconds = {"scoping": 15.0, "research": 300.0, "report": 60.0}
+
+# JSON file with the phase durations of earlier runs; kept in memory only when unset
+phase_timings_path = os.environ.get("DEEP_RESEARCH_PHASE_TIMINGS")
+
+# Number of most recent durations kept per phase
+phase_history_size = 50
+
+# ===== PHASE TIMINGS =====
+
+class PhaseTimings:
+    """Durations of the phases of earlier runs, optionally persisted to a JSON file."""
+
+    def __init__(self, path: str | None = None):
+        self.path = Path(path) if path else None
+        self._durations: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            try:
+                self._durations = {
+                    phase: [float(seconds) for seconds in durations][-phase_history_size:]
+                    for phase, durations in json.loads(self.path.read_text(encoding="utf-8")).items()
+                }
+            except Exception as e:
+                print(f"Failed to load phase timings from {self.path}: {e}")
+
+    def expected(self, phase: str) -> float:
+        """Median duration of a phase, or its default before any run was timed."""
+        with self._lock:
+            durations = self._durations.get(phase)
+            return statistics.median(durations) if durations else default_phase_seconds.get(phase, 0.0)
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            durations = self._durations.setdefault(phase, [])
+            durations.append(round(seconds, 2))
+            del durations[:-phase_history_size]
+            snapshot = json.dumps(self._durations)
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.write_text(snapshot, encoding="utf-8")
+            except Exception as e:
+                print(f"Failed to save phase timings to {self.path}: {e}")
+
+_phase_timings: PhaseTimings | None = None
+
+def get_phase_timings() -> PhaseTimings:
+    """Get the process-wide phase timings, loading them on first use."""
+    global _phase_timings
+    if _phase_timings is None:
+        _phase_timings = PhaseTimings(phase_timings_path)
+    return _phase_timings
+
+# ===== RUN PROGRESS =====
+
+class RunProgress:
+    """Phase and counts of a single research run."""
+
+    def __init__(self, progress_id: str, phase: str):
+        self.progress_id = progress_id
+        self.phase = phase
+        self.phase_started_at = time.time()
+        self.counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def start_phase(self, phase: str) -> None:
+        """Move on to the next phase, recording how long the current one took."""
+        with self._lock:
+            if phase == self.phase:
+                return
+            finished, elapsed = self.phase, time.time() - self.phase_started_at
+            self.phase, self.phase_started_at = phase, time.time()
+        get_phase_timings().record(finished, elapsed)
+
+    def finish(self) -> None:
+        """Record the duration of the last phase."""
+        get_phase_timings().record(self.phase, time.time() - self.phase_started_at)
+
+    def eta_seconds(self) -> float:
+        """Rough time left in the run, from the phase durations of earlier runs."""
+        timings = get_phase_timings()
+        elapsed = time.time() - self.phase_started_at
+        later_phases = phase_order[phase_order.index(self.phase) + 1:] if self.phase in phase_order else []
+        return max(timings.expected(self.phase) - elapsed, 0.0) + sum(timings.expected(phase) for phase in later_phases)
+
+    def snapshot(self, counts: dict[str, int] | None = None) -> dict:
+        """Add counts and describe the run's progress."""
+        with self._lock:
+            self.counts.update(counts or {})
+            current = dict(self.counts)
+        current["summarization_queue_depth"] = current.get("summaries_queued", 0) - current.get("summaries_done", 0)
+        return {
+            "progress_id": self.progress_id,
+            "phase": self.phase,
+            "counts": current,
+            "phase_elapsed_seconds": round(time.time() - self.phase_started_at, 1),
+            "expected_phase_seconds": round(get_phase_timings().expected(self.phase), 1),
+            "eta_seconds": round(self.eta_seconds(), 1),
+        }
+
+# Runs in progress in this process, keyed by progress_id
+_runs: dict[str, RunProgress] = {}
+
+# Run reported on by report_progress() in the current context
+_current_run: ContextVar[RunProgress | None] = ContextVar("current_run_progress", default=None)
+
+def use_run_progress(progress_id: str, phase: str) -> RunProgress:
+    """Select the run that progress is reported for in the current node.
+
+    Researchers, tools and summarizations started from the node report to the same
+    run. A run not seen before in this process (e.g. one resumed from a checkpoint)
+    starts tracking at the given phase.
+    """
+    run = _runs.get(progress_id)
+    if run is None:
+        run = _runs.setdefault(progress_id, RunProgress(progress_id, phase))
+    _current_run.set(run)
+    return run
+
+def report_progress(stage: str, counts: dict[str, int] | None = None, **payload) -> dict | None:
+    """Add counts to the current run and emit a progress event for a stage.
+
+    Does nothing outside of a run selected with use_run_progress().
+
+    Args:
+        stage: Name of the stage reached, e.g. "researcher_finished"
+        counts: Increments of the run's counts, e.g. {"searches": 2}
+        **payload: JSON-serializable event fields
+
+    Returns:
+        The event that was emitted, or None without a current run
+    """
+    run = _current_run.get()
+    if run is None:
+        return None
+    return emit_event("progress", stage=stage, **run.snapshot(counts), **payload)
+
+def finish_run_progress(progress_id: str, completed: bool = True) -> None:
+    """Stop tracking a run, recording its last phase's duration if the run completed."""
+    run = _runs.pop(progress_id, None)
+    if run is not None and completed:
+        run.finish()
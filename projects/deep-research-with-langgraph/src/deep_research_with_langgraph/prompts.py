@@ -88,6 +88,43 @@ Guidelines:
 - If the query is in a specific language, prioritize sources published in that language.
 """
 
+clarify_and_write_brief_prompt = """
+These are the messages that have been exchanged so far from the user asking for the report:
+<Messages>
+{messages}
+</Messages>
+
+Today's date is {date}.
+
+You have two jobs, done in a single response:
+1. Assess whether you need to ask a clarifying question, or if the user has already provided enough information for you to start research.
+2. If no clarification is needed, translate the messages into a detailed and concrete research question that will be used to guide the research.
+
+Clarification guidelines:
+- If you can see in the messages history that you have already asked a clarifying question, you almost always do not need to ask another one. Only ask another question if ABSOLUTELY NECESSARY.
+- If there are acronyms, abbreviations, or unknown terms, ask the user to clarify.
+- Be concise, use markdown bullet points or numbered lists if appropriate, and don't ask for information the user has already provided.
+
+Research brief guidelines:
+- Include all known user preferences and explicitly list key attributes or dimensions to consider. All details from the user must be included.
+- Treat dimensions the user hasn't specified as open considerations rather than assumed preferences, and only mention those genuinely necessary for comprehensive research.
+- Never invent user preferences, constraints, or requirements that weren't stated.
+- Phrase the request from the perspective of the user, in the first person.
+- If specific sources should be prioritized, specify them. Prefer official or primary sources over aggregators, original papers over secondary summaries, and sources in the language of the query.
+
+If you need to ask a clarifying question, return:
+"need_clarification": true,
+"question": "<your clarifying question>",
+"verification": "",
+"research_brief": ""
+
+If you do not need to ask a clarifying question, return:
+"need_clarification": false,
+"question": "",
+"verification": "<acknowledgement message that you will now start research, briefly summarizing the key aspects of the request>",
+"research_brief": "<the detailed research question>"
+"""
+
 research_agent_prompt =  """You are a research assistant conducting research on the user's input topic. For context, today's date is {date}.
 
 <Task>
@@ -348,7 +385,7 @@ The think_tool calls contain strategic reflections and decision-making notes tha
 1. Your output findings should be fully comprehensive and include ALL of the information and sources that the researcher has gathered from tool calls and web searches. It is expected that you repeat key information verbatim.
 2. This report can be as long as necessary to return ALL of the information that the researcher has gathered.
 3. In your report, you should return inline citations for each source that the researcher found.
-4. You should include a "Sources" section at the end of the report that lists all of the sources the researcher found with corresponding citations, cited against statements in the report.
+4. Cite every source by its source ID next to the statements it supports.
 5. Make sure to include ALL of the sources that the researcher gathered in the report, and how they were used to answer the question!
 6. It's really important not to lose any sources. A later LLM will be used to merge this report with others, so having all of the sources is critical.
 </Guidelines>
@@ -357,16 +394,12 @@ The think_tool calls contain strategic reflections and decision-making notes tha
 The report should be structured like this:
 **List of Queries and Tool Calls Made**
 **Fully Comprehensive Findings**
-**List of All Relevant Sources (with citations in the report)**
 </Output Format>
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+- Every source in the research is labelled with a source ID such as [S12]
+- Cite sources inline with these IDs exactly as given, e.g. "Revenue grew 20% in 2024 [S12][S15]"
+- Do not write out URLs, do not renumber the sources and do not add a sources list; sources are listed once for the whole report
 </Citation Rules>
 
 Critical Reminder: It is extremely important that any information that is even remotely relevant to the user's research topic is preserved verbatim (e.g. don't rewrite it, don't summarize it, don't paraphrase it).
@@ -467,9 +500,8 @@ Here are the findings from the research that you conducted:
 Please create a detailed answer to the overall research brief that:
 1. Is well-organized with proper headings (# for title, ## for sections, ### for subsections)
 2. Includes specific facts and insights from the research
-3. References relevant sources using [Title](URL) format
+3. References relevant sources by their source IDs, e.g. [S12]
 4. Provides a balanced, thorough analysis. Be as comprehensive as possible, and include all information that is relevant to the overall research question. People are using you for deep research and will expect detailed, comprehensive answers.
-5. Includes a "Sources" section at the end with all referenced links
 
 You can structure your report in a number of different ways. Here are some examples:
 
@@ -515,13 +547,9 @@ Make sure the final answer report is in the SAME language as the human messages
 Format the report in clear markdown with proper structure and include source references where appropriate.
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Each source should be a separate line item in a list, so that in markdown it is rendered as a list.
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+- Every source in the findings is labelled with a source ID such as [S12]
+- Cite sources inline with these IDs exactly as given, e.g. "Revenue grew 20% in 2024 [S12][S15]"
+- Do not write out URLs, do not renumber the sources and do not add a Sources section; the numbered source list is added automatically from the IDs you cite
 - Citations are extremely important. Make sure to include these, and pay a lot of attention to getting these right. Users will often use these citations to look into more information.
 </Citation Rules>
 """
@@ -592,8 +620,8 @@ Only these fully comprehensive cleaned findings are going to be returned to the
 <Guidelines>
 1. Your output findings should be fully comprehensive and include ALL of the information and sources that the researcher has gathered from tool calls. It is expected that you repeat key information verbatim.
 2. This report can be as long as necessary to return ALL of the information that the researcher has gathered.
-3. **CRITICAL**: The `sonar_tool` returns citations/sources in a specific format (e.g., "### Extracted Sources:"). You MUST preserve these sources.
-4. You should include a "Sources" section at the end of the report that lists all of the sources the researcher found with corresponding citations, cited against statements in the report.
+3. **CRITICAL**: The `sonar_tool` cites its sources with source IDs such as [S12]; the sources of all answers are listed once under "### Extracted Sources:" after the research messages. You MUST preserve these source IDs.
+4. Cite every source by its source ID next to the statements it supports.
 5. Make sure to include ALL of the sources that the researcher gathered in the report, and how they were used to answer the question!
 6. It's really important not to lose any sources. A later LLM will be used to merge this report with others, so having all of the sources is critical.
 </Guidelines>
@@ -601,16 +629,12 @@ Only these fully comprehensive cleaned findings are going to be returned to the
 <Output Format>
 The report should be structured like this:
 **Fully Comprehensive Findings**
-**List of All Relevant Sources (with citations in the report)**
 </Output Format>
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+- Every source in the research is labelled with a source ID such as [S12]
+- Cite sources inline with these IDs exactly as given, e.g. "Revenue grew 20% in 2024 [S12][S15]"
+- Do not write out URLs, do not renumber the sources and do not add a sources list; sources are listed once for the whole report
 </Citation Rules>
 
 Critical Reminder: It is extremely important that any information that is even remotely relevant to the user's research topic is preserved verbatim (e.g. don't rewrite it, don't summarize it, don't paraphrase it).
@@ -635,9 +659,8 @@ Here are the findings from the research that you conducted:
 Please create a detailed answer to the overall research brief that:
 1. Is well-organized with proper headings (# for title, ## for sections, ### for subsections)
 2. Includes specific facts and insights from the research
-3. References relevant sources using [Title](URL) format
+3. References relevant sources by their source IDs, e.g. [S12]
 4. Provides a balanced, thorough analysis. Be as comprehensive as possible, and include all information that is relevant to the overall research question. People are using you for deep research and will expect detailed, comprehensive answers.
-5. Includes a "Sources" section at the end with all referenced links
 
 You can structure your report in a number of different ways. Here are some examples:
 
@@ -683,13 +706,147 @@ Make sure the final answer report is in the SAME language as the human messages
 Format the report in clear markdown with proper structure and include source references where appropriate.
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Each source should be a separate line item in a list, so that in markdown it is rendered as a list.
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+- Every source in the findings is labelled with a source ID such as [S12]
+- Cite sources inline with these IDs exactly as given, e.g. "Revenue grew 20% in 2024 [S12][S15]"
+- Do not write out URLs, do not renumber the sources and do not add a Sources section; the numbered source list is added automatically from the IDs you cite
 - Citations are extremely important. Make sure to include these, and pay a lot of attention to getting these right. Users will often use these citations to look into more information.
 </Citation Rules>
-"""
\ No newline at end of file
+"""
+
+partial_compression_prompt = """You are a research assistant cleaning up the output of a single tool call made while researching a topic. For context, today's date is {date}.
+
+<Research Topic>
+{research_topic}
+</Research Topic>
+
+<Tool Call>
+Tool: {tool_name}
+Arguments: {tool_args}
+</Tool Call>
+
+<Tool Output>
+{tool_output}
+</Tool Output>
+
+<Task>
+Rewrite the tool output above as clean research notes for the research topic.
+- Preserve every relevant fact, name, number, date and quote verbatim - do not summarize or paraphrase
+- Drop navigation text, boilerplate and content that is clearly unrelated to the research topic
+- Keep every source: attach its source ID (such as [S12]) to each statement, exactly as labelled in the tool output, without writing out URLs or a sources list
+- Do not add any information that is not in the tool output
+</Task>
+
+These notes will later be merged with notes from other tool calls, so being faithful to the sources matters more than being short.
+"""
+
+merge_compressions_prompt = """You are a research assistant merging partial research notes that were written independently from different tool calls about the same topic. For context, today's date is {date}.
+
+<Research Topic>
+{research_topic}
+</Research Topic>
+
+<Partial Notes>
+{partial_notes}
+</Partial Notes>
+
+<Task>
+Merge the partial notes above into a single set of cleaned findings.
+- Preserve all relevant statements verbatim; only remove exact or near-exact duplicates
+- When several notes state the same fact, state it once and cite all of the supporting sources
+- Do not add any information that is not in the partial notes
+</Task>
+
+<Output Format>
+**Fully Comprehensive Findings**
+</Output Format>
+
+<Citation Rules>
+- Every source in the partial notes is labelled with a source ID such as [S12]
+- Cite sources inline with these IDs exactly as given, e.g. "Revenue grew 20% in 2024 [S12][S15]"
+- Do not write out URLs, do not renumber the sources and do not add a sources list; sources are listed once for the whole report
+</Citation Rules>
+"""
+
+research_memo_seed_message = """Findings on a closely related topic were already gathered on {researched_at}:
+
+<Earlier Findings>
+{findings}
+</Earlier Findings>
+
+Do not repeat this research. Use a small number of targeted searches to fill gaps in these findings for your topic and to check anything that may have changed since then, then stop."""
+
+brief_complexity_prompt = """You are routing a research brief to the cheapest research strategy that can answer it well. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+Classify the brief:
+- "simple": a single, narrow factual question that one researcher with a few searches can answer (e.g. a specific figure, date, definition, or a short list about one entity)
+- "complex": anything that needs several independent lines of research, comparisons between multiple entities, broad overviews, or multi-part analysis
+
+When in doubt, answer "complex".
+"""
+
+report_outline_prompt = """You are planning the structure of a research report that answers the research brief below. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+The research produced these numbered notes (each shown with its research topic and the beginning of its findings):
+<Notes>
+{notes}
+</Notes>
+
+Plan the body of the report:
+- Choose between 1 and {max_sections} sections that together fully answer the research brief, in reading order
+- Do not plan an introduction, conclusion-only or sources section; those are added separately
+- Give each section a title, a short description of what it covers, and the numbers of the notes it draws on
+- Every note should be used by at least one section; a note can be used by several sections
+- Write the titles and descriptions in the same language as the research brief
+"""
+
+report_section_prompt = """You are writing one section of a research report that answers the research brief below. Other sections are written separately, so only write this section. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+<Report Outline>
+{outline}
+</Report Outline>
+
+<Section>
+Title: {section_title}
+Covers: {section_description}
+</Section>
+
+Here are the findings for this section:
+<Findings>
+{findings}
+</Findings>
+
+Write the section:
+- Start with the section title as a ## heading and use ### for subsections
+- Include specific facts and insights from the findings; do not cover material that belongs to the other sections in the outline
+- Write as long as necessary to deeply cover the section, in paragraph form by default, using bullet points where appropriate
+- Reference sources inline by their source IDs exactly as they appear in the findings, e.g. [S12]; do not write out URLs
+- Do not add an introduction to the whole report, a conclusion for the whole report, or a sources list
+- Do not refer to yourself or describe what you are doing
+- Write in the same language as the research brief
+"""
+
+report_intro_prompt = """You are finishing a research report that answers the research brief below. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+The body of the report has already been written:
+<Report Body>
+{body}
+</Report Body>
+
+Write only the beginning of the report: a # heading with the report title "{title}", followed by a short introduction (one or two paragraphs) that frames the research question and previews the main findings. Do not repeat the sections and do not refer to yourself. Write in the same language as the research brief.
+"""
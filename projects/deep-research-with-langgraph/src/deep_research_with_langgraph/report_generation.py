@@ -0,0 +1,228 @@
+"""Final Report Generation.
+
+Writing the final report in a single long generation makes its latency grow with
+the length of the report. In the sectioned mode the report is produced in three
+steps instead:
+
+1. An outline call plans the sections and assigns research notes to each of them
+2. The sections are written in parallel, under a concurrency limit
+3. A stitch pass adds a title and introduction, and the source list is rendered
+   from the source IDs cited by the sections
+
+Wall-clock time then scales with the longest section rather than the whole report.
+The full research graphs fall back to single-pass generation when there are only a
+few notes or when any step of the sectioned mode fails.
+
+In both modes the report text is streamed while it is generated: model tokens show
+up in the LangGraph "messages" stream (tagged "final_report") and as
+"final_report_delta" events in the custom stream. Sections are generated in
+parallel, so their deltas interleave; each delta carries the part it belongs to.
+Source IDs are renumbered once the report is complete, so final_report holds the
+authoritative text. In batch execution mode (see batch_api.py) the report is written
+in a single batched call and is not streamed.
+"""
+
+import asyncio
+
+from langchain.chat_models import init_chat_model
+from langchain_core.messages import HumanMessage
+
+from deep_research_with_langgraph.state_multi_agent_supervisor import ResearchNote
+from deep_research_with_langgraph.state_scope import ReportOutline
+from deep_research_with_langgraph.prompts import report_outline_prompt, report_section_prompt, report_intro_prompt
+from deep_research_with_langgraph.multi_agent_supervisor import get_note_findings
+from deep_research_with_langgraph.citations import compact_citations, render_bibliography
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.resilience import resilient_call
+from deep_research_with_langgraph.batch_api import batch_invoke, batch_mode_enabled
+from deep_research_with_langgraph.utils import get_today_str
+
+# ===== CONFIGURATION =====
+
+# How the final report is written: "single" (one generation) or "sectioned"
+report_mode = "sectioned"
+
+# Below this number of notes the report is always written in a single generation
+sectioned_min_notes = 3
+
+# Upper bound for the number of sections planned by the outline call
+max_report_sections = 8
+
+# Number of sections written at the same time
+max_concurrent_sections = 4
+
+# Characters of each note's findings shown to the outline call
+outline_excerpt_chars = 600
+
+# Tag attached to report-writing model calls, to pick them out of the messages stream
+final_report_tag = "final_report"
+
+# Model used for the outline and the introduction; sections use the graph's writer model
+outline_model = init_chat_model("gpt-4.1-mini", model_provider="openai", max_retries=0, temperature=0)
+
+# ===== HELPERS =====
+
+def use_sectioned_report(notes: list[ResearchNote]) -> bool:
+    """Decide whether the final report for these notes is written in sections.
+
+    Sections only save latency, so batch execution mode always writes the report
+    in a single batched call.
+    """
+    return report_mode == "sectioned" and len(notes) >= sectioned_min_notes and not batch_mode_enabled()
+
+def format_outline(outline: ReportOutline) -> str:
+    """Render an outline as a numbered list of section titles and descriptions."""
+    return "\n".join(
+        f"{i}. {section.title}: {section.description}"
+        for i, section in enumerate(outline.sections, 1)
+    )
+
+def finalize_report(report: str) -> str:
+    """Turn the source IDs cited by a generated report into a numbered source list."""
+    return render_bibliography(compact_citations(report))
+
+# ===== STREAMING =====
+
+async def stream_report_text(site: str, model, prompt: str, part: str = "report") -> str:
+    """Generate report text token by token and return the accumulated text.
+
+    Every chunk is forwarded as a "final_report_delta" event. If the call is
+    retried after some text was already sent, a "final_report_restarted" event
+    tells clients to discard what they received for this part.
+
+    Args:
+        site: Call site for the resilience layer
+        model: Chat model writing the text
+        prompt: Prompt for the model
+        part: Which part of the report this is ("report", "intro" or "section:<n>")
+
+    Returns:
+        The full generated text
+    """
+    if batch_mode_enabled():
+        # Nothing to stream: the text arrives at once when the batch finishes
+        response = await batch_invoke(model, [HumanMessage(content=prompt)])
+        return str(response.content)
+
+    streamed = False
+
+    async def generate() -> str:
+        nonlocal streamed
+        if streamed:
+            emit_event("final_report_restarted", part=part)
+            streamed = False
+        parts = []
+        async for chunk in model.astream([HumanMessage(content=prompt)], config={"tags": [final_report_tag, f"span:{site}"]}):
+            text = chunk.content if isinstance(chunk.content, str) else ""
+            if text:
+                parts.append(text)
+                streamed = True
+                emit_event("final_report_delta", part=part, text=text)
+        return "".join(parts)
+
+    return await resilient_call(site, "openai", generate)
+
+# ===== SECTIONED REPORT =====
+
+async def plan_report(research_brief: str, findings: list[tuple[str, str]]) -> ReportOutline:
+    """Plan the report sections and assign the numbered notes to them."""
+    notes = "\n\n".join(
+        f"[{i}] {topic}\n{text[:outline_excerpt_chars]}"
+        for i, (topic, text) in enumerate(findings, 1)
+    )
+    prompt = report_outline_prompt.format(
+        research_brief=research_brief,
+        notes=notes,
+        max_sections=max_report_sections,
+        date=get_today_str()
+    )
+    structured_model = outline_model.with_structured_output(ReportOutline)
+    outline = await resilient_call(
+        "report_outline", "openai",
+        lambda: structured_model.ainvoke([HumanMessage(content=prompt)])
+    )
+    sections = [section for section in outline.sections[:max_report_sections] if section.title.strip()]
+    if not sections:
+        raise ValueError("Report outline has no sections")
+
+    # Notes the outline left out still end up in the report, in the last section
+    valid = range(1, len(findings) + 1)
+    for section in sections:
+        section.note_indices = [i for i in dict.fromkeys(section.note_indices) if i in valid]
+    assigned = {i for section in sections for i in section.note_indices}
+    sections[-1].note_indices += [i for i in valid if i not in assigned]
+
+    outline.sections = sections
+    return outline
+
+async def generate_sectioned_report(research_brief: str, notes: list[ResearchNote], writer_model) -> str | None:
+    """Write the final report section by section.
+
+    Args:
+        research_brief: The research brief the report answers
+        notes: Research notes from the supervisor
+        writer_model: Chat model used to write the sections
+
+    Returns:
+        The stitched report, or None if any step failed so the caller can fall
+        back to single-pass generation
+    """
+    findings = [(note["research_topic"], get_note_findings(note)) for note in notes]
+    date = get_today_str()
+
+    try:
+        outline = await plan_report(research_brief, findings)
+    except Exception as e:
+        print(f"Failed to plan sectioned report, falling back to single-pass generation: {e}")
+        return None
+    emit_event("report_outline_planned", title=outline.title, sections=[section.title for section in outline.sections])
+
+    outline_text = format_outline(outline)
+    semaphore = asyncio.Semaphore(max_concurrent_sections)
+
+    async def write_section(index: int, section) -> str:
+        prompt = report_section_prompt.format(
+            research_brief=research_brief,
+            outline=outline_text,
+            section_title=section.title,
+            section_description=section.description,
+            findings="\n\n".join(findings[i - 1][1] for i in section.note_indices),
+            date=date
+        )
+        async with semaphore:
+            text = await stream_report_text("report_section", writer_model, prompt, part=f"section:{index}")
+        emit_event("report_section_written", index=index, title=section.title)
+        return text.strip()
+
+    tasks = [asyncio.create_task(write_section(i, section)) for i, section in enumerate(outline.sections)]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        # The single-pass report replaces every section once one fails
+        for task in tasks:
+            task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    failures = [task.exception() for task in done if task.exception() is not None]
+    if failures:
+        print(f"Failed to write {len(failures)} report section(s), falling back to single-pass generation: {failures[0]}")
+        # Clients discard the section text they already received, as when a part is retried
+        for index in range(len(outline.sections)):
+            emit_event("final_report_restarted", part=f"section:{index}")
+        return None
+
+    body = "\n\n".join(task.result() for task in tasks)
+
+    try:
+        intro = await stream_report_text("report_intro", outline_model, report_intro_prompt.format(
+            research_brief=research_brief,
+            body=body,
+            title=outline.title,
+            date=date
+        ), part="intro")
+        intro = intro.strip()
+    except Exception as e:
+        print(f"Failed to write report introduction: {e}")
+        emit_event("final_report_restarted", part="intro")
+        intro = f"# {outline.title}"
+
+    return finalize_report(f"{intro}\n\n{body}")
@@ -5,12 +5,25 @@ This module implements a research agent that can perform iterative web searches
 and synthesis to answer complex research questions.
 """
 
+from uuid import uuid4
 from langgraph.graph import END, START, StateGraph
 from typing_extensions import Literal
 from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, filter_messages
 from deep_research_with_langgraph.utils import tavily_search, think_tool,get_today_str
 from deep_research_with_langgraph.prompts import research_agent_prompt,compress_research_system_prompt,compress_research_human_message
 from deep_research_with_langgraph.state_research import ResearcherState,ResearcherOutputState
+from deep_research_with_langgraph.compression import observe_tool_outputs, pop_compressor
+from deep_research_with_langgraph.blob_store import get_blob_store
+from deep_research_with_langgraph.resilience import resilient_call
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.progress import report_progress
+from deep_research_with_langgraph.researcher_budget import (
+    budget_exhausted, budget_note, close_dangling_tool_calls, response_tokens,
+    search_limit_reason, search_tool_names, skipped_tool_messages, split_search_calls
+)
+from deep_research_with_langgraph.batch_api import invoke_model
+from deep_research_with_langgraph.search_policy import decide_search, result_novelty, search_result_urls
+from deep_research_with_langgraph.citations import canonicalize_url
 from langchain.chat_models import init_chat_model
 
 # ===== CONFIGURATION =====
@@ -21,14 +34,15 @@ tools_by_name = {tool.name: tool for tool in tools}
 
 # Initialize models
 
-model = init_chat_model("gpt-4o-mini", model_provider="openai" ,timeout=30, temperature=0)
+# Timeouts and retries of llm_call and compress_research are handled by the resilience layer
+model = init_chat_model("gpt-4o-mini", model_provider="openai", max_retries=0, temperature=0)
 model_with_tools = model.bind_tools(tools)
 summarization_model = init_chat_model("gpt-4o-mini", model_provider="openai", timeout=30, temperature=0)
-compress_model = init_chat_model("gpt-4.1-mini", model_provider="openai", temperature=0, max_tokens=32000)
+compress_model = init_chat_model("gpt-4.1-mini", model_provider="openai", max_retries=0, temperature=0, max_tokens=32000)
 
 # ===== AGENT NODES =====
 
-def llm_call(state: ResearcherState):
+async def llm_call(state: ResearcherState):
     """Analyze current state and decide on next actions.
 
     The model analyzes the current conversation state and decides whether to:
@@ -37,27 +51,61 @@ def llm_call(state: ResearcherState):
 
     Returns updated state with the model's response.
     """
+    messages = [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
+    response = await resilient_call("llm_call", "openai", lambda: model_with_tools.ainvoke(messages))
     return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
-            )
-        ]
+        "researcher_messages": [response],
+        "researcher_tokens": state.get("researcher_tokens", 0) + response_tokens(messages, response)
     }
 
-def tool_node(state: ResearcherState):
+async def tool_node(state: ResearcherState):
     """Execute all tool calls from the previous LLM response.
 
-    Executes all tool calls from the previous LLM responses.
-    Returns updated state with tool execution results.
+    Executes all tool calls from the previous LLM responses and hands the
+    results to the background compressor when hierarchical compression is on.
+    Searches beyond the researcher's search limit are answered without running,
+    and every search gets its max_results and topic from the search policy.
+    Returns updated state with tool execution results, budget counters and the
+    novelty of the searches.
     """
-    tool_calls = state["researcher_messages"][-1].tool_calls
+    tool_calls, skipped = split_search_calls(state, state["researcher_messages"][-1].tool_calls)
+    research_id = state.get("research_id") or uuid4().hex
+    search_index = state.get("search_calls", 0)
+    seen_urls = list(state.get("seen_urls", []))
+    search_novelty = list(state.get("search_novelty", []))
 
     # Execute all tool calls
     observations = []
     for tool_call in tool_calls:
         tool = tools_by_name[tool_call["name"]]
-        observations.append(tool.invoke(tool_call["args"]))
+        if tool_call["name"] != "tavily_search":
+            observations.append(await tool.ainvoke(tool_call["args"]))
+            continue
+
+        query = tool_call["args"].get("query", "")
+        decision = decide_search(query, search_index, search_novelty)
+        # The Tavily request inside the tool is scheduled; its summaries go through the "openai" scheduler
+        observation = await tool.ainvoke({**tool_call["args"], "max_results": decision.max_results, "topic": decision.topic})
+        observations.append(observation)
+
+        urls = search_result_urls(observation)
+        novelty = result_novelty(urls, set(seen_urls))
+        seen_urls += [url for url in dict.fromkeys(map(canonicalize_url, urls)) if url not in seen_urls]
+        search_novelty.append(novelty)
+        search_index += 1
+        emit_event(
+            "search_policy_decision",
+            research_id=research_id,
+            query=query,
+            max_results=decision.max_results,
+            topic=decision.topic,
+            reason=decision.reason,
+            results=len(urls),
+            novelty=round(novelty, 2)
+        )
+
+    # Start compressing search results while the researcher keeps going
+    observe_tool_outputs(research_id, state.get("research_topic", ""), tool_calls, observations)
 
     # Create tool message outputs
     tool_outputs = [
@@ -66,22 +114,59 @@ def tool_node(state: ResearcherState):
             name=tool_call["name"],
             tool_call_id=tool_call["id"]
         ) for observation, tool_call in zip(observations, tool_calls)
-    ]
+    ] + skipped_tool_messages(skipped, search_limit_reason())
 
-    return {"researcher_messages": tool_outputs}
+    searches = sum(1 for tool_call in tool_calls if tool_call["name"] in search_tool_names)
+    if searches:
+        report_progress("searches_performed", {"searches": searches})
 
-def compress_research(state: ResearcherState) -> dict:
+    return {
+        "researcher_messages": tool_outputs,
+        "research_id": research_id,
+        "tool_call_iterations": state.get("tool_call_iterations", 0) + 1,
+        "search_calls": state.get("search_calls", 0) + searches,
+        "seen_urls": seen_urls,
+        "search_novelty": search_novelty
+    }
+
+async def compress_research(state: ResearcherState) -> dict:
     """Compress research findings into a concise summary.
 
-    Takes all the research messages and tool outputs and creates
-    a compressed summary suitable for the supervisor's decision-making.
+    Merges the partial compressions built in the background when hierarchical
+    compression is enabled. Otherwise, or if nothing was compressed, takes all the
+    research messages and tool outputs and creates a compressed summary suitable
+    for the supervisor's decision-making in a single pass.
+
+    A researcher stopped by its budget still has unanswered tool calls; they are
+    answered with a note, and the compressed research says why it stopped.
     """
+    research_id = state.get("research_id", "")
+    stop_reason = budget_exhausted(state) if state["researcher_messages"][-1].tool_calls else None
+    closing_messages = close_dangling_tool_calls(state["researcher_messages"], stop_reason) if stop_reason else []
+    if stop_reason:
+        emit_event(
+            "researcher_budget_exhausted",
+            research_id=research_id,
+            research_topic=state.get("research_topic", ""),
+            reason=stop_reason
+        )
+
+    compressed_research = ""
+    compressor = pop_compressor(research_id)
+    if compressor is not None:
+        compressed_research = await compressor.finalize()
+
+    if not compressed_research:
+        system_message = compress_research_system_prompt.format(date=get_today_str())
+        human_message = compress_research_human_message.format(research_topic=state.get("research_topic", ""))
+        messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + closing_messages + [HumanMessage(content=human_message)]
+        response = await invoke_model("compress_research", "openai", compress_model, messages)
+        compressed_research = str(response.content)
 
-    system_message = compress_research_system_prompt.format(date=get_today_str())
-    messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
-    response = compress_model.invoke(messages)
+    if stop_reason:
+        compressed_research = f"{compressed_research}\n\n{budget_note(stop_reason)}"
 
-    # Extract raw notes from tool and AI messages
+    # Extract raw notes from tool and AI messages and keep them out of graph state
     raw_notes = [
         str(m.content) for m in filter_messages(
             state["researcher_messages"], 
@@ -90,8 +175,9 @@ def compress_research(state: ResearcherState) -> dict:
     ]
 
     return {
-        "compressed_research": str(response.content),
-        "raw_notes": ["\n".join(raw_notes)]
+        "compressed_research": compressed_research,
+        "raw_notes": [get_blob_store().put("\n".join(raw_notes))],
+        "researcher_messages": closing_messages
     }
 
 # ===== ROUTING LOGIC =====
@@ -100,7 +186,8 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     """Determine whether to continue research or provide final answer.
 
     Determines whether the agent should continue the research loop or provide
-    a final answer based on whether the LLM made tool calls.
+    a final answer based on whether the LLM made tool calls and whether the
+    researcher is still within its iteration, search and token budgets.
 
     Returns:
         "tool_node": Continue to tool execution
@@ -109,8 +196,10 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     messages = state["researcher_messages"]
     last_message = messages[-1]
 
-    # If the LLM makes a tool call, continue to tool execution
+    # If the LLM makes a tool call, continue to tool execution unless a budget is used up
     if last_message.tool_calls:
+        if budget_exhausted(state) is not None:
+            return "compress_research"
         return "tool_node"
     # Otherwise, we have a final answer
     return "compress_research"
@@ -137,5 +226,5 @@ agent_builder.add_conditional_edges(
 agent_builder.add_edge("tool_node","llm_call")
 agent_builder.add_edge("compress_research", END)
 
-# Compile the agent
-researcher_agent = agent_builder.compile()
+# Compile the agent; researchers run without a checkpointer, see checkpointing.py
+researcher_agent = agent_builder.compile(checkpointer=False)
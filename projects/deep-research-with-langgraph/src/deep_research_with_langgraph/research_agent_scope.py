@@ -6,10 +6,13 @@ This module implements the scoping phase of the research workflow, where we:
 2. Generate a detailed research brief from the conversation
 
 The workflow uses structured output to make deterministic decisions about
-whether sufficient context exists to proceed with research.
+whether sufficient context exists to proceed with research. In the "combined"
+scoping mode both steps are answered by a single model call, falling back to the
+two-step path if that call fails.
 """
 
 from datetime import datetime
+from uuid import uuid4
 from typing_extensions import Literal
 
 from langchain.chat_models import init_chat_model
@@ -18,8 +21,9 @@ from langchain_core.messages import HumanMessage, AIMessage, get_buffer_string
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
-from deep_research_with_langgraph.prompts import clarify_with_user_instructions,transform_messages_into_research_topic_prompt
-from deep_research_with_langgraph.state_scope import AgentState, ClarifyWithUser, ResearchQuestion, AgentInputState
+from deep_research_with_langgraph.prompts import clarify_with_user_instructions,transform_messages_into_research_topic_prompt,clarify_and_write_brief_prompt
+from deep_research_with_langgraph.state_scope import AgentState, ClarifyWithUser, ResearchQuestion, ScopeResearch, AgentInputState
+from deep_research_with_langgraph.progress import finish_run_progress, report_progress, use_run_progress
 
 # ===== UTILITY FUNCTIONS =====
 
@@ -33,29 +37,69 @@ def get_today_str() -> str:
 model_gpt_4o_mini = init_chat_model("gpt-4o-mini", model_provider="openai", temperature=0)
 model = model_gpt_4o_mini
 
+# How the request is scoped:
+# - "combined": one call returns the clarification decision and the research brief
+# - "two_step": separate clarification and research brief calls
+scoping_mode = "combined"
+
 
 # ===== WORKFLOW NODES =====
 
-def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brief", "__end__"]]:
+async def scope_in_one_call(messages: str) -> ScopeResearch | None:
+    """
+    Ask for the clarification decision and the research brief in a single call.
+
+    Returns None if the call fails or does not produce a usable brief, so the
+    caller can fall back to the two-step path.
+    """
+    structured_output_model = model.with_structured_output(ScopeResearch)
+    try:
+        response = await structured_output_model.ainvoke([
+            HumanMessage(content=clarify_and_write_brief_prompt.format(
+                messages=messages,
+                date=get_today_str()
+            ))
+        ])
+    except Exception as e:
+        print(f"Combined scoping call failed, falling back to two-step scoping: {e}")
+        return None
+
+    if not response.need_clarification and not response.research_brief.strip():
+        print("Combined scoping call returned no research brief, falling back to two-step scoping")
+        return None
+    return response
+
+async def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brief", "__end__"]]:
     """
     Determine if the user's request contains sufficient information to proceed with research.
 
     Uses structured output to make deterministic decisions and avoid hallucination.
     Routes to either research brief generation or ends with a clarification question.
+    In combined scoping mode the research brief is produced by the same call.
     """
-    # Set up structured output model
-    structured_output_model = model.with_structured_output(ClarifyWithUser)
-
-    # Invoke the model with clarification instructions
-    response = structured_output_model.invoke([
-        HumanMessage(content=clarify_with_user_instructions.format(
-            messages=get_buffer_string(messages=state["messages"]), 
-            date=get_today_str()
-        ))
-    ])
+    messages = get_buffer_string(messages=state["messages"])
+    progress_id = state.get("progress_id") or uuid4().hex
+    use_run_progress(progress_id, "scoping")
+
+    response = None
+    if scoping_mode == "combined":
+        response = await scope_in_one_call(messages)
+
+    if response is None:
+        # Set up structured output model
+        structured_output_model = model.with_structured_output(ClarifyWithUser)
+
+        # Invoke the model with clarification instructions
+        response = await structured_output_model.ainvoke([
+            HumanMessage(content=clarify_with_user_instructions.format(
+                messages=messages, 
+                date=get_today_str()
+            ))
+        ])
 
     # Route based on clarification need
     if response.need_clarification:
+        finish_run_progress(progress_id, completed=False)
         return Command(
             goto=END, 
             update={"messages": [AIMessage(content=response.question)]}
@@ -63,31 +107,46 @@ def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brie
     else:
         return Command(
             goto="write_research_brief", 
-            update={"messages": [AIMessage(content=response.verification)]}
+            update={
+                "messages": [AIMessage(content=response.verification)],
+                "scoping_brief": getattr(response, "research_brief", ""),
+                "progress_id": progress_id,
+            }
         )
 
-def write_research_brief(state: AgentState):
+async def write_research_brief(state: AgentState):
     """
     Transform the conversation history into a comprehensive research brief.
 
     Uses structured output to ensure the brief follows the required format
-    and contains all necessary details for effective research.
+    and contains all necessary details for effective research. Reuses the
+    brief from the combined scoping call when there is one.
     """
-    # Set up structured output model
-    structured_output_model = model.with_structured_output(ResearchQuestion)
-
-    # Generate research brief from conversation history
-    response = structured_output_model.invoke([
-        HumanMessage(content=transform_messages_into_research_topic_prompt.format(
-            messages=get_buffer_string(state.get("messages", [])),
-            date=get_today_str()
-        ))
-    ])
+    progress_id = state.get("progress_id") or uuid4().hex
+    run_progress = use_run_progress(progress_id, "scoping")
+    research_brief = state.get("scoping_brief", "")
+
+    if not research_brief:
+        # Set up structured output model
+        structured_output_model = model.with_structured_output(ResearchQuestion)
+
+        # Generate research brief from conversation history
+        response = await structured_output_model.ainvoke([
+            HumanMessage(content=transform_messages_into_research_topic_prompt.format(
+                messages=get_buffer_string(state.get("messages", [])),
+                date=get_today_str()
+            ))
+        ])
+        research_brief = response.research_brief
+
+    run_progress.start_phase("research")
+    report_progress("brief_ready")
 
     # Update state with generated research brief and pass it to the supervisor
     return {
-        "research_brief": response.research_brief,
-        "supervisor_messages": [HumanMessage(content=f"{response.research_brief}.")]
+        "research_brief": research_brief,
+        "supervisor_messages": [HumanMessage(content=f"{research_brief}.")],
+        "progress_id": progress_id
     }
 
 
@@ -0,0 +1,165 @@
+"""Research Backend Registry.
+
+This module maps research modes to the researcher subgraphs launched by the supervisor
+for each ConductResearch call. Backends are registered as loader functions, so the
+supervisor stays decoupled from the researcher implementations, and each backend is
+built once per process and cached.
+
+Built-in backends:
+- tavily: the Tavily search researcher
+- sonar: the Perplexity Sonar researcher
+- hybrid: runs the Tavily and Sonar researchers concurrently on the same topic
+
+Example:
+    register_research_backend("my_backend", lambda: my_researcher_graph)
+    researcher = get_research_backend("my_backend")
+"""
+
+import asyncio
+from functools import cache
+from typing import Any, Callable
+
+from deep_research_with_langgraph.compression import merge_partial_notes, pop_compressors
+
+# ===== CONFIGURATION =====
+
+# Backends raced by the hybrid mode
+hybrid_backends = ["tavily", "sonar"]
+
+# How the hybrid mode combines results:
+# - "first": use the first good answer
+# - "merge": wait for every backend and merge their findings
+hybrid_strategy = "first"
+
+# Whether "first" cancels the slower backends once a good answer arrived
+# When False they run to completion and only contribute their raw notes
+hybrid_cancel_losers = True
+
+# ===== REGISTRY =====
+
+_backend_loaders: dict[str, Callable[[], Any]] = {}
+
+def register_research_backend(name: str, loader: Callable[[], Any]) -> None:
+    """Register a research backend.
+
+    Args:
+        name: Research mode selecting the backend
+        loader: Zero-argument function returning a runnable researcher; it is only
+            called the first time the backend is needed
+    """
+    _backend_loaders[name] = loader
+    get_research_backend.cache_clear()
+
+@cache
+def get_research_backend(name: str):
+    """Get the researcher for a research mode, loading it on first use."""
+    if name not in _backend_loaders:
+        raise ValueError(f"Unknown research mode: {name}. Available: {sorted(_backend_loaders)}")
+    return _backend_loaders[name]()
+
+def available_research_backends() -> list[str]:
+    """List the names of all registered research backends."""
+    return sorted(_backend_loaders)
+
+# ===== HYBRID BACKEND =====
+
+def is_good_result(result: dict) -> bool:
+    """Check whether a researcher produced usable compressed research."""
+    compressed_research = str(result.get("compressed_research", "")).strip()
+    return bool(compressed_research) and compressed_research != "Error synthesizing research report"
+
+class HybridResearcher:
+    """Research a topic with several backends at the same time.
+
+    This hedges latency across providers instead of only choosing one: each
+    sub-researcher runs under its own research_id ("<research_id>:<backend>")
+    so their process-local helpers never collide.
+    """
+
+    def __init__(self, backends: list[str]):
+        self.backends = backends
+
+    async def ainvoke(self, inputs: dict, config: dict | None = None) -> dict:
+        research_id = inputs.get("research_id", "hybrid")
+        tasks = {
+            asyncio.create_task(
+                get_research_backend(name).ainvoke({**inputs, "research_id": f"{research_id}:{name}"}, config)
+            ): name
+            for name in self.backends
+        }
+        try:
+            if hybrid_strategy == "merge":
+                return await self._merge_all(inputs, tasks)
+            return await self._first_good(inputs, tasks)
+        finally:
+            # Stop anything still running, e.g. when the supervisor's deadline cancels us
+            for task in tasks:
+                task.cancel()
+
+    async def _first_good(self, inputs: dict, tasks: dict[asyncio.Task, str]) -> dict:
+        """Return the first good answer, falling back to any answer at all."""
+        pending = set(tasks)
+        fallback = None
+        winner = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    print(f"Hybrid backend {tasks[task]} failed: {task.exception()}")
+                elif is_good_result(task.result()):
+                    winner = task.result()
+                    break
+                else:
+                    fallback = fallback or task.result()
+
+        if winner is None:
+            if fallback is None:
+                raise RuntimeError("All hybrid research backends failed")
+            return fallback
+
+        if hybrid_cancel_losers:
+            for task in pending:
+                task.cancel()
+            for compressor in pop_compressors(inputs.get("research_id", "hybrid")):
+                compressor.cancel()
+            return winner
+
+        # Let the other backends finish and keep their raw notes
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        raw_notes = list(winner.get("raw_notes", []))
+        for result in results:
+            if isinstance(result, dict):
+                raw_notes.extend(result.get("raw_notes", []))
+        return {**winner, "raw_notes": raw_notes}
+
+    async def _merge_all(self, inputs: dict, tasks: dict[asyncio.Task, str]) -> dict:
+        """Wait for every backend and merge their findings."""
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        good = [result for result in results if isinstance(result, dict) and is_good_result(result)]
+        if not good:
+            raise RuntimeError("All hybrid research backends failed")
+
+        compressed_research = good[0]["compressed_research"]
+        if len(good) > 1:
+            compressed_research = await merge_partial_notes(
+                inputs.get("research_topic", ""),
+                [str(result["compressed_research"]) for result in good]
+            )
+        return {
+            "compressed_research": compressed_research,
+            "raw_notes": [ref for result in good for ref in result.get("raw_notes", [])],
+        }
+
+# ===== BUILT-IN BACKENDS =====
+
+def _load_tavily_researcher():
+    from deep_research_with_langgraph.research_agent import researcher_agent
+    return researcher_agent
+
+def _load_sonar_researcher():
+    from deep_research_with_langgraph.sonar_agent import sonar_researcher
+    return sonar_researcher
+
+register_research_backend("tavily", _load_tavily_researcher)
+register_research_backend("sonar", _load_sonar_researcher)
+register_research_backend("hybrid", lambda: HybridResearcher(hybrid_backends))
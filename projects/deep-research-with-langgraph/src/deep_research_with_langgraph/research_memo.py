@@ -0,0 +1,246 @@
+"""Cross-Run Research Memo.
+
+Users keep asking about the same entities and markets, yet every run used to start
+from scratch. This module keeps a persistent memo of compressed research (plus a blob
+store reference to the raw notes) keyed by normalized research topic. Before a
+researcher is launched the supervisor looks up the memo:
+
+- a fresh, near-identical topic is answered directly from the memo
+- a fresh, related topic seeds the researcher with the earlier findings, so it only
+  needs a short follow-up search
+
+Entries expire after a freshness window and the memo is capped in size, evicting the
+least recently used entries first.
+
+Lookups score the topic against every fresh entry with a single sparse
+matrix-vector product over an in-memory TF-IDF index of the memo, which is rebuilt
+only when the memo changed.
+
+The memo is enabled by setting DEEP_RESEARCH_MEMO_DB to a SQLite file path. Use a
+persistent blob store backend as well, so the raw notes references stay resolvable.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from deep_research_with_langgraph.topic_overlap import named_entities, names_different_entities, shingle_similarity, tokenize
+
+# ===== CONFIGURATION =====
+
+# SQLite file holding the memo; the memo is disabled when unset
+research_memo_path = os.environ.get("DEEP_RESEARCH_MEMO_DB")
+
+# Age after which an entry is no longer used, in seconds
+memo_freshness_seconds = 24 * 60 * 60
+
+# Similarity at or above which a memo entry answers a ConductResearch call directly
+memo_answer_threshold = 0.9
+
+# Similarity at or above which a memo entry seeds a follow-up researcher
+memo_seed_threshold = 0.6
+
+# Maximum number of entries kept; the least recently used ones are evicted first
+memo_max_entries = 2000
+
+# ===== MEMO STORE =====
+
+def normalize_topic(research_topic: str) -> str:
+    """Normalize a research topic into the memo key."""
+    return " ".join(tokenize(research_topic))
+
+@dataclass
+class MemoEntry:
+    """Research findings remembered from an earlier run."""
+
+    topic_key: str
+    research_topic: str
+    compressed_research: str
+    raw_notes_ref: str
+    created_at: float
+
+@dataclass
+class MemoHit:
+    """Result of a memo lookup."""
+
+    entry: MemoEntry
+    similarity: float
+    # "answer" to reuse the findings as-is, "seed" to start a follow-up researcher
+    mode: str
+
+class _TopicIndex:
+    """TF-IDF vectors of the memo's topics, stored as a sparse term-to-entries index.
+
+    Uses the same log-scaled term frequencies and smoothed IDF as
+    topic_overlap.tfidf_matrix, with the IDF taken over the memo's entries.
+    """
+
+    def __init__(self, entries: list[MemoEntry]):
+        self.entries = entries
+        self.documents = [tokenize(entry.research_topic) for entry in entries]
+        self.entities = [named_entities(entry.research_topic) for entry in entries]
+        self.created_at = np.array([entry.created_at for entry in entries])
+        self.by_key = {entry.topic_key: i for i, entry in enumerate(entries)}
+
+        counts = [Counter(doc) for doc in self.documents]
+        document_frequency = Counter(term for count in counts for term in count)
+        self.idf = {
+            term: np.log((1 + len(entries)) / (1 + frequency)) + 1
+            for term, frequency in document_frequency.items()
+        }
+        postings: dict[str, tuple[list[int], list[float]]] = {}
+        for row, count in enumerate(counts):
+            weights = {term: np.log1p(n) * self.idf[term] for term, n in count.items()}
+            norm = np.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                rows, values = postings.setdefault(term, ([], []))
+                rows.append(row)
+                values.append(weight / norm)
+        self.postings = {term: (np.array(rows), np.array(values)) for term, (rows, values) in postings.items()}
+
+    def scores(self, research_topic: str) -> np.ndarray:
+        """Similarity of a topic to every entry: the higher of TF-IDF cosine and shingle Jaccard."""
+        document = tokenize(research_topic)
+        weights = {
+            term: np.log1p(n) * self.idf.get(term, np.log(1 + len(self.entries)) + 1)
+            for term, n in Counter(document).items()
+        }
+        norm = np.sqrt(sum(w * w for w in weights.values())) or 1.0
+        cosine = np.zeros(len(self.entries))
+        for term, weight in weights.items():
+            if term in self.postings:
+                rows, values = self.postings[term]
+                cosine[rows] += values * (weight / norm)
+        # Only entries sharing a term can have a shingle in common
+        for row in np.flatnonzero(cosine):
+            cosine[row] = max(cosine[row], shingle_similarity(document, self.documents[row]))
+        return np.clip(cosine, 0.0, 1.0)
+
+class ResearchMemo:
+    """Persistent memo of compressed research, backed by SQLite."""
+
+    def __init__(self, path: str | Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._index: _TopicIndex | None = None
+        self._index_version: tuple | None = None
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS research_memo (
+                    topic_key TEXT PRIMARY KEY,
+                    research_topic TEXT NOT NULL,
+                    compressed_research TEXT NOT NULL,
+                    raw_notes_ref TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+
+    def put(self, research_topic: str, compressed_research: str, raw_notes_ref: str) -> None:
+        """Remember the findings for a topic, replacing older findings for the same key."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO research_memo
+                   (topic_key, research_topic, compressed_research, raw_notes_ref, created_at, last_used_at, hits)
+                   VALUES (?, ?, ?, ?, ?, ?, 0)""",
+                (normalize_topic(research_topic), research_topic, compressed_research, raw_notes_ref, now, now)
+            )
+        self.evict()
+
+    def _topic_index(self) -> _TopicIndex:
+        """Get the index of the memo's entries, rebuilding it if the memo changed.
+
+        Every write changes the entry count or the newest created_at, also when
+        it comes from another process sharing the memo file.
+        """
+        with self._lock:
+            version = self._conn.execute("SELECT COUNT(*), MAX(created_at) FROM research_memo").fetchone()
+            if self._index is None or version != self._index_version:
+                rows = self._conn.execute(
+                    """SELECT topic_key, research_topic, compressed_research, raw_notes_ref, created_at
+                       FROM research_memo"""
+                ).fetchall()
+                self._index = _TopicIndex([MemoEntry(*row) for row in rows])
+                self._index_version = version
+            return self._index
+
+    def lookup(self, research_topic: str) -> MemoHit | None:
+        """Find the most similar fresh entry for a topic.
+
+        Entries about different entities ("Tesla" vs "Ford") are never returned,
+        however similar their wording is, since their findings would be passed off
+        as research on the wrong subject. Blocks on SQLite and, after the memo changed, on rebuilding its index;
+        call it with asyncio.to_thread() from async code.
+
+        Returns:
+            The best hit at or above memo_seed_threshold, or None
+        """
+        topic_key = normalize_topic(research_topic)
+        index = self._topic_index()
+        if not index.entries or not topic_key:
+            return None
+
+        fresh = index.created_at >= time.time() - memo_freshness_seconds
+        exact = index.by_key.get(topic_key)
+        if exact is not None and fresh[exact]:
+            best, similarity = index.entries[exact], 1.0
+        else:
+            entities = named_entities(research_topic)
+            scores = np.where(fresh, index.scores(research_topic), -1.0)
+            candidates = np.flatnonzero(scores >= memo_seed_threshold)
+            # Best candidate first, skipping entries that name different entities
+            best_index = next((
+                int(i) for i in candidates[np.argsort(-scores[candidates], kind="stable")]
+                if not names_different_entities(entities, index.entities[i])
+            ), None)
+            if best_index is None:
+                return None
+            best, similarity = index.entries[best_index], float(scores[best_index])
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE research_memo SET last_used_at = ?, hits = hits + 1 WHERE topic_key = ?",
+                (time.time(), best.topic_key)
+            )
+        mode = "answer" if similarity >= memo_answer_threshold else "seed"
+        return MemoHit(entry=best, similarity=similarity, mode=mode)
+
+    def evict(self) -> None:
+        """Drop expired entries and the least recently used ones beyond memo_max_entries."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM research_memo WHERE created_at < ?",
+                (time.time() - memo_freshness_seconds,)
+            )
+            self._conn.execute(
+                """DELETE FROM research_memo WHERE topic_key IN (
+                       SELECT topic_key FROM research_memo ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                   )""",
+                (memo_max_entries,)
+            )
+
+_research_memo: ResearchMemo | None = None
+
+def get_research_memo() -> ResearchMemo | None:
+    """Get the process-wide research memo, or None when the memo is disabled."""
+    global _research_memo
+    if _research_memo is None and research_memo_path:
+        _research_memo = ResearchMemo(research_memo_path)
+    return _research_memo
+
+def set_research_memo(memo: ResearchMemo | None) -> None:
+    """Replace the process-wide research memo; None disables it."""
+    global _research_memo, research_memo_path
+    _research_memo = memo
+    if memo is None:
+        research_memo_path = None
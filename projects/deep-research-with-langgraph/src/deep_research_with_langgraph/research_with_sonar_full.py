@@ -4,7 +4,9 @@ This module implements the standalone research workflow using Perplexity's Sonar
 via the shared supervisor agent.
 """
 
-from langchain_core.messages import AIMessage, HumanMessage
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage
 from langchain.chat_models import init_chat_model
 from langgraph.graph import StateGraph, START, END
 
@@ -12,15 +14,44 @@ from deep_research_with_langgraph.state_scope import AgentState, AgentInputState
 from deep_research_with_langgraph.research_agent_scope import clarify_with_user, write_research_brief
 from deep_research_with_langgraph.utils import get_today_str
 from deep_research_with_langgraph.prompts import sonar_final_report_prompt
-from deep_research_with_langgraph.multi_agent_supervisor import supervisor_agent
+from deep_research_with_langgraph.multi_agent_supervisor import get_note_findings, supervisor_agent
+from deep_research_with_langgraph.fast_path import route_research_brief, fast_path_research
+from deep_research_with_langgraph.note_packing import pack_notes
+from deep_research_with_langgraph.checkpointing import get_checkpointer
+from deep_research_with_langgraph.citations import finish_citation_registry, sources_of_notes, use_citation_registry
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.progress import finish_run_progress, report_progress, use_run_progress
+from deep_research_with_langgraph.report_generation import finalize_report, generate_sectioned_report, stream_report_text, use_sectioned_report
 
 # Model for final report writing
-writer_model = init_chat_model("gpt-4o", model_provider="openai", temperature=0, max_tokens=12000)
+# Timeouts and retries are handled by the resilience layer
+writer_model = init_chat_model("gpt-4o", model_provider="openai", max_retries=0, temperature=0, max_tokens=12000)
 
 async def final_report_generation(state: AgentState):
-    """Generate the final report based on gathered notes."""
-    notes = state.get("notes", [])
-    findings = "\n\n".join(notes)
+    """Generate the final report based on gathered notes, in parallel sections when there are enough of them."""
+    progress_id = state.get("progress_id") or uuid4().hex
+    use_run_progress(progress_id, "report").start_phase("report")
+    use_citation_registry(progress_id, sources_of_notes(state.get("notes", [])))
+
+    # Fit the notes into the writer's token budget, reporting anything left out
+    packed = pack_notes(state.get("notes", []), state.get("research_brief", ""))
+    notes = packed.notes
+    packing_event = emit_event("report_notes_packed", **packed.summary())
+    report_progress("report_streaming_started", notes=len(notes))
+
+    if use_sectioned_report(notes):
+        report = await generate_sectioned_report(state.get("research_brief", ""), notes, writer_model)
+        if report is not None:
+            report_progress("report_finished", report_chars=len(report))
+            finish_run_progress(progress_id)
+            finish_citation_registry(progress_id)
+            return {
+                "final_report": report,
+                "messages": [AIMessage(content=f"Here is the final report:\n\n{report}")],
+                "research_events": [packing_event],
+            }
+
+    findings = "\n\n".join(get_note_findings(note) for note in notes)
     research_brief = state.get("research_brief", "")
     
     formatted_prompt = sonar_final_report_prompt.format(
@@ -29,11 +60,17 @@ async def final_report_generation(state: AgentState):
         date=get_today_str()
     )
     
-    response = await writer_model.ainvoke([HumanMessage(content=formatted_prompt)])
+    # Stream the report while it is written; the accumulated text ends up in final_report
+    # with the cited source IDs turned into a numbered source list
+    final_report = finalize_report(await stream_report_text("final_report_generation", writer_model, formatted_prompt))
+    report_progress("report_finished", report_chars=len(final_report))
+    finish_run_progress(progress_id)
+    finish_citation_registry(progress_id)
     
     return {
-        "final_report": response.content,
-        "messages": [AIMessage(content=f"Here is the final report:\n\n{response.content}")]
+        "final_report": final_report,
+        "messages": [AIMessage(content=f"Here is the final report:\n\n{final_report}")],
+        "research_events": [packing_event],
     }
 
 def set_sonar_mode(state: AgentState):
@@ -51,6 +88,8 @@ sonar_research_builder.add_node("clarify_with_user", clarify_with_user)
 sonar_research_builder.add_node("write_research_brief", write_research_brief)
 sonar_research_builder.add_node("supervisor_subgraph", supervisor_agent)
 sonar_research_builder.add_node("sonar_mode_setter", set_sonar_mode)
+sonar_research_builder.add_node("route_research_brief", route_research_brief)
+sonar_research_builder.add_node("fast_path_research", fast_path_research)
 sonar_research_builder.add_node("final_report_generation", final_report_generation)
 
 # Add edges
@@ -58,9 +97,10 @@ sonar_research_builder.add_edge(START, "clarify_with_user")
 # We assume clarify logic handles its own routing (it returns Command)
 
 sonar_research_builder.add_edge("write_research_brief", "sonar_mode_setter")
-sonar_research_builder.add_edge("sonar_mode_setter", "supervisor_subgraph")
+sonar_research_builder.add_edge("sonar_mode_setter", "route_research_brief")
+sonar_research_builder.add_edge("fast_path_research", "final_report_generation")
 sonar_research_builder.add_edge("supervisor_subgraph", "final_report_generation")
 sonar_research_builder.add_edge("final_report_generation", END)
 
 # Compile
-agent = sonar_research_builder.compile()
+agent = sonar_research_builder.compile(checkpointer=get_checkpointer())
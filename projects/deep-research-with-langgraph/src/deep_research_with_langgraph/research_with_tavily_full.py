@@ -11,30 +11,59 @@ The system orchestrates the complete research workflow from initial user
 input through final report delivery.
 """
 
+from uuid import uuid4
 
 from deep_research_with_langgraph.state_scope import AgentState,AgentInputState
 from deep_research_with_langgraph.prompts import final_report_generation_prompt
 from deep_research_with_langgraph.utils import get_today_str
 from deep_research_with_langgraph.research_agent_scope import clarify_with_user, write_research_brief
-from deep_research_with_langgraph.multi_agent_supervisor import supervisor_agent
-from langchain_core.messages import HumanMessage
+from deep_research_with_langgraph.multi_agent_supervisor import get_note_findings, supervisor_agent
+from deep_research_with_langgraph.fast_path import route_research_brief, fast_path_research
+from deep_research_with_langgraph.note_packing import pack_notes
+from deep_research_with_langgraph.checkpointing import get_checkpointer
+from deep_research_with_langgraph.citations import finish_citation_registry, sources_of_notes, use_citation_registry
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.progress import finish_run_progress, report_progress, use_run_progress
+from deep_research_with_langgraph.report_generation import finalize_report, generate_sectioned_report, stream_report_text, use_sectioned_report
 from langgraph.graph import START, StateGraph, END
 
 # ===== Config =====
 
 from langchain.chat_models import init_chat_model
-writer_model = init_chat_model(model="openai:gpt-4.1", max_tokens=32000)
+# Timeouts and retries are handled by the resilience layer
+writer_model = init_chat_model(model="openai:gpt-4.1", max_retries=0, max_tokens=32000)
 
 async def final_report_generation(state: AgentState):
     """
     Final report generation node.
 
-    Synthesizes all research findings into a comprehensive final report
+    Synthesizes all research findings into a comprehensive final report,
+    section by section in parallel when there are enough notes
     """
 
-    notes = state.get("notes", [])
-
-    findings = "\n".join(notes)
+    progress_id = state.get("progress_id") or uuid4().hex
+    use_run_progress(progress_id, "report").start_phase("report")
+    use_citation_registry(progress_id, sources_of_notes(state.get("notes", [])))
+
+    # Fit the notes into the writer's token budget, reporting anything left out
+    packed = pack_notes(state.get("notes", []), state.get("research_brief", ""))
+    notes = packed.notes
+    packing_event = emit_event("report_notes_packed", **packed.summary())
+    report_progress("report_streaming_started", notes=len(notes))
+
+    if use_sectioned_report(notes):
+        report = await generate_sectioned_report(state.get("research_brief", ""), notes, writer_model)
+        if report is not None:
+            report_progress("report_finished", report_chars=len(report))
+            finish_run_progress(progress_id)
+            finish_citation_registry(progress_id)
+            return {
+                "final_report": report,
+                "messages": ["Here is the final report: " + report],
+                "research_events": [packing_event],
+            }
+
+    findings = "\n".join(get_note_findings(note) for note in notes)
 
     final_report_prompt = final_report_generation_prompt.format(
         research_brief=state.get("research_brief", ""),
@@ -42,11 +71,17 @@ async def final_report_generation(state: AgentState):
         date=get_today_str()
     )
 
-    final_report = await writer_model.ainvoke([HumanMessage(content=final_report_prompt)])
+    # Stream the report while it is written; the accumulated text ends up in final_report
+    # with the cited source IDs turned into a numbered source list
+    final_report = finalize_report(await stream_report_text("final_report_generation", writer_model, final_report_prompt))
+    report_progress("report_finished", report_chars=len(final_report))
+    finish_run_progress(progress_id)
+    finish_citation_registry(progress_id)
 
     return {
-        "final_report": final_report.content, 
-        "messages": ["Here is the final report: " + final_report.content],
+        "final_report": final_report, 
+        "messages": ["Here is the final report: " + final_report],
+        "research_events": [packing_event],
     }
 
 # ===== GRAPH CONSTRUCTION =====
@@ -56,14 +91,17 @@ deep_researcher_builder = StateGraph(AgentState, input_schema=AgentInputState)
 # Add workflow nodes
 deep_researcher_builder.add_node("clarify_with_user", clarify_with_user)
 deep_researcher_builder.add_node("write_research_brief", write_research_brief)
+deep_researcher_builder.add_node("route_research_brief", route_research_brief)
+deep_researcher_builder.add_node("fast_path_research", fast_path_research)
 deep_researcher_builder.add_node("supervisor_subgraph", supervisor_agent)
 deep_researcher_builder.add_node("final_report_generation", final_report_generation)
 
 # Add workflow edges
 deep_researcher_builder.add_edge(START, "clarify_with_user")
-deep_researcher_builder.add_edge("write_research_brief", "supervisor_subgraph")
+deep_researcher_builder.add_edge("write_research_brief", "route_research_brief")
+deep_researcher_builder.add_edge("fast_path_research", "final_report_generation")
 deep_researcher_builder.add_edge("supervisor_subgraph", "final_report_generation")
 deep_researcher_builder.add_edge("final_report_generation", END)
 
 # Compile the full workflow
-agent = deep_researcher_builder.compile()
+agent = deep_researcher_builder.compile(checkpointer=get_checkpointer())
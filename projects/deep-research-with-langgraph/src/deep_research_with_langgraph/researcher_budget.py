@@ -0,0 +1,90 @@
+"""Hard Per-Researcher Budgets.
+
+The researcher loops used to run until the model chose to stop, so a single runaway
+researcher could hold up a whole supervisor round. This module enforces hard limits
+on every researcher, checked by the should_continue edge of both researcher graphs:
+
+- iterations: tool rounds executed
+- searches: search tool calls executed (a round that would go over the limit only
+  runs the searches that still fit)
+- tokens: tokens used by the researcher's own model calls
+
+Once a limit is hit the researcher is routed to compression. Tool calls the model
+asked for in its last message are answered with a note instead of being run, so
+the history stays valid for the compression call, and the compressed research ends
+with a note saying why the researcher stopped.
+"""
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from deep_research_with_langgraph.token_counting import count_tokens
+
+# ===== CONFIGURATION =====
+
+# Maximum number of tool rounds of a single researcher
+researcher_max_iterations = 10
+
+# Maximum number of search tool calls of a single researcher
+researcher_max_searches = 8
+
+# Maximum number of tokens (prompt and completion) used by a single researcher's model calls
+researcher_max_tokens = 250000
+
+# Tools that count as searches
+search_tool_names = {"tavily_search", "sonar_tool"}
+
+# ===== BUDGET CHECKS =====
+
+def budget_exhausted(state: dict) -> str | None:
+    """Check a researcher's state against its budgets.
+
+    Returns:
+        Why the researcher has to stop, or None while it is within budget
+    """
+    if state.get("tool_call_iterations", 0) >= researcher_max_iterations:
+        return f"iteration limit of {researcher_max_iterations} tool rounds reached"
+    if state.get("search_calls", 0) >= researcher_max_searches:
+        return search_limit_reason()
+    if state.get("researcher_tokens", 0) >= researcher_max_tokens:
+        return f"token limit of {researcher_max_tokens} tokens reached"
+    return None
+
+def search_limit_reason() -> str:
+    return f"search limit of {researcher_max_searches} searches reached"
+
+def response_tokens(messages: list[BaseMessage], response: AIMessage) -> int:
+    """Tokens used by a model call, from its usage metadata or estimated from the messages."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return usage["total_tokens"]
+    return sum(count_tokens(str(message.content)) for message in [*messages, response])
+
+def split_search_calls(state: dict, tool_calls: list[dict]) -> tuple[list[dict], list[dict]]:
+    """Split a round's tool calls into those to run and the searches beyond the search limit."""
+    remaining = researcher_max_searches - state.get("search_calls", 0)
+    allowed, skipped = [], []
+    for tool_call in tool_calls:
+        if tool_call["name"] in search_tool_names:
+            if remaining <= 0:
+                skipped.append(tool_call)
+                continue
+            remaining -= 1
+        allowed.append(tool_call)
+    return allowed, skipped
+
+def skipped_tool_messages(tool_calls: list[dict], reason: str) -> list[ToolMessage]:
+    """Answer tool calls that are not run, so every tool call in the history has a result."""
+    return [
+        ToolMessage(content=f"Not executed: {reason}.", name=tool_call["name"], tool_call_id=tool_call["id"])
+        for tool_call in tool_calls
+    ]
+
+def close_dangling_tool_calls(messages: list[BaseMessage], reason: str) -> list[ToolMessage]:
+    """Answer the tool calls of the last message when the researcher stops before running them."""
+    if not messages or not isinstance(messages[-1], AIMessage):
+        return []
+    return skipped_tool_messages(messages[-1].tool_calls, reason)
+
+def budget_note(reason: str) -> str:
+    """Note appended to the compressed research of a researcher stopped by its budget."""
+    return f"(Research stopped early: {reason}. Findings cover only the searches completed before the limit.)"
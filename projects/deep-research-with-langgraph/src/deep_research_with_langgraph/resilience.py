@@ -0,0 +1,332 @@
+"""Resilient Provider Calls.
+
+This module wraps model calls made by the research graphs with:
+- a per-attempt timeout
+- retries with jittered exponential backoff
+- a circuit breaker per provider, so a degraded provider fails fast
+- a slot from the provider's scheduler for every attempt, so concurrent runs share
+  the provider by priority class and tenant (see scheduler.py)
+- optional hedged requests: a duplicate request is sent when the first one is
+  slower than a latency percentile observed for the same call site
+
+Policies are configured per call site in `call_policies` and every call records
+metrics that can be read with get_call_metrics().
+
+Example:
+    response = await resilient_call(
+        "supervisor", "openai",
+        lambda: supervisor_model_with_tools.ainvoke(messages)
+    )
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, TypeVar
+
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.scheduler import AdmissionRejectedError, acquire_slot
+
+T = TypeVar("T")
+
+# ===== POLICIES =====
+
+@dataclass
+class CallPolicy:
+    """Resilience settings for a single call site."""
+
+    # Wall-clock limit for a single attempt, in seconds (None disables it)
+    timeout: float | None = 60
+    # Total number of attempts, including the first one
+    max_attempts: int = 3
+    # Backoff before the first retry; doubles on every further retry
+    initial_backoff: float = 1.0
+    # Upper bound for a single backoff
+    max_backoff: float = 20.0
+    # Latency percentile after which a duplicate request is sent (None disables hedging)
+    hedge_percentile: float | None = None
+    # Number of latency samples needed before hedging kicks in
+    hedge_min_samples: int = 20
+
+@dataclass
+class CircuitBreakerPolicy:
+    """Settings shared by the circuit breakers of all providers."""
+
+    # Consecutive failures that open the circuit
+    failure_threshold: int = 5
+    # Seconds an open circuit rejects calls before letting a trial call through
+    reset_timeout: float = 30.0
+
+# ===== CONFIGURATION =====
+
+call_policies: dict[str, CallPolicy] = {
+    "supervisor": CallPolicy(timeout=60, hedge_percentile=0.95),
+    "llm_call": CallPolicy(timeout=60, hedge_percentile=0.95),
+    "orchestrator": CallPolicy(timeout=90, hedge_percentile=0.95),
+    "compress_research": CallPolicy(timeout=240, max_attempts=2),
+    "final_report_generation": CallPolicy(timeout=600, max_attempts=2),
+    "route_research_brief": CallPolicy(timeout=30, max_attempts=2),
+    "report_outline": CallPolicy(timeout=60, max_attempts=2),
+    "report_section": CallPolicy(timeout=300, max_attempts=2),
+    "report_intro": CallPolicy(timeout=60, max_attempts=2),
+    "summarize_webpage": CallPolicy(timeout=60, max_attempts=2),
+}
+default_call_policy = CallPolicy()
+circuit_breaker_policy = CircuitBreakerPolicy()
+
+# HTTP status codes worth retrying; any other 4xx is a caller error
+retryable_status_codes = {408, 409, 429}
+
+# ===== CIRCUIT BREAKER =====
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its provider's circuit is open."""
+
+class CircuitBreaker:
+    """Circuit breaker tracking consecutive failures of one provider.
+
+    The circuit opens after `failure_threshold` consecutive failures and rejects
+    calls until `reset_timeout` has passed. It then lets a single trial call
+    through (half-open) and closes again if that call succeeds.
+    """
+
+    def __init__(self, provider: str, policy: CircuitBreakerPolicy):
+        self.provider = provider
+        self.policy = policy
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.policy.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Reject the call if the circuit is open."""
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError(f"Circuit for provider '{self.provider}' is open")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def abandon_call(self) -> None:
+        """Forget a call that says nothing about the provider, such as a cancelled or invalid one."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.policy.failure_threshold:
+            self.opened_at = time.monotonic()
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Get the circuit breaker for a provider, creating it on first use."""
+    if provider not in _circuit_breakers:
+        _circuit_breakers[provider] = CircuitBreaker(provider, circuit_breaker_policy)
+    return _circuit_breakers[provider]
+
+# ===== METRICS =====
+
+@dataclass
+class CallSiteMetrics:
+    """Counters and recent latencies for one call site."""
+
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    circuit_rejections: int = 0
+    admission_rejections: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=500))
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Latency of successful calls at the given percentile, in seconds."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(percentile * len(ordered)), len(ordered) - 1)]
+
+    def summary(self) -> dict:
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "circuit_rejections": self.circuit_rejections,
+            "admission_rejections": self.admission_rejections,
+            "p50_seconds": self.latency_percentile(0.50),
+            "p95_seconds": self.latency_percentile(0.95),
+            "p99_seconds": self.latency_percentile(0.99),
+        }
+
+_metrics: dict[str, CallSiteMetrics] = {}
+
+def _site_metrics(site: str) -> CallSiteMetrics:
+    if site not in _metrics:
+        _metrics[site] = CallSiteMetrics()
+    return _metrics[site]
+
+def get_call_metrics() -> dict[str, dict]:
+    """Get a summary of the metrics of every call site."""
+    return {site: metrics.summary() for site, metrics in _metrics.items()}
+
+def get_circuit_states() -> dict[str, str]:
+    """Get the state of every provider's circuit breaker."""
+    return {provider: breaker.state for provider, breaker in _circuit_breakers.items()}
+
+# ===== RESILIENT CALLS =====
+
+def is_retryable(error: Exception) -> bool:
+    """Decide whether a failed call is worth retrying.
+
+    Timeouts, connection problems, rate limits and server errors are retried;
+    other client errors (e.g. an invalid request) are not.
+    """
+    if isinstance(error, (CircuitOpenError, AdmissionRejectedError)):
+        return False
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and 400 <= status_code < 500:
+        return status_code in retryable_status_codes
+    return True
+
+def backoff_delay(policy: CallPolicy, retry: int) -> float:
+    """Full-jitter exponential backoff for the given retry number (starting at 1)."""
+    return random.uniform(0, min(policy.max_backoff, policy.initial_backoff * 2 ** (retry - 1)))
+
+async def _attempt(call: Callable[[], Awaitable[T]], policy: CallPolicy) -> T:
+    async with asyncio.timeout(policy.timeout):
+        return await call()
+
+async def _hedged_attempt(site: str, call: Callable[[], Awaitable[T]], policy: CallPolicy) -> T:
+    """Run one attempt, sending a duplicate request if the first one is slow.
+
+    Whichever request finishes first wins and the other one is cancelled.
+    """
+    metrics = _site_metrics(site)
+    hedge_delay = None
+    if policy.hedge_percentile is not None and len(metrics.latencies) >= policy.hedge_min_samples:
+        hedge_delay = metrics.latency_percentile(policy.hedge_percentile)
+
+    primary = asyncio.create_task(_attempt(call, policy))
+    if hedge_delay is None:
+        return await primary
+
+    done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+    if done:
+        return primary.result()
+
+    metrics.hedges += 1
+    hedge = asyncio.create_task(_attempt(call, policy))
+    pending = {primary, hedge}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        metrics.hedge_wins += 1
+                    return task.result()
+        # Both requests failed; surface the primary's error
+        return primary.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def resilient_call(site: str, provider: str, call: Callable[[], Awaitable[T]]) -> T:
+    """Run a provider call with the resilience policy of its call site.
+
+    Args:
+        site: Name of the call site, used to look up its CallPolicy and record metrics
+        provider: Provider name, selects the circuit breaker and scheduler (e.g. "openai")
+        call: Zero-argument factory creating a fresh awaitable for every attempt
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        CircuitOpenError: If the provider's circuit is open
+        AdmissionRejectedError: If the provider's scheduler has too many calls waiting
+        Exception: The last error once all attempts are exhausted
+    """
+    policy = call_policies.get(site, default_call_policy)
+    breaker = get_circuit_breaker(provider)
+    metrics = _site_metrics(site)
+    metrics.calls += 1
+
+    for attempt in range(1, policy.max_attempts + 1):
+        # Wait for the provider's scheduler to admit the attempt
+        try:
+            slot = await acquire_slot(provider)
+        except AdmissionRejectedError:
+            metrics.admission_rejections += 1
+            metrics.failures += 1
+            raise
+
+        try:
+            try:
+                breaker.before_call()
+            except CircuitOpenError:
+                metrics.circuit_rejections += 1
+                metrics.failures += 1
+                raise
+
+            start = time.monotonic()
+            try:
+                result = await _hedged_attempt(site, call, policy)
+            except Exception as e:
+                retryable = is_retryable(e)
+                # Caller errors say nothing about the provider's health
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.abandon_call()
+                if isinstance(e, TimeoutError):
+                    metrics.timeouts += 1
+                if attempt == policy.max_attempts or not retryable:
+                    metrics.failures += 1
+                    raise
+
+                metrics.retries += 1
+                delay = backoff_delay(policy, attempt)
+                emit_event(
+                    "provider_call_retry",
+                    site=site,
+                    provider=provider,
+                    attempt=attempt,
+                    error=f"{type(e).__name__}: {e}",
+                    backoff_seconds=round(delay, 2)
+                )
+            except BaseException:
+                # Cancelled (researcher deadline, lost hedge): the call says nothing
+                # about the provider, but a half-open trial must not stay in flight
+                breaker.abandon_call()
+                raise
+            else:
+                breaker.record_success()
+                metrics.successes += 1
+                metrics.latencies.append(time.monotonic() - start)
+                return result
+        finally:
+            slot.release()
+
+        # Back off without holding the provider slot
+        await asyncio.sleep(delay)
@@ -0,0 +1,279 @@
+"""Priority-Aware Multi-Tenant Scheduler for Provider Calls.
+
+Every research run in a process used to compete equally for the same provider
+rate limits, so a large batch could starve interactive users. This module gives
+each provider a process-wide scheduler that all concurrent runs share:
+
+- capacity: at most provider_capacity calls to a provider are in flight at a time
+- priority classes: queued "interactive" calls are always admitted before "batch"
+  calls, and batch calls may only fill part of the capacity, so an interactive call
+  arriving at a busy provider does not have to wait for a batch call to finish
+- weighted fair queuing: within a class, tenants share the capacity in proportion
+  to their weight, however many calls each of them queues
+- admission control: a call is rejected with AdmissionRejectedError when its class
+  already has max_queued_calls waiting
+
+resilient_call() takes a slot for every attempt, so all model call sites (webpage
+summaries included) are scheduled; the Tavily and Sonar requests of the search
+tools are scheduled with scheduled_call(), without the model calls that follow
+them. The tenant and priority class come from the run's configurable:
+
+    await agent.ainvoke(inputs, config={"configurable": {"tenant_id": "acme", "priority": "batch"}})
+
+Queue times and admission counts can be read with get_scheduler_metrics().
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, TypeVar
+
+from langchain_core.runnables import ensure_config
+
+T = TypeVar("T")
+
+# ===== CONFIGURATION =====
+
+# Priority classes, most urgent first
+priority_classes = ["interactive", "batch"]
+
+# Priority class of calls whose run does not set one
+default_priority = "interactive"
+
+# Tenant of calls whose run does not set one
+default_tenant = "default"
+
+# Maximum number of calls in flight per provider
+provider_capacity = {"openai": 32, "perplexity": 8, "tavily": 8}
+default_provider_capacity = 8
+
+# Share of a provider's capacity each priority class may fill
+class_max_share = {"interactive": 1.0, "batch": 0.8}
+
+# Maximum number of calls waiting per provider and priority class
+max_queued_calls = {"interactive": 500, "batch": 5000}
+
+# Fair-share weight of each tenant; unlisted tenants weigh 1
+tenant_weights: dict[str, float] = {}
+
+# ===== SCHEDULER =====
+
+class AdmissionRejectedError(Exception):
+    """Raised when a call is rejected because its priority class's queue is full."""
+
+@dataclass
+class ClassMetrics:
+    """Admission counts and recent queue times of one priority class at one provider."""
+
+    admitted: int = 0
+    rejected: int = 0
+    queued: int = 0
+    max_queue_depth: int = 0
+    queue_seconds: deque = field(default_factory=lambda: deque(maxlen=1000))
+    tenants: Counter = field(default_factory=Counter)
+
+    def queue_percentile(self, percentile: float) -> float | None:
+        if not self.queue_seconds:
+            return None
+        ordered = sorted(self.queue_seconds)
+        return round(ordered[min(int(percentile * len(ordered)), len(ordered) - 1)], 3)
+
+    def summary(self) -> dict:
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queued": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "p50_queue_seconds": self.queue_percentile(0.50),
+            "p95_queue_seconds": self.queue_percentile(0.95),
+            "max_queue_seconds": round(max(self.queue_seconds), 3) if self.queue_seconds else None,
+            "tenants": dict(self.tenants),
+        }
+
+@dataclass
+class _Waiter:
+    tenant: str
+    priority: str
+    enqueued_at: float
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    cancelled: bool = False
+
+class SchedulerSlot:
+    """A provider slot held by one call; release it when the call is done."""
+
+    def __init__(self, scheduler: "ProviderScheduler", priority: str, queue_seconds: float):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.queue_seconds = queue_seconds
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.scheduler._release(self.priority)
+
+class ProviderScheduler:
+    """Admits the calls to one provider by priority class and weighted fair share.
+
+    Fair queuing works on virtual time: every queued call is tagged with the
+    virtual time its tenant would finish at if the tenant got exactly its weighted
+    share, and the call with the smallest tag goes first. A tenant that was idle
+    restarts at the current virtual time, so it cannot save up credit.
+    """
+
+    def __init__(self, provider: str, capacity: int):
+        self.provider = provider
+        self.capacity = capacity
+        self.in_flight = 0
+        self.in_flight_by_class: Counter[str] = Counter()
+        self.metrics = {priority: ClassMetrics() for priority in priority_classes}
+        self._queues: dict[str, list] = {priority: [] for priority in priority_classes}
+        self._virtual_time = {priority: 0.0 for priority in priority_classes}
+        self._tenant_finish: dict[tuple[str, str], float] = {}
+        self._sequence = itertools.count()
+        # Runs on different event loops (e.g. threads) may share the scheduler
+        self._lock = threading.Lock()
+
+    def _class_limit(self, priority: str) -> int:
+        return max(1, int(self.capacity * class_max_share.get(priority, 1.0)))
+
+    def _can_start(self, priority: str) -> bool:
+        return self.in_flight < self.capacity and self.in_flight_by_class[priority] < self._class_limit(priority)
+
+    def _start(self, priority: str) -> None:
+        self.in_flight += 1
+        self.in_flight_by_class[priority] += 1
+
+    async def acquire(self, tenant: str, priority: str) -> SchedulerSlot:
+        """Wait until the call may start, and take a slot for it.
+
+        Raises:
+            AdmissionRejectedError: If the priority class's queue is full
+        """
+        enqueued_at = time.monotonic()
+        metrics = self.metrics[priority]
+        with self._lock:
+            queue = self._queues[priority]
+            # Start right away when nobody of this or a more urgent class is waiting
+            ahead = any(self._queues[other] for other in priority_classes[:priority_classes.index(priority) + 1])
+            if not ahead and self._can_start(priority):
+                self._start(priority)
+                metrics.admitted += 1
+                metrics.tenants[tenant] += 1
+                metrics.queue_seconds.append(0.0)
+                return SchedulerSlot(self, priority, 0.0)
+
+            if len(queue) >= max_queued_calls.get(priority, 0):
+                metrics.rejected += 1
+                raise AdmissionRejectedError(
+                    f"{self.provider} queue for {priority} calls is full ({len(queue)} waiting)"
+                )
+
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(tenant, priority, enqueued_at, loop.create_future(), loop)
+            start_tag = max(self._virtual_time[priority], self._tenant_finish.get((priority, tenant), 0.0))
+            finish_tag = start_tag + 1.0 / tenant_weights.get(tenant, 1.0)
+            self._tenant_finish[(priority, tenant)] = finish_tag
+            entry = (finish_tag, next(self._sequence), waiter)
+            heapq.heappush(queue, entry)
+            metrics.queued += 1
+            metrics.max_queue_depth = max(metrics.max_queue_depth, len(queue))
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.cancelled = True
+                if entry in queue:
+                    queue.remove(entry)
+                    heapq.heapify(queue)
+                granted = waiter.future.done() and not waiter.future.cancelled()
+            if granted:
+                # The slot was granted just as the caller gave up
+                self._release(priority)
+            raise
+
+        queue_seconds = time.monotonic() - enqueued_at
+        metrics.admitted += 1
+        metrics.tenants[tenant] += 1
+        metrics.queue_seconds.append(queue_seconds)
+        return SchedulerSlot(self, priority, queue_seconds)
+
+    def _release(self, priority: str) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.in_flight_by_class[priority] -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to queued calls, most urgent class and smallest tag first."""
+        for priority in priority_classes:
+            queue = self._queues[priority]
+            while queue and self._can_start(priority):
+                finish_tag, _, waiter = heapq.heappop(queue)
+                if waiter.cancelled:
+                    continue
+                self._virtual_time[priority] = max(self._virtual_time[priority], finish_tag - 1.0 / tenant_weights.get(waiter.tenant, 1.0))
+                self._start(priority)
+                waiter.loop.call_soon_threadsafe(self._grant, waiter)
+
+    def _grant(self, waiter: _Waiter) -> None:
+        if waiter.future.done():
+            # The caller gave up while the slot was on its way; hand it back
+            self._release(waiter.priority)
+            return
+        waiter.future.set_result(None)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "waiting": {priority: len(queue) for priority, queue in self._queues.items()},
+                "classes": {priority: metrics.summary() for priority, metrics in self.metrics.items()},
+            }
+
+_schedulers: dict[str, ProviderScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(provider: str) -> ProviderScheduler:
+    """Get the scheduler of a provider, creating it on first use."""
+    with _schedulers_lock:
+        if provider not in _schedulers:
+            _schedulers[provider] = ProviderScheduler(provider, provider_capacity.get(provider, default_provider_capacity))
+        return _schedulers[provider]
+
+def get_scheduler_metrics() -> dict[str, dict]:
+    """Get the capacity, queues and queue-time metrics of every provider's scheduler."""
+    return {provider: scheduler.summary() for provider, scheduler in list(_schedulers.items())}
+
+# ===== SCHEDULED CALLS =====
+
+def current_tenant_and_priority() -> tuple[str, str]:
+    """Tenant and priority class of the run executing the current call, from its configurable."""
+    configurable = ensure_config().get("configurable", {})
+    tenant = str(configurable.get("tenant_id") or default_tenant)
+    priority = configurable.get("priority")
+    return tenant, priority if priority in priority_classes else default_priority
+
+async def acquire_slot(provider: str) -> SchedulerSlot:
+    """Wait for a slot for a call to a provider, on behalf of the current run's tenant.
+
+    Raises:
+        AdmissionRejectedError: If the run's priority class has too many calls waiting
+    """
+    tenant, priority = current_tenant_and_priority()
+    return await get_scheduler(provider).acquire(tenant, priority)
+
+async def scheduled_call(provider: str, call: Callable[[], Awaitable[T]]) -> T:
+    """Run a provider call once the provider's scheduler admits it."""
+    slot = await acquire_slot(provider)
+    try:
+        return await call()
+    finally:
+        slot.release()
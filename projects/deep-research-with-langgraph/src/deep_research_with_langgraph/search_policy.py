@@ -0,0 +1,90 @@
+"""Adaptive Search Parameters.
+
+tavily_search used to fetch and summarize 3 general-topic results for every query,
+whatever the query. This module picks max_results and topic per call instead:
+
+- broad queries early in a researcher's run get more results, to cover the ground
+- once a researcher's recent searches mostly return URLs it has already seen, it
+  gets fewer results, since each extra page is downloaded and summarized for little
+  new information
+- time-sensitive queries use Tavily's "news" topic
+
+Novelty is the share of a search's results whose URLs the researcher had not seen
+before. The decision for every call is reported as a "search_policy_decision" event.
+"""
+
+import re
+from dataclasses import dataclass
+
+from deep_research_with_langgraph.citations import canonicalize_url
+
+# ===== CONFIGURATION =====
+
+# Results per query when no other rule applies
+default_max_results = 3
+
+# Results per query for broad queries early in a researcher's run
+broad_max_results = 5
+
+# Searches of a researcher that count as early
+broad_query_count = 2
+
+# Queries with at most this many words count as broad
+broad_query_max_words = 6
+
+# Number of recent searches whose novelty is averaged
+novelty_window = 2
+
+# Average novelty below which fewer results are requested, with the results used then
+low_novelty_levels = [(0.25, 1), (0.5, 2)]
+
+# Words marking a time-sensitive query
+time_sensitive_markers = re.compile(
+    r"\b(latest|recent(?:ly)?|today|yesterday|this (?:week|month)|breaking|just (?:announced|released)|news)\b",
+    re.IGNORECASE
+)
+
+# URL lines of the results in a formatted tavily_search output
+result_url_pattern = re.compile(r"^URL: (\S+)$", re.MULTILINE)
+
+# ===== POLICY =====
+
+@dataclass
+class SearchDecision:
+    """Search parameters chosen for one query."""
+
+    max_results: int
+    topic: str
+    reason: str
+
+def decide_search(query: str, search_index: int, novelty: list[float]) -> SearchDecision:
+    """Choose max_results and topic for a researcher's next search.
+
+    Args:
+        query: The search query
+        search_index: Number of searches the researcher has already made
+        novelty: Novelty of the researcher's earlier searches, oldest first
+
+    Returns:
+        The chosen parameters and the reason for them
+    """
+    topic = "news" if time_sensitive_markers.search(query) else "general"
+    recent = novelty[-novelty_window:]
+    average_novelty = sum(recent) / len(recent) if recent else 1.0
+
+    for threshold, max_results in low_novelty_levels:
+        if len(recent) >= novelty_window and average_novelty < threshold:
+            return SearchDecision(max_results, topic, f"recent novelty {average_novelty:.2f} below {threshold}")
+    if search_index < broad_query_count and len(query.split()) <= broad_query_max_words:
+        return SearchDecision(broad_max_results, topic, "broad early query")
+    return SearchDecision(default_max_results, topic, "default")
+
+def result_novelty(urls: list[str], seen_urls: set[str]) -> float:
+    """Share of result URLs not seen before; 0 for an empty result."""
+    if not urls:
+        return 0.0
+    return sum(1 for url in urls if canonicalize_url(url) not in seen_urls) / len(urls)
+
+def search_result_urls(output: str) -> list[str]:
+    """URLs of the results in a tavily_search output, in result order."""
+    return result_url_pattern.findall(output)
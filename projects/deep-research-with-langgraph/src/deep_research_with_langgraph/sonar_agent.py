@@ -4,8 +4,10 @@ This module contains the logic for the Sonar Researcher agent, including the orc
 and tool nodes. It is extracted to avoid circular dependencies with the supervisor.
 """
 
+import re
 from typing import List, Annotated
 from typing_extensions import Literal
+from uuid import uuid4
 
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, BaseMessage, filter_messages
 from langchain_core.tools import tool
@@ -15,6 +17,19 @@ from langgraph.graph.message import add_messages
 
 from deep_research_with_langgraph.state_scope import AgentState
 from deep_research_with_langgraph.utils import think_tool, get_today_str
+from deep_research_with_langgraph.compression import observe_tool_outputs, pop_compressor
+from deep_research_with_langgraph.blob_store import get_blob_store
+from deep_research_with_langgraph.resilience import resilient_call
+from deep_research_with_langgraph.batch_api import invoke_model
+from deep_research_with_langgraph.events import emit_event
+from deep_research_with_langgraph.progress import report_progress
+from deep_research_with_langgraph.scheduler import scheduled_call
+from deep_research_with_langgraph.researcher_budget import (
+    budget_exhausted, budget_note, close_dangling_tool_calls, response_tokens,
+    search_limit_reason, search_tool_names, skipped_tool_messages, split_search_calls
+)
+from deep_research_with_langgraph.citations import canonicalize_url, register_source, source_id_prefix
+from deep_research_with_langgraph.caches import search_cache
 from deep_research_with_langgraph.prompts import (
     sonar_research_prompt, 
     compress_sonar_prompt,
@@ -23,6 +38,12 @@ from deep_research_with_langgraph.prompts import (
 
 # ===== CONFIGURATION =====
 
+# Heading of the source list sonar_tool appends to every answer
+sources_heading = "### Extracted Sources:"
+
+# A line of that source list: the source ID and the URL
+source_line_pattern = re.compile(r"^\[(" + re.escape(source_id_prefix) + r"\d+)\] (\S+)$", re.MULTILINE)
+
 @tool
 async def sonar_tool(query: str):
     """Query Perplexity Sonar model for detailed, cited answers to research questions.
@@ -31,28 +52,43 @@ async def sonar_tool(query: str):
         query: The search query to send to the Sonar model.
         
     Returns:
-        A formatted string containing the answer and a list of extracted sources/citations.
+        A formatted string containing the answer, with citations replaced by source IDs,
+        and the list of extracted sources.
     """
-    # Initialize the Sonar model
-    # Note: Using 'sonar-pro' as a placeholder, can be configured via env vars or args if needed.
-    # We use temperature=0 for consistent, factual results.
-    model = init_chat_model("sonar", model_provider="perplexity", temperature=0)
-    
-    # helper for cleaner execution
-    response = await model.ainvoke([HumanMessage(content=query)])
-    
-    # Extract citations
-    # Perplexity API returns 'citations' in additional_kwargs as a list of URLs
-    citations = response.additional_kwargs.get("citations", [])
-    
-    formatted_content = response.content
+    # Answers are shared with concurrent runs through the search cache; every run
+    # numbers their sources in its own citation registry, so the answer is cached as is
+    cache_key = ("sonar", query)
+    cached = search_cache.get(cache_key)
+    if cached is None:
+        # Initialize the Sonar model
+        # Note: Using 'sonar-pro' as a placeholder, can be configured via env vars or args if needed.
+        # We use temperature=0 for consistent, factual results.
+        model = init_chat_model("sonar", model_provider="perplexity", temperature=0)
+
+        # Sonar calls share Perplexity's capacity with concurrent runs
+        response = await scheduled_call("perplexity", lambda: model.ainvoke([HumanMessage(content=query)]))
+
+        # Extract citations
+        # Perplexity API returns 'citations' in additional_kwargs as a list of URLs
+        cached = (response.content, response.additional_kwargs.get("citations", []))
+        search_cache.put(cache_key, cached)
+
+    formatted_content, citations = cached
     
+    # Sonar cites its sources as [1], [2], ... into the citations list; use the run-wide source IDs instead
+    source_ids = {str(i): register_source(url) for i, url in enumerate(citations, 1)}
+    formatted_content = re.sub(
+        r"\[(\d+)\]",
+        lambda m: f"[{source_ids[m.group(1)]}]" if m.group(1) in source_ids else m.group(0),
+        formatted_content
+    )
+
     # Append citations if they exist and are not already in the text (though usually they aren't explicit)
     if citations:
-        formatted_content += "\n\n### Extracted Sources:\n"
+        formatted_content += f"\n\n{sources_heading}\n"
         for i, url in enumerate(citations, 1):
-            formatted_content += f"[{i}] {url}\n"
-            
+            formatted_content += f"[{source_ids[str(i)]}] {url}\n"
+
     return formatted_content
 
 # Tools available to the orchestrator
@@ -60,11 +96,12 @@ search_tools = [sonar_tool, think_tool]
 
 # Initialize the orchestrator model (The "reasoning" brain driving the loop)
 # We use a capable model like GPT-4o for the orchestration logic
-orchestrator_model = init_chat_model("gpt-4o", model_provider="openai", temperature=0)
+# Timeouts and retries of the orchestrator and compression are handled by the resilience layer
+orchestrator_model = init_chat_model("gpt-4o", model_provider="openai", max_retries=0, temperature=0)
 orchestrator_model_with_tools = orchestrator_model.bind_tools(search_tools)
 
 # Model for compression/summarization
-compress_model = init_chat_model("gpt-4.1-mini", model_provider="openai", temperature=0, max_tokens=32000)
+compress_model = init_chat_model("gpt-4.1-mini", model_provider="openai", max_retries=0, temperature=0, max_tokens=32000)
 
 
 # ===== STATE DEFINITIONS =====
@@ -75,10 +112,42 @@ class SonarResearcherState(AgentState):
     Extends AgentState to include the specific messages for the research loop.
     """
     researcher_messages: Annotated[List[BaseMessage], add_messages]
+    research_topic: str
+    research_id: str
+    # Tool rounds, searches and tokens counted against the researcher's budgets
+    tool_call_iterations: int
+    search_calls: int
+    researcher_tokens: int
+    # Canonical URLs of the sources cited by the researcher's answers, keyed by source ID
+    citations: dict[str, str]
     compressed_research: str
     raw_notes: Annotated[List[str], lambda x, y: x + y]
 
 
+# ===== SOURCE LISTS =====
+
+def split_sources(output: str) -> tuple[str, dict[str, str]]:
+    """Split a sonar_tool answer into its text and its sources, keyed by source ID."""
+    text, heading, source_list = output.partition(f"\n\n{sources_heading}\n")
+    if not heading:
+        return output, {}
+    return text, {source_id: canonicalize_url(url) for source_id, url in source_line_pattern.findall(source_list)}
+
+def strip_source_lists(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """Remove the source lists from the sonar_tool answers in a message history."""
+    return [
+        message.model_copy(update={"content": split_sources(message.content)[0]})
+        if isinstance(message, ToolMessage) and message.name == "sonar_tool" and isinstance(message.content, str)
+        else message
+        for message in messages
+    ]
+
+def format_source_table(citations: dict[str, str]) -> str:
+    """One line per cited source, in source ID order."""
+    ordered = sorted(citations.items(), key=lambda item: int(item[0].removeprefix(source_id_prefix)))
+    return "\n".join(f"[{source_id}] {url}" for source_id, url in ordered)
+
+
 # ===== NODES =====
 
 async def orchestrator(state: SonarResearcherState):
@@ -96,23 +165,32 @@ async def orchestrator(state: SonarResearcherState):
         ]
         
         # Invoke the orchestrator model
-        response = await orchestrator_model_with_tools.ainvoke(initial_messages)
+        response = await resilient_call(
+            "orchestrator", "openai", lambda: orchestrator_model_with_tools.ainvoke(initial_messages)
+        )
         
         # Return initial messages + response so they are added to state history
-        return {"researcher_messages": initial_messages + [response]}
+        return {
+            "researcher_messages": initial_messages + [response],
+            "researcher_tokens": state.get("researcher_tokens", 0) + response_tokens(initial_messages, response)
+        }
     
     # Invoke the orchestrator model with existing history
-    response = await orchestrator_model_with_tools.ainvoke(messages)
+    response = await resilient_call("orchestrator", "openai", lambda: orchestrator_model_with_tools.ainvoke(messages))
     
-    return {"researcher_messages": [response]}
+    return {
+        "researcher_messages": [response],
+        "researcher_tokens": state.get("researcher_tokens", 0) + response_tokens(messages, response)
+    }
 
 
 async def tool_node(state: SonarResearcherState):
-    """Execute tool calls requested by the orchestrator."""
+    """Execute tool calls requested by the orchestrator, within the researcher's search limit."""
     messages = state.get("researcher_messages", [])
     last_message = messages[-1]
     
-    tool_calls = last_message.tool_calls
+    tool_calls, skipped = split_search_calls(state, last_message.tool_calls)
+    research_id = state.get("research_id") or uuid4().hex
     results = []
     
     # Tools map
@@ -130,25 +208,81 @@ async def tool_node(state: SonarResearcherState):
                 tool_call_id=tool_call["id"],
                 name=tool_name
             ))
-            
-    return {"researcher_messages": results}
 
+    # Collect the cited sources once, so the answers can be compressed without their source lists
+    citations = dict(state.get("citations", {}))
+    answers = []
+    for result in results:
+        answer, sources = split_sources(result.content) if result.name == "sonar_tool" else (result.content, {})
+        citations.update(sources)
+        answers.append(answer)
 
-def compress_sonar_results(state: SonarResearcherState):
-    """Synthesize all Sonar findings into a clean notes format."""
-    messages = state.get("researcher_messages", [])
-    
-    # Prepare the compression prompt
-    system_prompt = compress_sonar_prompt.format(date=get_today_str())
-    
-    # Invoke compression model
-    # We use the same rigorous human message as the standard researcher to ensure density and detail are preserved
-    response = compress_model.invoke(
-        [SystemMessage(content=system_prompt)] + messages + 
-        [HumanMessage(content=compress_research_human_message.format(research_topic=state.get("research_brief", "research topic")))]
+    # Start compressing Sonar answers while the orchestrator keeps going
+    observe_tool_outputs(
+        research_id,
+        state.get("research_topic") or state.get("research_brief", ""),
+        [tool_call for tool_call in tool_calls if tool_call["name"] in tools_map],
+        answers
     )
+
+    searches = sum(1 for tool_call in tool_calls if tool_call["name"] in search_tool_names)
+    if searches:
+        report_progress("searches_performed", {"searches": searches})
+
+    return {
+        "researcher_messages": results + skipped_tool_messages(skipped, search_limit_reason()),
+        "research_id": research_id,
+        "tool_call_iterations": state.get("tool_call_iterations", 0) + 1,
+        "search_calls": state.get("search_calls", 0) + searches,
+        "citations": citations
+    }
+
+
+async def compress_sonar_results(state: SonarResearcherState):
+    """Synthesize all Sonar findings into a clean notes format.
+
+    A researcher stopped by its budget still has unanswered tool calls; they are
+    answered with a note, and the compressed research says why it stopped.
+    """
+    research_id = state.get("research_id", "")
+    stop_reason = budget_exhausted(state) if state["researcher_messages"][-1].tool_calls else None
+    closing_messages = close_dangling_tool_calls(state["researcher_messages"], stop_reason) if stop_reason else []
+    if stop_reason:
+        emit_event(
+            "researcher_budget_exhausted",
+            research_id=research_id,
+            research_topic=state.get("research_topic") or state.get("research_brief", ""),
+            reason=stop_reason
+        )
+    messages = list(state.get("researcher_messages", [])) + closing_messages
+
+    # Merge the background partial compressions when hierarchical compression is enabled
+    compressed_research = ""
+    compressor = pop_compressor(research_id)
+    if compressor is not None:
+        compressed_research = await compressor.finalize()
+
+    if not compressed_research:
+        # Prepare the compression prompt
+        system_prompt = compress_sonar_prompt.format(date=get_today_str())
+
+        # The answers' source lists repeat the same URLs; they are replaced by a single source table
+        source_table = format_source_table(state.get("citations", {}))
+        source_messages = [HumanMessage(content=f"{sources_heading}\n{source_table}")] if source_table else []
+
+        # Invoke compression model
+        # We use the same rigorous human message as the standard researcher to ensure density and detail are preserved
+        compress_messages = (
+            [SystemMessage(content=system_prompt)] + strip_source_lists(messages) + source_messages +
+            [HumanMessage(content=compress_research_human_message.format(research_topic=state.get("research_brief", "research topic")))]
+        )
+        response = await invoke_model("compress_research", "openai", compress_model, compress_messages)
+        compressed_research = response.content
+
+    if stop_reason:
+        compressed_research = f"{compressed_research}\n\n{budget_note(stop_reason)}"
     
-    # Extract raw notes from tool and AI messages
+    # Extract raw notes from tool and AI messages and keep them out of graph state
     raw_notes = [
         str(m.content) for m in filter_messages(
             messages, 
@@ -157,20 +291,27 @@ def compress_sonar_results(state: SonarResearcherState):
     ]
     
     return {
-        "compressed_research": response.content,
-        "raw_notes": ["\n".join(raw_notes)]
+        "compressed_research": compressed_research,
+        "raw_notes": [get_blob_store().put("\n".join(raw_notes))],
+        "researcher_messages": closing_messages
     }
 
 
 # ===== EDGES =====
 
 def should_continue(state: SonarResearcherState) -> Literal["tool_node", "compress_sonar_results"]:
-    """Decide whether to modify search or finish."""
+    """Decide whether to modify search or finish.
+
+    The researcher also finishes once it has used up its iteration, search or
+    token budget, even if the orchestrator asked for more tool calls.
+    """
     messages = state.get("researcher_messages", [])
     last_message = messages[-1]
     
-    # If tool calls are present, execute them
+    # If tool calls are present, execute them unless a budget is used up
     if last_message.tool_calls:
+        if budget_exhausted(state) is not None:
+            return "compress_sonar_results"
         return "tool_node"
     
     # Otherwise, we assume the agent is done searching and ready to report
@@ -194,5 +335,6 @@ researcher_builder.add_edge("tool_node", "orchestrator")
 # 'compress_sonar_results' is the end of this subgraph, but needs to output to 'notes' which is handled in the node
 researcher_builder.add_edge("compress_sonar_results", END)
 
-sonar_researcher = researcher_builder.compile()
+# Researchers run without a checkpointer, see checkpointing.py
+sonar_researcher = researcher_builder.compile(checkpointer=False)
 
@@ -7,12 +7,41 @@ research supervisor workflow, including coordination state and research tools.
 
 import operator
 from pydantic import BaseModel, Field
-from typing_extensions import Annotated, Sequence, TypedDict
+from typing_extensions import Annotated, NotRequired, Sequence, TypedDict
 from langchain_core.tools import  tool
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 
 
+class ResearchNote(TypedDict):
+    """Compressed findings returned by a single ConductResearch call."""
+
+    # Id of the ConductResearch tool call that produced the note
+    tool_call_id: str
+    # Topic the researcher was asked to investigate
+    research_topic: str
+    # Compressed research returned by the researcher
+    content: str
+    # Blob store reference to the researcher's raw notes
+    raw_notes_ref: str
+    # Short digest of the findings shown to the supervisor in later turns
+    digest: NotRequired[str]
+    # Sources cited by the content, keyed by source ID, so the IDs resolve after a restart
+    sources: NotRequired[dict[str, dict]]
+
+
+def merge_notes(left: list[ResearchNote], right: list[ResearchNote]) -> list[ResearchNote]:
+    """Reducer for research notes keyed by tool_call_id.
+
+    New notes are appended in arrival order; a note whose tool_call_id is already
+    present replaces the existing one instead of being duplicated.
+    """
+    merged = {note["tool_call_id"]: note for note in left}
+    for note in right:
+        merged[note["tool_call_id"]] = note
+    return list(merged.values())
+
+
 class SupervisorState(TypedDict):
     """
     State for the multi-agent research supervisor.
@@ -25,14 +54,22 @@ class SupervisorState(TypedDict):
     supervisor_messages: Annotated[Sequence[BaseMessage], add_messages]
     # Detailed research brief that guides the overall research direction
     research_brief: str
-    # Processed and structured notes ready for final report generation
-    notes: Annotated[list[str], operator.add] = []
+    # Structured notes recorded as each ConductResearch result arrives
+    notes: Annotated[list[ResearchNote], merge_notes] = []
     # Counter tracking the number of research iterations performed
     research_iterations: int = 0
-    # Raw unprocessed research notes collected from sub-agent research
+    # Blob store references to the raw research notes collected from sub-agent research
     raw_notes: Annotated[list[str], operator.add] = []
-    # Mode of research: 'tavily' (default) or 'sonar'
+    # Mode of research, selects a registered research backend: 'tavily' (default), 'sonar' or 'hybrid'
     research_mode: str = "tavily"
+    # Id of this supervisor run, keys researchers that outlive a supervisor turn
+    research_run_id: str
+    # Structured events such as researcher timeouts and failures
+    research_events: Annotated[list[dict], operator.add] = []
+    # Prompt size and token usage of every supervisor turn
+    supervisor_token_usage: Annotated[list[dict], operator.add] = []
+    # Id of the run's progress tracking, see progress.py
+    progress_id: str
 
 @tool
 class ConductResearch(BaseModel):
@@ -19,13 +19,22 @@ class ResearcherState(TypedDict):
     """
     State for the research agent containing message history and research metadata.
 
-    This state tracks the researcher's conversation, iteration count for limiting
-    tool calls, the research topic being investigated, compressed findings,
-    and raw research notes for detailed analysis.
+    This state tracks the researcher's conversation, the tool rounds, searches and
+    tokens counted against the researcher's budgets, the URLs its searches returned
+    and how many of them were new (used to size later searches), the research topic being
+    investigated, compressed findings, and blob store references to the raw
+    research notes for detailed analysis.
+    The research_id keys any process-local helpers (such as the background
+    compressor) to this researcher.
     """
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]
     tool_call_iterations: int
+    search_calls: int
+    researcher_tokens: int
+    seen_urls: List[str]
+    search_novelty: List[float]
     research_topic: str
+    research_id: str
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
 
@@ -34,7 +43,8 @@ class ResearcherOutputState(TypedDict):
     Output state for the research agent containing final research results.
 
     This represents the final output of the research process with compressed
-    research findings and all raw notes from the research process.
+    research findings and blob store references to all raw notes from the
+    research process.
     """
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
@@ -6,19 +6,23 @@ the research agent scoping workflow, including researcher state management and o
 """
 
 import operator
-from typing_extensions import Optional, Annotated, List, Sequence, Literal
+from typing_extensions import Optional, Annotated, List, Sequence, Literal, NotRequired
 
 from langchain_core.messages import BaseMessage
 from langgraph.graph import MessagesState
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
+from deep_research_with_langgraph.state_multi_agent_supervisor import ResearchNote, merge_notes
+
 
 # ===== STATE DEFINITIONS =====
 
 class AgentInputState(MessagesState):
-    """Input state for the full agent - only contains messages from user input."""
-    pass
+    """Input state for the full agent - messages from user input and an optional research mode."""
+
+    # Research backend to use: 'tavily' (default), 'sonar' or 'hybrid'
+    research_mode: NotRequired[Literal["tavily", "sonar", "hybrid"]]
 
 class AgentState(MessagesState):
     """
@@ -31,16 +35,26 @@ class AgentState(MessagesState):
 
     # Research brief generated from user conversation history
     research_brief: Optional[str]
+    # Brief produced by the combined scoping call, consumed by write_research_brief
+    scoping_brief: str
     # Messages exchanged with the supervisor agent for coordination
     supervisor_messages: Annotated[Sequence[BaseMessage], add_messages]
-    # Raw unprocessed research notes collected during the research phase
+    # Blob store references to the raw research notes collected during the research phase
     raw_notes: Annotated[list[str], operator.add] = []
-    # Processed and structured notes ready for report generation
-    notes: Annotated[list[str], operator.add] = []
+    # Structured notes, one per ConductResearch call, ready for report generation
+    notes: Annotated[list[ResearchNote], merge_notes] = []
+    # Routing decision taken after the brief was written (fast path or supervisor)
+    routing_decision: dict
+    # Structured events such as researcher timeouts and failures
+    research_events: Annotated[list[dict], operator.add] = []
+    # Prompt size and token usage of every supervisor turn
+    supervisor_token_usage: Annotated[list[dict], operator.add] = []
+    # Id of the run's progress tracking, see progress.py
+    progress_id: str
     # Final formatted research report
     final_report: str
-    # Mode of research: 'tavily' (default) or 'sonar'
-    research_mode: Literal["tavily", "sonar"] = "tavily"
+    # Mode of research: 'tavily' (default), 'sonar' or 'hybrid' (both concurrently)
+    research_mode: Literal["tavily", "sonar", "hybrid"] = "tavily"
 
 
 # ===== STRUCTURED OUTPUT SCHEMAS =====
@@ -64,3 +78,52 @@ class ResearchQuestion(BaseModel):
     research_brief: str = Field(
         description="A research question that will be used to guide the research.",
     )
+
+class ScopeResearch(BaseModel):
+    """Schema for the combined clarification decision and research brief."""
+
+    need_clarification: bool = Field(
+        description="Whether the user needs to be asked a clarifying question.",
+    )
+    question: str = Field(
+        description="A question to ask the user to clarify the report scope",
+    )
+    verification: str = Field(
+        description="Verify message that we will start research after the user has provided the necessary information.",
+    )
+    research_brief: str = Field(
+        description="A research question that will be used to guide the research. Empty if clarification is needed.",
+    )
+
+class BriefComplexity(BaseModel):
+    """Schema for classifying how much research a brief needs."""
+
+    complexity: Literal["simple", "complex"] = Field(
+        description="'simple' for a single narrow factual question, 'complex' for anything needing several lines of research.",
+    )
+    reason: str = Field(
+        description="One sentence explaining the classification.",
+    )
+
+class ReportSection(BaseModel):
+    """Schema for one section of a sectioned final report."""
+
+    title: str = Field(
+        description="Title of the section.",
+    )
+    description: str = Field(
+        description="What the section should cover, in one or two sentences.",
+    )
+    note_indices: list[int] = Field(
+        description="Numbers of the research notes whose findings the section draws on.",
+    )
+
+class ReportOutline(BaseModel):
+    """Schema for the outline of a sectioned final report."""
+
+    title: str = Field(
+        description="Title of the report.",
+    )
+    sections: list[ReportSection] = Field(
+        description="Sections of the report, in reading order, not counting the introduction and sources.",
+    )
@@ -0,0 +1,109 @@
+"""Compacted Supervisor Context.
+
+Every supervisor turn used to resend the full compressed research of every earlier
+ConductResearch call, so the prompt grew with each iteration. This module builds a
+compacted view of the supervisor history instead: results from the latest research
+rounds are shown in full, older ones are replaced by a short digest of the note (its
+topic, key findings and reported gaps).
+
+The digest is extracted locally, without a model call, and only changes what the
+supervisor model sees; the full notes stay in state for the final report.
+"""
+
+import re
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from deep_research_with_langgraph.state_multi_agent_supervisor import ResearchNote
+from deep_research_with_langgraph.topic_overlap import tfidf_matrix, tokenize
+
+# ===== CONFIGURATION =====
+
+# Number of most recent research rounds whose results the supervisor sees in full
+full_research_rounds = 1
+
+# Maximum number of key findings in a digest
+digest_max_findings = 8
+
+# Maximum number of reported gaps in a digest
+digest_max_gaps = 3
+
+# Findings longer than this are cut in the digest
+digest_max_claim_chars = 300
+
+# Phrases marking a statement about missing or uncertain information
+gap_markers = re.compile(
+    r"\b(no (?:information|data|details|results|evidence)|not (?:found|available|publicly|disclosed|specified|clear)"
+    r"|unclear|unknown|could not|couldn't|unable to|limited (?:information|data)|conflicting|further research)\b",
+    re.IGNORECASE
+)
+
+# ===== DIGESTS =====
+
+_sentence_boundary = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\[\"(])")
+
+def _claims(content: str) -> list[str]:
+    """Split findings into sentence-level claims, skipping headings and short fragments."""
+    claims = []
+    for line in content.splitlines():
+        line = line.strip().lstrip("-*•").strip()
+        if not line or line.startswith("#") or (line.startswith("**") and line.endswith("**")):
+            continue
+        claims.extend(sentence for sentence in _sentence_boundary.split(line) if len(tokenize(sentence)) >= 4)
+    return claims
+
+def _shorten(claim: str) -> str:
+    if len(claim) <= digest_max_claim_chars:
+        return claim
+    return claim[:digest_max_claim_chars].rsplit(" ", 1)[0] + " …"
+
+def digest_note(research_topic: str, content: str) -> str:
+    """Summarize a research note as its topic, key findings and gaps.
+
+    Key findings are the claims closest to the research topic by TF-IDF
+    similarity, kept in their original order.
+    """
+    claims = _claims(content)
+    gaps = [claim for claim in claims if gap_markers.search(claim)][:digest_max_gaps]
+    findings = [claim for claim in claims if claim not in gaps]
+
+    if len(findings) > digest_max_findings:
+        vectors = tfidf_matrix([tokenize(research_topic)] + [tokenize(claim) for claim in findings])
+        scores = vectors[1:] @ vectors[0]
+        # Favor earlier claims on ties; compressed notes lead with their main findings
+        ranked = sorted(range(len(findings)), key=lambda i: (-scores[i], i))[:digest_max_findings]
+        findings = [findings[i] for i in sorted(ranked)]
+
+    lines = [f"Topic: {research_topic}", "Key findings:"]
+    lines += [f"- {_shorten(claim)}" for claim in findings] or ["- (none)"]
+    lines += ["Gaps:"] + ([f"- {_shorten(claim)}" for claim in gaps] or ["- none reported"])
+    lines.append("(Digest of an earlier research result; the full findings are kept for the final report.)")
+    return "\n".join(lines)
+
+# ===== COMPACTION =====
+
+def compact_supervisor_messages(messages: list[BaseMessage], notes: list[ResearchNote]) -> tuple[list[BaseMessage], int]:
+    """Replace ConductResearch results from older rounds with their digests.
+
+    A round is one supervisor message with tool calls and the results that
+    answer it. Results of the last full_research_rounds rounds stay in full.
+
+    Returns:
+        The compacted messages and the number of results that were replaced
+    """
+    rounds = [i for i, message in enumerate(messages) if isinstance(message, AIMessage) and message.tool_calls]
+    if len(rounds) <= full_research_rounds:
+        return list(messages), 0
+    cutoff = rounds[-full_research_rounds] if full_research_rounds > 0 else len(messages)
+
+    notes_by_id = {note["tool_call_id"]: note for note in notes}
+    compacted = []
+    replaced = 0
+    for i, message in enumerate(messages):
+        note = notes_by_id.get(getattr(message, "tool_call_id", None))
+        if i < cutoff and isinstance(message, ToolMessage) and message.name == "ConductResearch" and note is not None:
+            digest = note.get("digest") or digest_note(note["research_topic"], note["content"])
+            message = ToolMessage(content=digest, name=message.name, tool_call_id=message.tool_call_id, id=message.id)
+            replaced += 1
+        compacted.append(message)
+    return compacted, replaced
@@ -0,0 +1,39 @@
+"""Token Counting.
+
+Shared helper for budgeting prompts and tracking their size. Tokens are counted with
+tiktoken when it is installed and its encoding can be loaded (tiktoken downloads it on
+first use, which can fail offline); otherwise they are estimated from the length of
+the text.
+"""
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None  # Fall back to a character-based estimate
+
+# ===== CONFIGURATION =====
+
+# Tokenizer used for counting; o200k_base matches the GPT-4o and GPT-4.1 models
+token_encoding = "o200k_base"
+
+# ===== TOKEN COUNTING =====
+
+_encoding = None
+
+def _get_encoding():
+    """Load the tokenizer once, giving up on tiktoken if the encoding cannot be loaded."""
+    global _encoding, tiktoken
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding(token_encoding)
+        except Exception as e:
+            print(f"Failed to load tokenizer {token_encoding}, estimating token counts: {e}")
+            tiktoken = None
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of a text, estimating 4 characters per token without a tokenizer."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
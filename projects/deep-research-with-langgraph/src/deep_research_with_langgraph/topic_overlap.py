@@ -0,0 +1,219 @@
+"""Topic Overlap Detection for Research Delegation.
+
+The supervisor often delegates ConductResearch topics whose descriptions overlap
+heavily, and every topic costs a full researcher subgraph. This module scores the
+pairwise similarity of research topics locally (TF-IDF cosine and word shingles,
+computed with NumPy) and plans which topics to launch, merge or drop before any
+researcher is started.
+
+Topics that name different entities ("Notion pricing" vs "Asana pricing") are
+never merged, however similar their wording is: the supervisor fans out one topic
+per product or company from a template, and those are separate research.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# ===== CONFIGURATION =====
+
+# Similarity at or above which two topics are considered the same research
+duplicate_threshold = 0.9
+
+# Similarity at or above which two topics are merged into a single researcher;
+# topics written from one template about different subjects score up to about 0.85
+merge_threshold = 0.86
+
+# Size of the word shingles used for the Jaccard similarity
+shingle_size = 3
+
+# Words that carry no topical information
+stopwords = frozenset("""
+a an and are as at be been but by can could do does for from has have how in into is it its
+of on or should that the their them these this those to was were what when where which who
+why will with would about also any all each more most other some such than then there
+research investigate find information provide detailed include including focus specific
+""".split())
+
+# ===== SIMILARITY =====
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase a text and split it into informative word tokens."""
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in stopwords]
+
+def named_entities(text: str) -> frozenset[str]:
+    """Capitalized names in a text (products, companies, places), lowercased.
+
+    A capital at the start of a sentence is only counted for acronyms and
+    camel-case names, since it is usually just grammar.
+    """
+    entities = set()
+    for sentence in re.split(r"[.!?:;\n]+", text):
+        for position, word in enumerate(re.findall(r"[A-Za-z0-9][A-Za-z0-9&+'-]*", sentence)):
+            if not word[0].isupper() or word.lower() in stopwords:
+                continue
+            if position == 0 and not any(char.isupper() for char in word[1:]):
+                continue
+            entities.add(word.lower())
+    return frozenset(entities)
+
+def names_different_entities(a: frozenset[str], b: frozenset[str]) -> bool:
+    """Whether each of two topics names an entity the other one does not."""
+    return bool(a - b) and bool(b - a)
+
+def shingle_similarity(a: list[str], b: list[str], size: int = shingle_size) -> float:
+    """Jaccard similarity of the word shingles of two token lists."""
+    shingles_a = {tuple(a[i:i + size]) for i in range(max(len(a) - size + 1, 1))}
+    shingles_b = {tuple(b[i:i + size]) for i in range(max(len(b) - size + 1, 1))}
+    if not shingles_a or not shingles_b:
+        return 0.0
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+def tfidf_matrix(documents: list[list[str]]) -> np.ndarray:
+    """Build L2-normalized TF-IDF vectors (one row per document).
+
+    Term frequencies are log-scaled and the IDF is smoothed, so terms shared by
+    every document still contribute a little weight.
+    """
+    vocabulary = {term: i for i, term in enumerate(sorted({t for doc in documents for t in doc}))}
+    counts = np.zeros((len(documents), len(vocabulary)))
+    for row, doc in enumerate(documents):
+        for term in doc:
+            counts[row, vocabulary[term]] += 1
+
+    tf = np.log1p(counts)
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    vectors = tf * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def similarity_matrix(texts: list[str]) -> np.ndarray:
+    """Pairwise topic similarity: the higher of TF-IDF cosine and shingle Jaccard."""
+    documents = [tokenize(text) for text in texts]
+    if not any(documents):
+        return np.zeros((len(texts), len(texts)))
+
+    vectors = tfidf_matrix(documents)
+    similarity = vectors @ vectors.T
+    for i in range(len(documents)):
+        for j in range(i + 1, len(documents)):
+            jaccard = shingle_similarity(documents[i], documents[j])
+            similarity[i, j] = similarity[j, i] = max(similarity[i, j], jaccard)
+    return np.clip(similarity, 0.0, 1.0)
+
+# ===== DISPATCH PLANNING =====
+
+@dataclass
+class TopicGroup:
+    """A set of ConductResearch calls that will be served by one researcher."""
+
+    # Tool call that is actually dispatched, with the (possibly merged) topic
+    tool_call: dict
+    # Tool calls folded into this one, each with its similarity to the group
+    absorbed: list[tuple[dict, float]] = field(default_factory=list)
+    # "keep" (no overlap), "merge" (related topics combined) or "dedupe" (duplicates dropped)
+    action: str = "keep"
+
+@dataclass
+class DispatchPlan:
+    """Outcome of overlap detection for one batch of ConductResearch calls."""
+
+    # Groups to dispatch, one researcher each
+    groups: list[TopicGroup]
+    # Calls dropped because an earlier turn already researched the same topic
+    already_researched: list[tuple[dict, str, float]] = field(default_factory=list)
+
+def merge_topics(topics: list[str]) -> str:
+    """Combine closely related topic descriptions into one research topic."""
+    numbered = "\n".join(f"{i}. {topic}" for i, topic in enumerate(topics, 1))
+    return (
+        "Research the following closely related topics together in a single investigation, "
+        f"covering every aspect mentioned in each of them:\n{numbered}"
+    )
+
+def plan_topic_dispatch(tool_calls: list[dict], researched_topics: list[tuple[str, str]] | None = None) -> DispatchPlan:
+    """Decide which ConductResearch calls to launch, merge or drop.
+
+    Topics are clustered by single linkage at merge_threshold, except that two
+    clusters are never joined while they contain topics naming different
+    entities. A cluster whose
+    members are all at least duplicate_threshold similar keeps only its most
+    detailed topic; any other cluster is merged into a single combined topic.
+    Topics that duplicate research from an earlier turn are dropped.
+
+    Args:
+        tool_calls: ConductResearch tool calls from the supervisor's latest message
+        researched_topics: (tool_call_id, research_topic) pairs researched in earlier turns
+
+    Returns:
+        DispatchPlan with the groups to dispatch and the calls already researched
+    """
+    researched_topics = researched_topics or []
+    topics = [tool_call["args"]["research_topic"] for tool_call in tool_calls]
+    similarity = similarity_matrix(topics + [topic for _, topic in researched_topics])
+    entities = [named_entities(topic) for topic in topics + [topic for _, topic in researched_topics]]
+
+    # Drop topics that were already researched in an earlier turn
+    already_researched = []
+    candidates = []
+    for i, tool_call in enumerate(tool_calls):
+        previous = [
+            (similarity[i, len(topics) + j], tool_call_id)
+            for j, (tool_call_id, _) in enumerate(researched_topics)
+            if not names_different_entities(entities[i], entities[len(topics) + j])
+        ]
+        best = max(previous, default=(0.0, ""))
+        if best[0] >= duplicate_threshold:
+            already_researched.append((tool_call, best[1], float(best[0])))
+        else:
+            candidates.append(i)
+
+    # Single-linkage clustering of the remaining topics with union-find
+    parent = {i: i for i in candidates}
+    members_of = {i: [i] for i in candidates}
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, i in enumerate(candidates):
+        for j in candidates[a + 1:]:
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j or similarity[i, j] < merge_threshold:
+                continue
+            if any(names_different_entities(entities[x], entities[y]) for x in members_of[root_i] for y in members_of[root_j]):
+                continue
+            parent[root_j] = root_i
+            members_of[root_i] += members_of.pop(root_j)
+
+    clusters: dict[int, list[int]] = {}
+    for i in candidates:
+        clusters.setdefault(find(i), []).append(i)
+
+    groups = []
+    for members in clusters.values():
+        if len(members) == 1:
+            groups.append(TopicGroup(tool_call=tool_calls[members[0]]))
+            continue
+
+        primary = max(members, key=lambda i: len(topics[i]))
+        others = [i for i in members if i != primary]
+        all_duplicates = all(
+            similarity[i, j] >= duplicate_threshold
+            for a, i in enumerate(members) for j in members[a + 1:]
+        )
+        absorbed = [(tool_calls[i], float(similarity[primary, i])) for i in others]
+        if all_duplicates:
+            groups.append(TopicGroup(tool_call=tool_calls[primary], absorbed=absorbed, action="dedupe"))
+        else:
+            merged_call = {
+                **tool_calls[primary],
+                "args": {**tool_calls[primary]["args"], "research_topic": merge_topics([topics[i] for i in sorted(members)])}
+            }
+            groups.append(TopicGroup(tool_call=merged_call, absorbed=absorbed, action="merge"))
+
+    return DispatchPlan(groups=groups, already_researched=already_researched)
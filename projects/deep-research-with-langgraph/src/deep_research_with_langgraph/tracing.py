@@ -0,0 +1,313 @@
+"""Timeline Traces of Research Runs.
+
+Whether parallel researchers actually overlap, or are serialized somewhere in
+supervisor_tools or tool_node, is easiest to see on a timeline. TraceRecorder is a
+LangChain callback handler that records the spans of a run:
+
+- graph nodes (supervisor, supervisor_tools, llm_call, tool_node, compress_research, ...)
+- researcher runs, one per ConductResearch call
+- LLM calls, named after their call site when it tags them (e.g. "compress_research")
+- tool calls, and the searches they make
+- webpage summarizations and compressions
+
+Spans are laid out on concurrency lanes: a span shares its parent's lane when it
+nests inside it, and otherwise takes the first free lane, so concurrent work always
+ends up side by side. The trace can be exported as Chrome trace-event JSON (open in
+chrome://tracing or Perfetto) or in the speedscope format.
+
+Example:
+    recorder = TraceRecorder()
+    await agent.ainvoke(inputs, config={"callbacks": [recorder]})
+    recorder.export_chrome_trace("run.trace.json")
+    recorder.export_speedscope("run.speedscope.json")
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+from uuid import UUID, uuid4
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import ensure_config
+
+# ===== CONFIGURATION =====
+
+# Tags of the form "span:<name>" name the LLM calls made under them
+span_tag_prefix = "span:"
+
+# Chains recorded as spans besides the graph root and graph nodes
+traced_chain_names = {"researcher"}
+
+# Tools whose calls are shown as searches
+search_tool_names = {"tavily_search", "sonar_tool"}
+
+# ===== SPANS =====
+
+@dataclass
+class Span:
+    """A recorded piece of work on the run's timeline."""
+
+    id: str
+    parent_id: str | None
+    name: str
+    category: str
+    start: float
+    end: float | None = None
+    args: dict = field(default_factory=dict)
+
+def _llm_category(name: str) -> str:
+    if "summar" in name:
+        return "summarization"
+    if "compress" in name or "merge" in name:
+        return "compression"
+    return "llm"
+
+class TraceRecorder(BaseCallbackHandler):
+    """Callback handler that records the spans of a research run."""
+
+    # Record timestamps when events happen, not when an executor gets to them
+    run_inline = True
+
+    def __init__(self):
+        self.spans: dict[str, Span] = {}
+        # Run id of every ignored run mapped to its closest recorded ancestor
+        self._aliases: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    # ----- recording -----
+
+    def _parent(self, parent_run_id: UUID | None) -> str | None:
+        if parent_run_id is None:
+            return None
+        key = str(parent_run_id)
+        return key if key in self.spans else self._aliases.get(key)
+
+    def _open(self, run_id: UUID, parent_run_id: UUID | None, name: str, category: str, args: dict | None = None) -> None:
+        with self._lock:
+            self.spans[str(run_id)] = Span(
+                id=str(run_id),
+                parent_id=self._parent(parent_run_id),
+                name=name,
+                category=category,
+                start=time.time(),
+                args=args or {},
+            )
+
+    def _skip(self, run_id: UUID, parent_run_id: UUID | None) -> None:
+        with self._lock:
+            self._aliases[str(run_id)] = self._parent(parent_run_id)
+
+    def _close(self, run_id: UUID, error: BaseException | None = None) -> None:
+        with self._lock:
+            span = self.spans.get(str(run_id))
+            if span is not None:
+                span.end = time.time()
+                if error is not None:
+                    span.args["error"] = f"{type(error).__name__}: {error}"
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        name = kwargs.get("name") or (serialized or {}).get("name") or "chain"
+        if parent_run_id is None:
+            self._open(run_id, None, name, "graph")
+        elif name == metadata.get("langgraph_node"):
+            self._open(run_id, parent_run_id, name, "node")
+        elif name in traced_chain_names:
+            args = {key: metadata[key] for key in ("research_topic", "tool_call_id") if key in metadata}
+            self._open(run_id, parent_run_id, name, name, args)
+        else:
+            self._skip(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        site = next((tag[len(span_tag_prefix):] for tag in reversed(tags or []) if tag.startswith(span_tag_prefix)), None)
+        model = metadata.get("ls_model_name") or kwargs.get("name") or "model"
+        name = site or f"llm:{model}"
+        self._open(run_id, parent_run_id, name, _llm_category(name), {
+            "model": model, "node": metadata.get("langgraph_node")
+        })
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self.on_chat_model_start(serialized, [], run_id=run_id, parent_run_id=parent_run_id, tags=tags, metadata=metadata, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        category = "search" if name in search_tool_names else "tool"
+        self._open(run_id, parent_run_id, name, category, {"input": str(input_str)[:200]})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error)
+
+    def record_span(self, parent_run_id: UUID | None, name: str, category: str, args: dict | None = None) -> str:
+        """Open a span for work that is not a LangChain run; close it with end_span()."""
+        run_id = uuid4()
+        self._open(run_id, parent_run_id, name, category, args)
+        return str(run_id)
+
+    def end_span(self, span_id: str) -> None:
+        self._close(UUID(span_id))
+
+    # ----- lanes -----
+
+    def _is_ancestor(self, ancestor: Span, span: Span) -> bool:
+        parent_id = span.parent_id
+        while parent_id is not None:
+            if parent_id == ancestor.id:
+                return True
+            parent = self.spans.get(parent_id)
+            parent_id = parent.parent_id if parent is not None else None
+        return False
+
+    def assign_lanes(self) -> list[tuple[Span, int]]:
+        """Lay the spans out on lanes so that spans on one lane are nested or disjoint.
+
+        A span stays on its parent's lane if it fits inside the span open there,
+        and otherwise goes to the first lane that is free at its start.
+        """
+        now = time.time()
+        with self._lock:
+            spans = [
+                Span(**{**span.__dict__, "end": span.end if span.end is not None else now})
+                for span in self.spans.values()
+            ]
+        spans.sort(key=lambda span: (span.start, -span.end))
+
+        lanes: list[list[Span]] = []
+        lane_of: dict[str, int] = {}
+        placed = []
+
+        def fits(lane: int, span: Span) -> bool:
+            stack = lanes[lane]
+            while stack and stack[-1].end <= span.start:
+                stack.pop()
+            return not stack or (stack[-1].end >= span.end and self._is_ancestor(stack[-1], span))
+
+        for span in spans:
+            preferred = [lane_of[span.parent_id]] if span.parent_id in lane_of else []
+            lane = next((lane for lane in preferred + list(range(len(lanes))) if fits(lane, span)), None)
+            if lane is None:
+                lanes.append([])
+                lane = len(lanes) - 1
+            lanes[lane].append(span)
+            lane_of[span.id] = lane
+            placed.append((span, lane))
+        return placed
+
+    @staticmethod
+    def _lane_names(placed: list[tuple[Span, int]]) -> dict[int, str]:
+        names: dict[int, str] = {}
+        for span, lane in placed:
+            if lane not in names:
+                topic = span.args.get("research_topic")
+                names[lane] = f"{span.name}: {topic[:60]}" if topic else span.name
+        return names
+
+    # ----- export -----
+
+    def to_chrome_trace(self) -> dict:
+        """Render the trace as Chrome trace-event JSON."""
+        placed = self.assign_lanes()
+        origin = min((span.start for span, _ in placed), default=0.0)
+        events: list[dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": lane, "args": {"name": name}}
+            for lane, name in self._lane_names(placed).items()
+        ]
+        events += [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - origin) * 1e6),
+                "dur": round((span.end - span.start) * 1e6),
+                "pid": 1,
+                "tid": lane,
+                "args": {key: value for key, value in span.args.items() if value is not None},
+            }
+            for span, lane in placed
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_speedscope(self, name: str = "research run") -> dict:
+        """Render the trace in the speedscope file format, one evented profile per lane."""
+        placed = self.assign_lanes()
+        origin = min((span.start for span, _ in placed), default=0.0)
+        end = max((span.end for span, _ in placed), default=origin)
+        frames: dict[tuple[str, str], int] = {}
+        by_lane: dict[int, list[Span]] = {}
+        for span, lane in placed:
+            frames.setdefault((span.name, span.category), len(frames))
+            by_lane.setdefault(lane, []).append(span)
+
+        profiles = []
+        for lane, lane_name in self._lane_names(placed).items():
+            events = []
+            stack: list[Span] = []
+            for span in by_lane[lane]:
+                while stack and stack[-1].end <= span.start:
+                    closed = stack.pop()
+                    events.append({"type": "C", "frame": frames[(closed.name, closed.category)], "at": (closed.end - origin) * 1000})
+                events.append({"type": "O", "frame": frames[(span.name, span.category)], "at": (span.start - origin) * 1000})
+                stack.append(span)
+            while stack:
+                closed = stack.pop()
+                events.append({"type": "C", "frame": frames[(closed.name, closed.category)], "at": (closed.end - origin) * 1000})
+            profiles.append({
+                "type": "evented",
+                "name": lane_name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": (end - origin) * 1000,
+                "events": events,
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "shared": {"frames": [{"name": f"{span_name} [{category}]"} for span_name, category in frames]},
+            "profiles": profiles,
+        }
+
+    def export_chrome_trace(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_chrome_trace()), encoding="utf-8")
+
+    def export_speedscope(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_speedscope(Path(path).stem)), encoding="utf-8")
+
+# ===== MANUAL SPANS =====
+
+@contextmanager
+def trace_span(name: str, category: str, **args) -> Iterator[None]:
+    """Record a span for work that is not a LangChain run, such as a raw search request.
+
+    The span is attached to the run currently executing and only recorded when a
+    TraceRecorder is among its callbacks.
+    """
+    callbacks = ensure_config().get("callbacks")
+    recorder = next((h for h in getattr(callbacks, "handlers", []) if isinstance(h, TraceRecorder)), None)
+    if recorder is None:
+        yield
+        return
+    span_id = recorder.record_span(getattr(callbacks, "parent_run_id", None), name, category, args)
+    try:
+        yield
+    finally:
+        recorder.end_span(span_id)
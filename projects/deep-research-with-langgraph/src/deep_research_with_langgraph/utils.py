@@ -1,4 +1,5 @@
 
+import asyncio
 from datetime import datetime
 from langchain_core.messages import HumanMessage
 from typing_extensions import Annotated, List, Literal
@@ -7,6 +8,13 @@ from tavily import TavilyClient
 from deep_research_with_langgraph.state_research import Summary
 from deep_research_with_langgraph.prompts import summarize_webpage_prompt
 from langchain_core.tools import tool, InjectedToolArg
+from deep_research_with_langgraph.citations import register_source
+from deep_research_with_langgraph.caches import search_cache, summary_cache
+from deep_research_with_langgraph.blob_store import content_ref
+from deep_research_with_langgraph.batch_api import invoke_model
+from deep_research_with_langgraph.scheduler import scheduled_call
+from deep_research_with_langgraph.tracing import trace_span
+from deep_research_with_langgraph.progress import report_progress
 
 """Research Utilities and Tools.
 
@@ -22,12 +30,13 @@ def get_today_str() -> str:
 
 # ===== CONFIGURATION =====
 
-summarization_model = init_chat_model("gpt-4o-mini", model_provider="openai", temperature=0)
+# Timeouts and retries are handled by the resilience layer
+summarization_model = init_chat_model("gpt-4o-mini", model_provider="openai", max_retries=0, temperature=0)
 tavily_client = TavilyClient()
 
 # ===== SEARCH FUNCTIONS =====
 
-def tavily_search_multiple(
+async def tavily_search_multiple(
     search_queries: List[str], 
     max_results: int = 3, 
     topic: Literal["general", "news", "finance"] = "general", 
@@ -35,6 +44,8 @@ def tavily_search_multiple(
 ) -> List[dict]:
     """Perform search using Tavily API for multiple queries.
 
+    Only the Tavily requests themselves hold a slot of the "tavily" scheduler.
+
     Args:
         search_queries: List of search queries to execute
         max_results: Maximum number of results per query
@@ -45,46 +56,65 @@ def tavily_search_multiple(
         List of search result dictionaries
     """
     # Execute searches sequentially. Note: yon can use AsyncTavilyClient to parallelize this step.
+    # Responses are shared with concurrent runs through the search cache
     search_docs = []
     for query in search_queries:
-        result = tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic
-        )
+        cache_key = ("tavily", query, max_results, topic, include_raw_content)
+        result = search_cache.get(cache_key)
+        if result is None:
+            with trace_span("tavily.search", "search", query=query):
+                # Searches share Tavily's capacity with concurrent runs
+                result = await scheduled_call("tavily", lambda: asyncio.to_thread(
+                    tavily_client.search,
+                    query,
+                    max_results=max_results,
+                    include_raw_content=include_raw_content,
+                    topic=topic
+                ))
+            search_cache.put(cache_key, result)
         search_docs.append(result)
 
     return search_docs
 
-def summarize_webpage_content(webpage_content: str) -> str:
+def summary_messages(webpage_content: str) -> list[HumanMessage]:
+    """Build the summarization prompt for a webpage."""
+    return [
+        HumanMessage(content=summarize_webpage_prompt.format(
+            webpage_content=webpage_content,
+            date=get_today_str()
+        ))
+    ]
+
+def format_summary(summary: Summary) -> str:
+    """Format a webpage summary with clear structure."""
+    return (
+        f"<summary>\n{summary.summary}\n</summary>\n\n"
+        f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
+    )
+
+async def summarize_webpage_content(webpage_content: str) -> str:
     """Summarize webpage content using the configured summarization model.
 
+    The call goes through the resilience layer and the "openai" scheduler, or is
+    queued for the batch endpoint in batch execution mode.
+
     Args:
         webpage_content: Raw webpage content to summarize
 
     Returns:
         Formatted summary with key excerpts
     """
+    cache_key = content_ref(webpage_content)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        # Set up structured output model for summarization
-        structured_model = summarization_model.with_structured_output(Summary)
-
-        # Generate summary
-        summary = structured_model.invoke([
-            HumanMessage(content=summarize_webpage_prompt.format(
-                webpage_content=webpage_content, 
-                date=get_today_str()
-            ))
-        ])
-
-        # Format summary with clear structure
-        formatted_summary = (
-            f"<summary>\n{summary.summary}\n</summary>\n\n"
-            f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
+        summary = await invoke_model(
+            "summarize_webpage", "openai", summarization_model, summary_messages(webpage_content), Summary
         )
-
+        formatted_summary = format_summary(summary)
+        summary_cache.put(cache_key, formatted_summary)
         return formatted_summary
 
     except Exception as e:
@@ -110,28 +140,36 @@ def deduplicate_search_results(search_results: List[dict]) -> dict:
 
     return unique_results
 
-def process_search_results(unique_results: dict) -> dict:
+async def process_search_results(unique_results: dict) -> dict:
     """Process search results by summarizing content where available.
 
+    Pages are summarized concurrently; in batch execution mode they are therefore
+    queued for the batch endpoint together.
+
     Args:
         unique_results: Dictionary of unique search results
 
     Returns:
         Dictionary of processed results with summaries
     """
-    summarized_results = {}
+    pages_to_summarize = [url for url, result in unique_results.items() if result.get("raw_content")]
+    if pages_to_summarize:
+        report_progress("summarization_queued", {"summaries_queued": len(pages_to_summarize)})
 
-    for url, result in unique_results.items():
-        # Use existing content if no raw content for summarization
-        if not result.get("raw_content"):
-            content = result['content']
-        else:
-            # Summarize raw content for better processing
-            content = summarize_webpage_content(result['raw_content'])
+    async def summarize(url: str) -> str:
+        # Summarize raw content for better processing
+        summary = await summarize_webpage_content(unique_results[url]["raw_content"])
+        report_progress("page_summarized", {"summaries_done": 1})
+        return summary
 
+    summaries = dict(zip(pages_to_summarize, await asyncio.gather(*(summarize(url) for url in pages_to_summarize))))
+
+    summarized_results = {}
+    for url, result in unique_results.items():
         summarized_results[url] = {
             'title': result['title'],
-            'content': content
+            # Use existing content if no raw content for summarization
+            'content': summaries.get(url, result['content'])
         }
 
     return summarized_results
@@ -144,15 +182,17 @@ def format_search_output(summarized_results: dict) -> str:
         summarized_results: Dictionary of processed search results
 
     Returns:
-        Formatted string of search results with clear source separation
+        Formatted string of search results with clear source separation, each
+        labelled with its source ID from the citation registry
     """
     if not summarized_results:
         return "No valid search results found. Please try different search queries or use a different search API."
 
     formatted_output = "Search results: \n\n"
 
-    for i, (url, result) in enumerate(summarized_results.items(), 1):
-        formatted_output += f"\n\n--- SOURCE {i}: {result['title']} ---\n"
+    for url, result in summarized_results.items():
+        source_id = register_source(url, result['title'])
+        formatted_output += f"\n\n--- SOURCE [{source_id}]: {result['title']} ---\n"
         formatted_output += f"URL: {url}\n\n"
         formatted_output += f"SUMMARY:\n{result['content']}\n\n"
         formatted_output += "-" * 80 + "\n"
@@ -163,7 +203,7 @@ def format_search_output(summarized_results: dict) -> str:
 # ===== RESEARCH TOOLS =====
 
 @tool(parse_docstring=True)
-def tavily_search(
+async def tavily_search(
     query: str,
     max_results: Annotated[int, InjectedToolArg] = 3,
     topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
@@ -179,7 +219,7 @@ def tavily_search(
         Formatted string of search results with summaries
     """
     # Execute search for single query
-    search_results = tavily_search_multiple(
+    search_results = await tavily_search_multiple(
         [query],  # Convert single query to list for the internal function
         max_results=max_results,
         topic=topic,
@@ -190,7 +230,7 @@ def tavily_search(
     unique_results = deduplicate_search_results(search_results)
 
     # Process results with summarization
-    summarized_results = process_search_results(unique_results)
+    summarized_results = await process_search_results(unique_results)
 
     # Format output for consumption
     return format_search_output(summarized_results)
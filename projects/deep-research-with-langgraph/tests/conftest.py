@@ -0,0 +1,10 @@
+"""Shared test setup.
+
+Several modules create provider clients when they are imported, which only needs
+an API key to be set; no test talks to a provider.
+"""
+
+import os
+
+for key in ("OPENAI_API_KEY", "TAVILY_API_KEY", "PPLX_API_KEY"):
+    os.environ.setdefault(key, "test-key")
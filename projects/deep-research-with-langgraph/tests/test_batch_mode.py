@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from deep_research_with_langgraph import batch_api, utils
+from deep_research_with_langgraph import multi_agent_supervisor as supervisor_module
+from deep_research_with_langgraph.batch_api import BatchDispatcher, BatchRequestError, FileBatchEndpoint, request_id, set_execution_mode
+
+@pytest.fixture
+def batch_mode(tmp_path, monkeypatch):
+    requests = []
+
+    def responder(body: dict) -> str:
+        requests.append(body)
+        return json.dumps({"summary": "Short summary", "key_excerpts": "Key excerpt"})
+
+    monkeypatch.setattr(batch_api, "batch_window_seconds", 0.2)
+    monkeypatch.setattr(batch_api, "batch_poll_seconds", 0.05)
+    endpoint = FileBatchEndpoint(tmp_path / "batches", responder)
+    set_execution_mode("batch", endpoint, tmp_path / "batches" / "ledger.jsonl")
+    yield endpoint, requests
+    set_execution_mode("realtime")
+
+def test_search_pages_are_summarized_in_one_batch(batch_mode):
+    endpoint, requests = batch_mode
+    results = {
+        f"https://example.com/{i}": {"title": f"Page {i}", "content": "snippet", "raw_content": f"Full text of page {i}"}
+        for i in range(3)
+    }
+    results["https://example.com/plain"] = {"title": "Plain", "content": "snippet only"}
+
+    summarized = asyncio.run(utils.process_search_results(results))
+
+    assert len([path for path in endpoint.directory.iterdir() if path.is_dir()]) == 1
+    assert len(requests) == 3
+    assert summarized["https://example.com/0"]["content"].startswith("<summary>\nShort summary\n</summary>")
+    assert summarized["https://example.com/plain"]["content"] == "snippet only"
+
+class _SlowResearcher:
+    async def ainvoke(self, inputs, config=None):
+        await asyncio.sleep(0.2)
+        return {"compressed_research": "Findings", "raw_notes": []}
+
+def test_researcher_deadline_does_not_apply_in_batch_mode(batch_mode, monkeypatch):
+    monkeypatch.setattr(supervisor_module, "researcher_deadline_seconds", 0.05)
+    tool_call = {"id": "call_1", "name": "ConductResearch", "args": {"research_topic": "topic"}}
+
+    _, result = asyncio.run(supervisor_module._run_researcher(_SlowResearcher(), tool_call, "brief"))
+    assert result["compressed_research"] == "Findings"
+
+def test_failed_request_is_submitted_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_api, "batch_window_seconds", 0.05)
+    monkeypatch.setattr(batch_api, "batch_poll_seconds", 0.05)
+    attempts = []
+
+    def responder(body: dict) -> str:
+        attempts.append(body)
+        if len(attempts) == 1:
+            raise RuntimeError("model overloaded")
+        return "Answer"
+
+    ledger_path = tmp_path / "batches" / "ledger.jsonl"
+    dispatcher = BatchDispatcher(FileBatchEndpoint(tmp_path / "batches", responder), ledger_path)
+    body = {"model": "gpt-4.1-mini", "messages": [{"role": "user", "content": "Question"}]}
+
+    with pytest.raises(BatchRequestError):
+        dispatcher.submit(body).result(timeout=5)
+    # The failure is persisted, so a restarted dispatcher does not re-attach to the failed batch either
+    assert request_id(body) not in BatchDispatcher(FileBatchEndpoint(tmp_path / "batches"), ledger_path)._ledger
+
+    assert dispatcher.submit(body).result(timeout=5) == "Answer"
+    assert len(attempts) == 2
@@ -0,0 +1,39 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from deep_research_with_langgraph.batch_runner import read_results, select_thread
+
+class _FakeAgent:
+    """Answers aget_state from a map of thread id to (next, values)."""
+
+    def __init__(self, threads: dict[str, tuple[tuple, dict]]):
+        self.threads = threads
+
+    async def aget_state(self, config):
+        next_nodes, values = self.threads.get(config["configurable"]["thread_id"], ((), {}))
+        return SimpleNamespace(next=next_nodes, values=values)
+
+def test_first_attempt_starts_on_the_brief_thread():
+    assert asyncio.run(select_thread(_FakeAgent({}), "a", 0)) == ("batch-a", False)
+
+def test_interrupted_attempt_is_resumed():
+    agent = _FakeAgent({"batch-a": (("supervisor_subgraph",), {"notes": []})})
+    assert asyncio.run(select_thread(agent, "a", 0)) == ("batch-a", True)
+    # The attempt failed inside a node, leaving its checkpoint mid-run
+    assert asyncio.run(select_thread(agent, "a", 1)) == ("batch-a", True)
+
+def test_retry_after_an_ended_run_starts_a_fresh_thread():
+    agent = _FakeAgent({"batch-a": ((), {"notes": [{"content": "old"}]})})
+    assert asyncio.run(select_thread(agent, "a", 1)) == ("batch-a-attempt-2", False)
+
+    agent.threads["batch-a-attempt-2"] = (("final_report_generation",), {"notes": []})
+    assert asyncio.run(select_thread(agent, "a", 2)) == ("batch-a-attempt-2", True)
+
+def test_read_results_counts_attempts(tmp_path):
+    path = tmp_path / "results.jsonl"
+    records = [{"id": "a", "status": "error"}, {"id": "a", "status": "completed"}, {"id": "b", "status": "error"}]
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n{\"id\": \"b\", \"sta", encoding="utf-8")
+    finished, attempts = read_results(path)
+    assert finished == {"a"}
+    assert attempts == {"a": 2, "b": 1}
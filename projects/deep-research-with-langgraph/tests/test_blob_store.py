@@ -0,0 +1,43 @@
+import pytest
+
+from deep_research_with_langgraph.blob_store import (
+    FilesystemBlobStore, InMemoryBlobStore, MmapBlobStore, SqliteBlobStore, content_ref
+)
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: InMemoryBlobStore(),
+    lambda tmp_path: FilesystemBlobStore(tmp_path / "fs"),
+    lambda tmp_path: SqliteBlobStore(tmp_path / "blobs.sqlite"),
+    lambda tmp_path: MmapBlobStore(tmp_path / "blobs.dat"),
+])
+def test_round_trip(tmp_path, make_store):
+    store = make_store(tmp_path)
+    ref = store.put("raw notes ✓")
+    assert ref == content_ref("raw notes ✓")
+    assert store.put("raw notes ✓") == ref
+    assert ref in store
+    assert store.get(ref) == "raw notes ✓"
+    with pytest.raises(KeyError):
+        store.get(content_ref("missing"))
+
+def test_mmap_store_reloads_index(tmp_path):
+    ref = MmapBlobStore(tmp_path / "blobs.dat").put("persisted")
+    assert MmapBlobStore(tmp_path / "blobs.dat").get(ref) == "persisted"
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemoryBlobStore(max_bytes=10)
+    first, second = store.put("aaaa"), store.put("bbbb")
+    store.get(first)
+    third = store.put("cccc")
+
+    assert second not in store
+    assert first in store and third in store
+    assert store.size == 8
+    assert store.evictions == 1
+
+def test_memory_store_keeps_oversized_newest_blob():
+    store = InMemoryBlobStore(max_bytes=4)
+    store.put("aa")
+    ref = store.put("x" * 10)
+    assert store.get(ref) == "x" * 10
+    assert len(store._blobs) == 1
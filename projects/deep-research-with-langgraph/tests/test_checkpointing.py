@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from deep_research_with_langgraph import checkpointing
+from deep_research_with_langgraph import multi_agent_supervisor as supervisor_module
+from deep_research_with_langgraph.checkpointing import BatchedSqliteSaver
+
+class _FakeSupervisorModel:
+    """Delegates two topics on its first turn and completes research afterwards."""
+
+    def __init__(self):
+        self.turns = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.turns += 1
+        if self.turns == 1:
+            return AIMessage(content="", tool_calls=[
+                {"name": "ConductResearch", "args": {"research_topic": topic}, "id": f"call_{topic}"}
+                for topic in ("alpha", "beta")
+            ])
+        return AIMessage(content="", tool_calls=[{"name": "ResearchComplete", "args": {}, "id": "call_done"}])
+
+class _FakeResearcher:
+    """Researches instantly, except for topics listed in hang."""
+
+    def __init__(self, hang: set[str]):
+        self.hang = hang
+        self.topics: list[str] = []
+
+    async def ainvoke(self, inputs, config=None):
+        topic = inputs["research_topic"]
+        self.topics.append(topic)
+        if topic in self.hang:
+            await asyncio.sleep(60)
+        return {"compressed_research": f"Findings on {topic}", "raw_notes": []}
+
+@pytest.fixture
+def crash_on_flush_interval(monkeypatch):
+    # Nothing is flushed by size or age, as if the process died before either kicked in
+    monkeypatch.setattr(checkpointing, "checkpoint_batch_size", 10**9)
+    monkeypatch.setattr(checkpointing, "checkpoint_flush_seconds", 3600)
+    monkeypatch.setattr(supervisor_module, "detect_topic_overlap", False)
+    monkeypatch.setattr(supervisor_module, "supervisor_model_with_tools", _FakeSupervisorModel())
+
+def _run_supervisor(monkeypatch, path, researcher: _FakeResearcher):
+    saver = BatchedSqliteSaver(path)
+    monkeypatch.setattr(checkpointing, "_checkpointer", saver)
+    monkeypatch.setattr(supervisor_module, "get_research_backend", lambda mode: researcher)
+    return saver, supervisor_module.supervisor_builder.compile(checkpointer=saver)
+
+def test_crashed_run_resumes_with_stored_researcher_results(tmp_path, monkeypatch, crash_on_flush_interval):
+    path = tmp_path / "checkpoints.db"
+    config = {"configurable": {"thread_id": "run-1"}}
+
+    first = _FakeResearcher(hang={"beta"})
+    _, graph = _run_supervisor(monkeypatch, path, first)
+    inputs = {"supervisor_messages": [HumanMessage(content="brief")], "research_brief": "brief"}
+
+    async def crash():
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(graph.ainvoke(inputs, config), 1)
+    asyncio.run(crash())
+    assert sorted(first.topics) == ["alpha", "beta"]
+
+    # A new process: a new checkpointer on the same database
+    second = _FakeResearcher(hang=set())
+    _, graph = _run_supervisor(monkeypatch, path, second)
+
+    async def resume() -> tuple[list[dict], dict]:
+        events, state = [], None
+        async for mode, chunk in graph.astream(None, config, stream_mode=["custom", "values"]):
+            if mode == "custom":
+                events.append(chunk)
+            else:
+                state = chunk
+        return events, state
+    events, state = asyncio.run(resume())
+
+    assert second.topics == ["beta"]
+    assert [event["tool_call_id"] for event in events if event["event"] == "researcher_resumed"] == ["call_alpha"]
+    assert sorted(note["content"] for note in state["notes"]) == ["Findings on alpha", "Findings on beta"]
+
+def test_pending_rows_are_flushed_without_new_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpointing, "checkpoint_flush_seconds", 0.05)
+    saver = BatchedSqliteSaver(tmp_path / "checkpoints.db")
+    saver._pending_writes.append(("t", "", "c", "task", 0, "channel", "json", b"{}", ""))
+    saver._pending_since = checkpointing.time.monotonic()
+
+    async def wait():
+        for _ in range(100):
+            if saver.metrics.flushes:
+                return
+            await asyncio.sleep(0.01)
+    asyncio.run(wait())
+    assert saver.metrics.flushes == 1
+    saver.close()
@@ -0,0 +1,68 @@
+import contextvars
+
+from deep_research_with_langgraph import citations
+from deep_research_with_langgraph.citations import (
+    CitationRegistry, cited_sources, finish_citation_registry, register_source, render_bibliography,
+    sources_of_notes, use_citation_registry
+)
+
+def _in_run(run_id: str, call, sources: dict | None = None):
+    """Call a function in a fresh context whose citation registry is the run's."""
+    def run():
+        use_citation_registry(run_id, sources)
+        return call()
+    return contextvars.copy_context().run(run)
+
+def test_bibliography_is_renumbered_in_order_of_first_use():
+    registry = CitationRegistry()
+    a = registry.register("https://www.example.com/a/?utm_source=x", "Page A")
+    b = registry.register("https://example.com/b")
+    assert registry.register("https://example.com/a") == a
+
+    report = registry.render_bibliography(f"First [{b}]. Second [{a}] and again [{b}]. Unknown [S99].")
+    body, sources = report.split("\n\n### Sources\n\n")
+    assert body == "First [1]. Second [2] and again [1]. Unknown."
+    assert sources.splitlines() == ["[1] https://example.com/b: https://example.com/b", "[2] Page A: https://www.example.com/a/"]
+
+def test_runs_number_their_sources_independently():
+    first = _in_run("run-1", lambda: [register_source("https://a.example"), register_source("https://b.example")])
+    second = _in_run("run-2", lambda: register_source("https://b.example"))
+    assert first == ["S1", "S2"]
+    assert second == "S1"
+    finish_citation_registry("run-1")
+    finish_citation_registry("run-2")
+
+def test_ids_resolve_after_a_restart_from_the_sources_stored_with_notes():
+    def research():
+        source_id = register_source("https://a.example/report", "Report")
+        content = f"Revenue grew [{source_id}]."
+        return {"content": content, "sources": cited_sources(content)}
+    note = _in_run("run-3", research)
+
+    # A new process: the run's registry is gone and restored from the checkpointed notes
+    finish_citation_registry("run-3")
+    def resume():
+        new_id = register_source("https://b.example")
+        return new_id, render_bibliography(f"{note['content']} Costs fell [{new_id}].")
+    new_id, report = _in_run("run-3", resume, sources_of_notes([note]))
+
+    assert new_id == "S2"
+    assert report.endswith("[1] Report: https://a.example/report\n[2] https://b.example: https://b.example")
+    finish_citation_registry("run-3")
+
+def test_restore_keeps_ids_already_in_use():
+    registry = CitationRegistry()
+    registry.register("https://a.example")
+    registry.restore({"S1": {"url": "https://other.example"}, "S4": {"url": "https://d.example", "title": "D"}})
+    assert registry.get("S1").url == "https://a.example"
+    assert registry.get("S4").title == "D"
+    assert registry.register("https://e.example") == "S5"
+
+def test_finished_and_least_recently_used_registries_are_dropped(monkeypatch):
+    monkeypatch.setattr(citations, "max_run_registries", 2)
+    monkeypatch.setattr(citations, "_run_registries", citations.OrderedDict())
+    for run_id in ["a", "b", "c"]:
+        _in_run(run_id, lambda: None)
+    assert list(citations._run_registries) == ["b", "c"]
+    finish_citation_registry("b")
+    assert list(citations._run_registries) == ["c"]
@@ -0,0 +1,43 @@
+import asyncio
+
+from deep_research_with_langgraph import compression
+from deep_research_with_langgraph.compression import HierarchicalCompressor
+
+def test_salvage_uses_finished_partials_and_raw_outputs_without_model_call(monkeypatch):
+    monkeypatch.setattr(compression, "compression_mode", "hierarchical")
+    monkeypatch.setattr(compression, "merge_fan_in", 2)
+
+    async def no_merge(*args, **kwargs):
+        raise AssertionError("salvage must not call the model")
+    monkeypatch.setattr(compression, "merge_partial_notes", no_merge)
+
+    async def run() -> tuple[str, list[asyncio.Task]]:
+        compressor = HierarchicalCompressor("topic")
+
+        async def compress(tool_name, tool_args, tool_output):
+            if tool_output == "slow output":
+                await asyncio.sleep(10)
+            return f"notes on {tool_output}"
+        compressor._compress_tool_output = compress
+
+        compressor.add_tool_output("tavily_search", {}, "fast output")
+        compressor.add_tool_output("tavily_search", {}, "slow output")
+        compressor.add_tool_output("tavily_search", {}, "third output")
+        await asyncio.sleep(0.01)
+        tasks = compressor.pending_tasks()
+        salvaged = compressor.salvage()
+        await asyncio.sleep(0)
+        return salvaged, tasks
+
+    salvaged, tasks = asyncio.run(run())
+    # The first two outputs were being merged (fan-in 2), which never finished
+    assert salvaged == "fast output\n\nslow output\n\nnotes on third output"
+    assert all(task.done() for task in tasks)
+
+def test_salvage_truncates_raw_outputs(monkeypatch):
+    monkeypatch.setattr(compression, "compression_mode", "single_pass")
+    monkeypatch.setattr(compression, "salvage_raw_chars", 1000)
+    compressor = HierarchicalCompressor("topic")
+    compressor.add_tool_output("tavily_search", {}, "a" * 5000)
+    compressor.add_tool_output("tavily_search", {}, "b" * 5000)
+    assert compressor.salvage() == "a" * 500 + "\n\n" + "b" * 500
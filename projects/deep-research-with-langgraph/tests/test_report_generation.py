@@ -0,0 +1,50 @@
+import asyncio
+
+from langchain_core.messages import AIMessageChunk
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from deep_research_with_langgraph import report_generation
+from deep_research_with_langgraph.state_scope import ReportOutline, ReportSection
+
+class _State(TypedDict):
+    report: str | None
+
+class _InvalidRequest(Exception):
+    status_code = 400
+
+class _Writer:
+    async def astream(self, messages, config=None):
+        yield AIMessageChunk(content="Section text")
+        await asyncio.sleep(0.05)
+        if "Broken section" in messages[0].content:
+            raise _InvalidRequest("invalid request")
+
+def test_failed_section_restarts_every_streamed_section(monkeypatch):
+    async def plan_report(research_brief, findings):
+        return ReportOutline(title="Report", sections=[
+            ReportSection(title="Good section", description="Covers note 1", note_indices=[1]),
+            ReportSection(title="Broken section", description="Covers note 1", note_indices=[1]),
+        ])
+    monkeypatch.setattr(report_generation, "plan_report", plan_report)
+    notes = [{"tool_call_id": "call_1", "research_topic": "topic", "content": "Findings", "raw_notes_ref": "", "digest": "", "sources": {}}]
+
+    async def write(state: _State) -> dict:
+        return {"report": await report_generation.generate_sectioned_report("brief", notes, _Writer())}
+
+    builder = StateGraph(_State)
+    builder.add_node("write", write)
+    builder.add_edge(START, "write")
+    builder.add_edge("write", END)
+    graph = builder.compile()
+
+    async def run() -> list[tuple[str, dict]]:
+        return [chunk async for chunk in graph.astream({"report": None}, stream_mode=["custom", "values"])]
+
+    chunks = asyncio.run(run())
+    assert chunks[-1] == ("values", {"report": None})
+    events = [event for mode, event in chunks if mode == "custom"]
+    streamed = {event["part"] for event in events if event["event"] == "final_report_delta"}
+    restarted = {event["part"] for event in events if event["event"] == "final_report_restarted"}
+    assert streamed == {"section:0", "section:1"}
+    assert streamed <= restarted
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+from deep_research_with_langgraph import blob_store, research_memo
+from deep_research_with_langgraph import multi_agent_supervisor as supervisor_module
+from deep_research_with_langgraph.blob_store import InMemoryBlobStore
+from deep_research_with_langgraph.research_memo import ResearchMemo
+
+def test_lookup_answers_seeds_and_misses(tmp_path):
+    memo = ResearchMemo(tmp_path / "memo.db")
+    memo.put("Research Notion pricing tiers and seat costs for small teams", "Notion costs $10 per seat.", "blob://notion")
+    memo.put("Research the history of the Roman aqueducts", "Aqueducts carried water.", "blob://rome")
+
+    hit = memo.lookup("Research notion pricing tiers and seat costs for small teams")
+    assert (hit.entry.raw_notes_ref, hit.similarity, hit.mode) == ("blob://notion", 1.0, "answer")
+
+    hit = memo.lookup("Notion pricing tiers and seat costs for small teams and enterprise discounts")
+    assert hit.entry.raw_notes_ref == "blob://notion"
+    assert hit.mode == "seed"
+
+    assert memo.lookup("Compare electric car battery chemistries") is None
+
+def test_lookup_sees_entries_added_after_the_index_was_built(tmp_path):
+    memo = ResearchMemo(tmp_path / "memo.db")
+    memo.put("Research the history of the Roman aqueducts", "Aqueducts carried water.", "blob://rome")
+    assert memo.lookup("Compare electric car battery chemistries") is None
+
+    # A second handle on the same file, like another process sharing the memo
+    ResearchMemo(tmp_path / "memo.db").put("Compare electric car battery chemistries", "LFP is cheaper.", "blob://ev")
+    assert memo.lookup("Compare electric car battery chemistries").entry.raw_notes_ref == "blob://ev"
+
+def test_lookup_ignores_expired_entries(tmp_path, monkeypatch):
+    memo = ResearchMemo(tmp_path / "memo.db")
+    memo.put("Research the history of the Roman aqueducts", "Aqueducts carried water.", "blob://rome")
+    monkeypatch.setattr(research_memo, "memo_freshness_seconds", -1)
+    assert memo.lookup("Research the history of the Roman aqueducts") is None
+
+def test_lookup_in_a_full_memo_is_fast(tmp_path):
+    memo = ResearchMemo(tmp_path / "memo.db")
+    for i in range(research_memo.memo_max_entries):
+        memo.put(f"Research market share of vendor{i} in segment{i % 40} during year{i % 7}", f"Findings {i}", f"blob://{i}")
+
+    memo.lookup("warm up the index")
+    started = time.perf_counter()
+    for i in range(20):
+        hit = memo.lookup(f"Research market share of vendor{i * 50} in segment{i * 50 % 40} during year{i * 50 % 7} and growth")
+        assert hit.entry.raw_notes_ref == f"blob://{i * 50}"
+    assert (time.perf_counter() - started) / 20 < 0.05
+
+def test_lookup_never_returns_findings_about_another_entity(tmp_path):
+    memo = ResearchMemo(tmp_path / "memo.db")
+    memo.put("Research the battery supply chain strategy of Tesla in 2024", "Tesla findings.", "blob://tesla")
+
+    assert memo.lookup("Research the battery supply chain strategy of Ford in 2024") is None
+    assert memo.lookup("Research the battery supply chain strategy of BYD in 2024") is None
+
+    # The next-best entry is used when the best one is about another entity
+    memo.put("Research the battery supply chain of Ford", "Ford findings.", "blob://ford")
+    hit = memo.lookup("Research the battery supply chain strategy of Ford in 2024")
+    assert hit.entry.raw_notes_ref == "blob://ford"
+
+class _Researcher:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, inputs, config=None):
+        self.calls += 1
+        return {"compressed_research": "Fresh findings", "raw_notes": [blob_store.get_blob_store().put("Raw notes")]}
+
+def _use_memo(tmp_path, monkeypatch) -> ResearchMemo:
+    memo = ResearchMemo(tmp_path / "memo.db")
+    monkeypatch.setattr(research_memo, "_research_memo", memo)
+    monkeypatch.setattr(blob_store, "_blob_store", InMemoryBlobStore())
+    return memo
+
+def test_memo_hit_whose_raw_notes_are_gone_is_a_miss(tmp_path, monkeypatch):
+    memo = _use_memo(tmp_path, monkeypatch)
+    # The blob was stored by an earlier process, or evicted since
+    memo.put("Research the history of the Roman aqueducts", "Aqueducts carried water.", "missing-blob")
+    tool_call = {"id": "call_1", "name": "ConductResearch", "args": {"research_topic": "Research the history of the Roman aqueducts"}}
+
+    researcher = _Researcher()
+    _, result = asyncio.run(supervisor_module._run_researcher(researcher, tool_call, "brief"))
+    assert researcher.calls == 1
+    assert result["compressed_research"] == "Fresh findings"
+    assert "missing-blob" not in result["raw_notes"]
+
+def test_failing_to_record_research_in_the_memo_keeps_the_result(tmp_path, monkeypatch):
+    memo = _use_memo(tmp_path, monkeypatch)
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(memo, "put", fail)
+    tool_call = {"id": "call_1", "name": "ConductResearch", "args": {"research_topic": "Research the history of the Roman aqueducts"}}
+
+    _, result = asyncio.run(supervisor_module._run_researcher(_Researcher(), tool_call, "brief"))
+    assert result["compressed_research"] == "Fresh findings"
@@ -0,0 +1,35 @@
+import asyncio
+
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from deep_research_with_langgraph.multi_agent_supervisor import stream_research_results
+
+class _State(TypedDict):
+    done: int
+
+async def _researcher(topic: str, delay: float) -> tuple[dict, dict]:
+    await asyncio.sleep(delay)
+    tool_call = {"id": f"call-{topic}", "name": "ConductResearch", "args": {"research_topic": topic}}
+    return tool_call, {"compressed_research": f"Findings on {topic}", "raw_notes": [f"sha256:{topic}"]}
+
+async def _collect(state: _State) -> dict:
+    tasks = [asyncio.create_task(_researcher("slow", 0.2)), asyncio.create_task(_researcher("fast", 0.0))]
+    finished = await stream_research_results(tasks, quorum=1)
+    return {"done": len(finished)}
+
+def test_finished_event_carries_findings_in_completion_order():
+    builder = StateGraph(_State)
+    builder.add_node("collect", _collect)
+    builder.add_edge(START, "collect")
+    builder.add_edge("collect", END)
+    graph = builder.compile()
+
+    async def run() -> list[dict]:
+        return [event async for event in graph.astream({"done": 0}, stream_mode="custom")]
+
+    events = [event for event in asyncio.run(run()) if event["event"] == "researcher_finished"]
+    assert len(events) == 1
+    assert events[0]["research_topic"] == "fast"
+    assert events[0]["compressed_research"] == "Findings on fast"
+    assert events[0]["raw_notes_refs"] == ["sha256:fast"]
@@ -0,0 +1,44 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from deep_research_with_langgraph import researcher_budget
+from deep_research_with_langgraph.research_agent import should_continue
+from deep_research_with_langgraph.researcher_budget import (
+    budget_exhausted, close_dangling_tool_calls, response_tokens, split_search_calls
+)
+
+def _search(call_id: str) -> dict:
+    return {"name": "tavily_search", "args": {"query": call_id}, "id": call_id}
+
+def test_budget_is_exhausted_by_each_limit(monkeypatch):
+    monkeypatch.setattr(researcher_budget, "researcher_max_iterations", 3)
+    monkeypatch.setattr(researcher_budget, "researcher_max_searches", 4)
+    monkeypatch.setattr(researcher_budget, "researcher_max_tokens", 1000)
+
+    assert budget_exhausted({"tool_call_iterations": 2, "search_calls": 3, "researcher_tokens": 999}) is None
+    assert "iteration limit of 3" in budget_exhausted({"tool_call_iterations": 3})
+    assert "search limit of 4" in budget_exhausted({"search_calls": 4})
+    assert "token limit of 1000" in budget_exhausted({"researcher_tokens": 1000})
+
+def test_searches_beyond_the_limit_are_skipped(monkeypatch):
+    monkeypatch.setattr(researcher_budget, "researcher_max_searches", 3)
+    think = {"name": "think_tool", "args": {"reflection": "plan"}, "id": "think"}
+    allowed, skipped = split_search_calls({"search_calls": 1}, [_search("a"), think, _search("b"), _search("c")])
+    assert [call["id"] for call in allowed] == ["a", "think", "b"]
+    assert [call["id"] for call in skipped] == ["c"]
+
+def test_researcher_over_budget_is_routed_to_compression(monkeypatch):
+    monkeypatch.setattr(researcher_budget, "researcher_max_searches", 2)
+    messages = [HumanMessage(content="topic"), AIMessage(content="", tool_calls=[_search("a")])]
+    assert should_continue({"researcher_messages": messages, "search_calls": 1}) == "tool_node"
+    assert should_continue({"researcher_messages": messages, "search_calls": 2}) == "compress_research"
+
+    closing = close_dangling_tool_calls(messages, "search limit of 2 searches reached")
+    assert [(message.tool_call_id, message.content) for message in closing] == [
+        ("a", "Not executed: search limit of 2 searches reached.")
+    ]
+
+def test_response_tokens_prefer_usage_metadata():
+    messages = [HumanMessage(content="topic")]
+    response = AIMessage(content="answer", usage_metadata={"input_tokens": 40, "output_tokens": 2, "total_tokens": 42})
+    assert response_tokens(messages, response) == 42
+    assert response_tokens(messages, AIMessage(content="answer")) > 0
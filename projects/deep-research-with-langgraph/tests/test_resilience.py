@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from deep_research_with_langgraph import resilience
+from deep_research_with_langgraph.resilience import (
+    CallPolicy, CircuitBreaker, CircuitBreakerPolicy, CircuitOpenError, resilient_call
+)
+
+class _ProviderError(Exception):
+    status_code = 503
+
+class _InvalidRequest(Exception):
+    status_code = 400
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("test-provider", CircuitBreakerPolicy(failure_threshold=2, reset_timeout=0.05))
+    monkeypatch.setitem(resilience._circuit_breakers, "test-provider", breaker)
+    monkeypatch.setitem(resilience.call_policies, "test-site", CallPolicy(timeout=5, max_attempts=1))
+    return breaker
+
+def test_circuit_opens_half_opens_and_closes(breaker):
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    # Only a single trial call is let through
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_failed_half_open_trial_reopens_circuit(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    asyncio.run(asyncio.sleep(0.06))
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+def test_cancelled_half_open_trial_does_not_block_provider(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+
+    async def run() -> str:
+        await asyncio.sleep(0.06)
+        trial = asyncio.create_task(resilient_call("test-site", "test-provider", lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        async def ok() -> str:
+            return "ok"
+        return await resilient_call("test-site", "test-provider", ok)
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == "closed"
+
+def test_retryable_errors_are_retried(monkeypatch, breaker):
+    breaker.policy = CircuitBreakerPolicy(failure_threshold=5, reset_timeout=0.05)
+    monkeypatch.setitem(resilience.call_policies, "test-site", CallPolicy(timeout=5, max_attempts=3, initial_backoff=0))
+    attempts = []
+
+    async def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _ProviderError("unavailable")
+        return "ok"
+
+    assert asyncio.run(resilient_call("test-site", "test-provider", flaky)) == "ok"
+    assert len(attempts) == 3
+    assert breaker.state == "closed"
+
+def test_retries_stop_once_circuit_opens(monkeypatch, breaker):
+    monkeypatch.setitem(resilience.call_policies, "test-site", CallPolicy(timeout=5, max_attempts=5, initial_backoff=0))
+
+    async def failing() -> str:
+        raise _ProviderError("unavailable")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient_call("test-site", "test-provider", failing))
+    assert breaker.state == "open"
+
+def test_caller_errors_do_not_close_the_circuit(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+
+    async def invalid() -> str:
+        raise _InvalidRequest("invalid request")
+
+    async def run() -> None:
+        await asyncio.sleep(0.06)
+        with pytest.raises(_InvalidRequest):
+            await resilient_call("test-site", "test-provider", invalid)
+
+    asyncio.run(run())
+    # The trial said nothing about the provider, so the next call is the trial
+    assert breaker.state == "half_open"
+    breaker.before_call()
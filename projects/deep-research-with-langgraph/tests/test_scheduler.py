@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from deep_research_with_langgraph import scheduler, utils
+from deep_research_with_langgraph.scheduler import AdmissionRejectedError, ProviderScheduler, get_scheduler
+from deep_research_with_langgraph.state_research import Summary
+
+async def _grant_order(provider: ProviderScheduler, calls: list[tuple[str, str]]) -> list[str]:
+    """Queue calls behind a held slot and release slots one at a time, recording who gets them."""
+    blocker = await provider.acquire("blocker", "interactive")
+    order = []
+
+    async def call(tenant: str, priority: str) -> None:
+        slot = await provider.acquire(tenant, priority)
+        order.append(tenant)
+        await asyncio.sleep(0)
+        slot.release()
+
+    tasks = []
+    for tenant, priority in calls:
+        tasks.append(asyncio.create_task(call(tenant, priority)))
+        await asyncio.sleep(0)
+    blocker.release()
+    await asyncio.gather(*tasks)
+    return order
+
+def test_tenants_share_capacity_by_weight(monkeypatch):
+    monkeypatch.setattr(scheduler, "tenant_weights", {"heavy": 2.0})
+    calls = [("heavy", "interactive")] * 6 + [("light", "interactive")] * 3
+    order = asyncio.run(_grant_order(ProviderScheduler("test", 1), calls))
+    assert order == ["heavy", "heavy", "light", "heavy", "heavy", "light", "heavy", "heavy", "light"]
+
+def test_tenant_that_queues_many_calls_does_not_starve_others():
+    calls = [("bulk", "interactive")] * 5 + [("small", "interactive")]
+    order = asyncio.run(_grant_order(ProviderScheduler("test", 1), calls))
+    assert order.index("small") == 1
+
+def test_interactive_calls_go_before_queued_batch_calls():
+    calls = [("a", "batch"), ("b", "batch"), ("c", "interactive")]
+    order = asyncio.run(_grant_order(ProviderScheduler("test", 1), calls))
+    assert order == ["c", "a", "b"]
+
+def test_batch_calls_leave_room_for_interactive_ones():
+    async def run() -> tuple[int, str]:
+        provider = ProviderScheduler("test", 5)
+        slots = [await provider.acquire("a", "batch") for _ in range(4)]
+        waiting = asyncio.create_task(provider.acquire("a", "batch"))
+        interactive = await asyncio.wait_for(provider.acquire("b", "interactive"), 1)
+        in_flight = provider.in_flight
+        waiting.cancel()
+        for slot in slots + [interactive]:
+            slot.release()
+        return in_flight, provider.summary()["waiting"]["batch"]
+
+    assert asyncio.run(run()) == (5, 0)
+
+def test_full_queue_rejects_calls(monkeypatch):
+    monkeypatch.setattr(scheduler, "max_queued_calls", {"interactive": 1, "batch": 1})
+
+    async def run():
+        provider = ProviderScheduler("test", 1)
+        slot = await provider.acquire("a", "interactive")
+        queued = asyncio.create_task(provider.acquire("a", "interactive"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejectedError):
+            await provider.acquire("b", "interactive")
+        slot.release()
+        (await queued).release()
+        return provider.metrics["interactive"]
+
+    metrics = asyncio.run(run())
+    assert (metrics.admitted, metrics.rejected) == (2, 1)
+
+class _FakeTavilyClient:
+    def search(self, query, **kwargs):
+        return {"results": [
+            {"url": f"https://example.com/{i}", "title": f"Page {i}", "content": "snippet", "raw_content": f"{query} page {i}"}
+            for i in range(2)
+        ]}
+
+class _FakeSummarizationModel:
+    """Records the slots held at each provider while a summary is written."""
+
+    def __init__(self):
+        self.in_flight: list[tuple[int, int]] = []
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, messages, config=None):
+        self.in_flight.append((get_scheduler("tavily").in_flight, get_scheduler("openai").in_flight))
+        return Summary(summary="Short summary", key_excerpts="Key excerpt")
+
+def test_search_summaries_do_not_hold_the_tavily_slot(monkeypatch):
+    model = _FakeSummarizationModel()
+    monkeypatch.setattr(utils, "tavily_client", _FakeTavilyClient())
+    monkeypatch.setattr(utils, "summarization_model", model)
+
+    output = asyncio.run(utils.tavily_search.ainvoke({"query": "scheduler test query"}))
+
+    assert "SOURCE [" in output and "Short summary" in output
+    assert len(model.in_flight) == 2
+    assert all(tavily == 0 and openai >= 1 for tavily, openai in model.in_flight)
@@ -0,0 +1,44 @@
+from deep_research_with_langgraph.topic_overlap import named_entities, plan_topic_dispatch
+
+def _call(call_id: str, topic: str) -> dict:
+    return {"id": call_id, "name": "ConductResearch", "args": {"research_topic": topic}}
+
+def test_templated_topics_about_different_products_are_kept_apart():
+    calls = [
+        _call(f"call_{name}", f"Research {name} pricing tiers, seat-based costs and enterprise plan features for small teams in 2024")
+        for name in ["Notion", "Asana", "Trello"]
+    ]
+    plan = plan_topic_dispatch(calls)
+    assert [group.action for group in plan.groups] == ["keep", "keep", "keep"]
+    assert [group.tool_call["id"] for group in plan.groups] == ["call_Notion", "call_Asana", "call_Trello"]
+
+def test_rephrased_topic_about_the_same_product_is_deduplicated():
+    calls = [
+        _call("call_1", "Research Notion pricing tiers, seat-based costs and enterprise plan features for small teams in 2024"),
+        _call("call_2", "Research Notion pricing tiers, seat-based costs and enterprise plan features for small teams"),
+    ]
+    plan = plan_topic_dispatch(calls)
+    assert len(plan.groups) == 1
+    assert plan.groups[0].action == "dedupe"
+    assert plan.groups[0].tool_call["id"] == "call_1"
+
+def test_unrelated_topics_are_not_merged():
+    calls = [
+        _call("call_1", "Research Notion pricing tiers and plan features for small teams"),
+        _call("call_2", "Research Notion security certifications and data residency options"),
+    ]
+    assert [group.action for group in plan_topic_dispatch(calls).groups] == ["keep", "keep"]
+
+def test_topic_researched_earlier_for_another_product_is_not_dropped():
+    calls = [_call("call_2", "Research Asana pricing tiers, seat-based costs and enterprise plan features for small teams")]
+    researched = [("call_1", "Research Notion pricing tiers, seat-based costs and enterprise plan features for small teams")]
+    plan = plan_topic_dispatch(calls, researched)
+    assert plan.already_researched == []
+    assert len(plan.groups) == 1
+
+    plan = plan_topic_dispatch([_call("call_3", researched[0][1])], researched)
+    assert [(call["id"], previous) for call, previous, _ in plan.already_researched] == [("call_3", "call_1")]
+
+def test_named_entities_ignore_sentence_initial_capitals():
+    assert named_entities("Compare Notion and Asana. Pricing matters most") == {"notion", "asana"}
+    assert named_entities("Evaluate AWS and HubSpot") == {"aws", "hubspot"}